@@ -0,0 +1,145 @@
+"""Генератор синтетических арен в формате ответа /api/arena.
+
+    python -m benchmarks.arena_gen --tiles 20000 --ants 200 --food 0.01 --seed 3 > arena.json
+
+Карта — шестиугольник с муравейником в центре; размер задаётся числом
+тайлов (берётся наименьший радиус, который их вмещает). Рельеф — доли
+грязи, кислоты и камней, остальное пусто; камни ставятся пятнами, чтобы
+пути огибали препятствия, а не проходили сквозь решето. Всё
+детерминировано по ``seed``.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+from typing import Dict, List, Tuple
+
+from utils import json_codec
+from utils.hex_math import HexMath
+
+HOME, EMPTY, DIRT, ACID, ROCK = 1, 2, 3, 4, 5
+TILE_COST = {HOME: 1, EMPTY: 1, DIRT: 2, ACID: 1, ROCK: 0}
+# рабочие / бойцы / разведчики
+ANT_MIX = ((0, 0.6), (1, 0.2), (2, 0.2))
+HEALTH = {0: 130, 1: 180, 2: 80}
+ATTACK = {0: 30, 1: 70, 2: 20}
+ROCK_CLUSTER = 6    # средний размер пятна камней
+
+
+def radius_for(tiles: int) -> int:
+    """Наименьший радиус шестиугольника из не меньше чем ``tiles`` клеток."""
+    # клеток в шестиугольнике радиуса r: 3r² + 3r + 1
+    return max(0, math.ceil((-3 + math.sqrt(9 + 12 * (tiles - 1))) / 6))
+
+
+def hexagon(radius: int) -> List[Tuple[int, int]]:
+    return [
+        (q, r)
+        for q in range(-radius, radius + 1)
+        for r in range(max(-radius, -q - radius), min(radius, -q + radius) + 1)
+    ]
+
+
+def generate(
+    tiles: int = 10_000,
+    seed: int = 1,
+    dirt: float = 0.15,
+    acid: float = 0.08,
+    stones: float = 0.07,
+    ants: int = 100,
+    enemies: int = 20,
+    food: float = 0.005,
+    visible: float = 1.0,
+    nest_ants: int = 0,
+) -> Dict:
+    """Арена примерно из ``tiles`` тайлов.
+
+    ``dirt``/``acid``/``stones`` — доли рельефа, ``food`` — доля проходимых
+    клеток с ресурсом, ``visible`` — доля радиуса, которую видит команда
+    (за ней — неразведанное, фронтир для разведчиков), ``nest_ants`` —
+    сколько из ``ants`` стоят на клетках муравейника, как в начале игры.
+    """
+    if dirt + acid + stones > 1:
+        raise ValueError("Terrain shares add up to more than 1")
+    rnd = random.Random(seed)
+    radius = radius_for(tiles)
+    cells = hexagon(radius)
+    kinds = rnd.choices(
+        (EMPTY, DIRT, ACID), (max(0.0, 1 - dirt - acid - stones), dirt, acid), k=len(cells)
+    )
+    types: Dict[Tuple[int, int], int] = dict(zip(cells, kinds))
+    # камни пятнами: случайное блуждание от затравки
+    rocks, target = 0, int(stones * len(cells))
+    while rocks < target:
+        cell = rnd.choice(cells)
+        for _ in range(rnd.randint(1, 2 * ROCK_CLUSTER)):
+            if cell in types and types[cell] != ROCK:
+                types[cell] = ROCK
+                rocks += 1
+            cell = rnd.choice(HexMath.neighbors(cell))
+    home = [(0, 0)] + HexMath.neighbors((0, 0))[:2]
+    for cell in HexMath.spiral((0, 0), 2):
+        types[cell] = EMPTY
+    for cell in home:
+        types[cell] = HOME
+
+    seen = int(radius * visible)
+    shown = [c for c in cells if HexMath.distance(c, (0, 0)) <= seen]
+    free = [c for c in shown if types[c] not in (ROCK, HOME)]
+    nest_ants = min(nest_ants, ants)
+    roaming = ants - nest_ants
+    spots = rnd.sample(free, min(len(free), roaming + enemies + int(food * len(free))))
+    ant_types, weights = zip(*ANT_MIX)
+    ant_spots = [home[i % len(home)] for i in range(nest_ants)] + spots[:roaming]
+    enemy_spots, food_spots = spots[roaming:roaming + enemies], spots[roaming + enemies:]
+    return {
+        "ants": [
+            {"id": f"a{i}", "type": t, "q": q, "r": r, "health": HEALTH[t],
+             "food": {"type": 0, "amount": 0}, "lastMove": [], "move": [], "lastAttack": None}
+            for i, ((q, r), t) in enumerate(zip(ant_spots, rnd.choices(ant_types, weights, k=len(ant_spots))))
+        ],
+        "enemies": [
+            {"q": q, "r": r, "type": t, "health": HEALTH[t], "attack": ATTACK[t],
+             "food": {"type": 0, "amount": 0}}
+            for (q, r), t in zip(enemy_spots, rnd.choices(ant_types, weights, k=len(enemy_spots)))
+        ],
+        "food": [
+            {"q": q, "r": r, "type": rnd.choice((1, 2, 3)), "amount": rnd.randint(5, 20)}
+            for q, r in food_spots
+        ],
+        "home": [{"q": q, "r": r} for q, r in home],
+        "map": [
+            {"q": q, "r": r, "type": types[(q, r)], "cost": TILE_COST[types[(q, r)]]}
+            for q, r in shown
+        ],
+        "nextTurnIn": 1.0,
+        "score": 0,
+        "spot": {"q": 0, "r": 0},
+        "turnNo": 1,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiles", type=int, default=10_000, help="тайлов на карте (1k–100k)")
+    parser.add_argument("--dirt", type=float, default=0.15)
+    parser.add_argument("--acid", type=float, default=0.08)
+    parser.add_argument("--stones", type=float, default=0.07)
+    parser.add_argument("--ants", type=int, default=100)
+    parser.add_argument("--enemies", type=int, default=20)
+    parser.add_argument("--food", type=float, default=0.005, help="доля клеток с ресурсом")
+    parser.add_argument("--visible", type=float, default=1.0, help="видимая доля радиуса")
+    parser.add_argument("--nest-ants", type=int, default=0, help="муравьёв на клетках муравейника")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    arena = generate(
+        args.tiles, args.seed, args.dirt, args.acid, args.stones,
+        args.ants, args.enemies, args.food, args.visible, args.nest_ants,
+    )
+    sys.stdout.buffer.write(json_codec.dumps(arena))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Назначение рабочих на ресурсы: венгерский алгоритм против жадного.
+
+    python -m benchmarks.bench_assignment --workers 10 100 500 --foods 1.0
+
+Матрица строится по гекс-расстояниям на синтетической карте (на время
+решения способ получения расстояний не влияет). «gain» — суммарные
+калории за ход пути, больше — лучше.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from benchmarks.bench_queues import make_arena
+from core.assignment import assign, build_cost_matrix, greedy
+from utils.hex_math import HexMath
+
+CALORIES = (10, 20, 60)
+
+
+def make_problem(workers: int, foods: int, radius: int, seed: int):
+    rnd = random.Random(seed)
+    cells = [(t["q"], t["r"]) for t in make_arena(radius, seed)["map"] if t["type"] != 5]
+    worker_cells = [rnd.choice(cells) for _ in range(workers)]
+    food_cells = rnd.sample(cells, foods)
+    there = [[HexMath.distance(w, f) for f in food_cells] for w in worker_cells]
+    back = [HexMath.distance(f, (0, 0)) for f in food_cells]
+    calories = [rnd.choice(CALORIES) for _ in food_cells]
+    return there, back, calories
+
+
+def gain(cost, pairs) -> float:
+    return -sum(cost[w][f] for w, f in pairs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--foods", type=float, default=1.0, help="ресурсов на рабочего")
+    parser.add_argument("--radius", type=int, default=40)
+    parser.add_argument("--budget", type=float, default=10.0, help="бюджет венгерского, с")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}{'foods':>7}{'matrix, s':>11}{'hungarian, s':>14}{'gain':>9}"
+          f"{'greedy, s':>11}{'gain':>9}")
+    for workers in args.workers:
+        foods = max(1, round(workers * args.foods))
+        there, back, calories = make_problem(workers, foods, args.radius, args.seed)
+
+        t0 = time.perf_counter()
+        cost = build_cost_matrix(there, back, calories)
+        t_matrix = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        optimal = assign(cost, args.budget)
+        t_optimal = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        fast = greedy(cost)
+        t_greedy = time.perf_counter() - t0
+
+        print(f"{workers:>8}{foods:>7}{t_matrix:>11.4f}{t_optimal:>14.4f}{gain(cost, optimal):>9.2f}"
+              f"{t_greedy:>11.4f}{gain(cost, fast):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
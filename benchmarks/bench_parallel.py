@@ -0,0 +1,78 @@
+"""Масштабирование SmartStrategy.plan по числу процессов пула.
+
+    python -m benchmarks.bench_parallel --radius 60 --ants 300 --workers 1 2 4 8
+
+1 — последовательный режим (без пула). Время — среднее по ``--turns``
+ходам после прогревочного; «moves» — сколько муравьёв получили ход.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+
+from benchmarks.bench_queues import make_arena
+from bot_strat import SmartStrategy
+from core.game_state import GameState
+from utils.hex_math import HexMath
+
+# доли типов муравьёв: рабочие / бойцы / разведчики
+ANT_MIX = ((0, 0.6), (1, 0.2), (2, 0.2))
+HEALTH = {0: 130, 1: 180, 2: 80}
+VISIBLE = 0.8   # доля радиуса карты, которая видна на ходу
+
+
+def populate(arena: dict, radius: int, ants: int, foods: int, seed: int) -> dict:
+    """Муравьи и ресурсы на арене; видна только середина карты, чтобы у
+    разведчиков был фронтир."""
+    rnd = random.Random(seed)
+    visible = int(radius * VISIBLE)
+    arena["map"] = [t for t in arena["map"] if HexMath.distance((t["q"], t["r"]), (0, 0)) <= visible]
+    cells = [(t["q"], t["r"]) for t in arena["map"] if t["type"] not in (4, 5)]
+    types, weights = zip(*ANT_MIX)
+    spots = rnd.sample(cells, ants + foods)
+    arena["ants"] = [
+        {"id": f"a{i}", "type": t, "q": q, "r": r, "health": HEALTH[t], "food": {"type": 0, "amount": 0}}
+        for i, ((q, r), t) in enumerate(zip(spots[:ants], rnd.choices(types, weights, k=ants)))
+    ]
+    arena["food"] = [
+        {"q": q, "r": r, "type": rnd.choice((1, 2, 3)), "amount": 10} for q, r in spots[ants:]
+    ]
+    return arena
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--radius", type=int, default=60)
+    parser.add_argument("--ants", type=int, default=300)
+    parser.add_argument("--foods", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    arena = populate(make_arena(args.radius, args.seed), args.radius, args.ants, args.foods, args.seed)
+    print(f"map: {len(arena['map'])} tiles, {args.ants} ants, {args.foods} foods, "
+          f"{os.cpu_count()} cpus")
+    print(f"{'workers':>8}{'plan, s':>10}{'speedup':>9}{'moves':>7}")
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        strategy = SmartStrategy(workers)
+        world = GameState(arena)
+        strategy.plan(arena, world)  # прогрев: пул, поля, кеши
+        elapsed, moves = 0.0, 0
+        for turn in range(args.turns):
+            arena["turnNo"] = turn + 2
+            world.update(arena)
+            t0 = time.perf_counter()
+            moves = len(strategy.plan(arena, world))
+            elapsed += time.perf_counter() - t0
+        strategy.close()
+        elapsed /= args.turns
+        baseline = baseline or elapsed
+        print(f"{workers:>8}{elapsed:>10.3f}{baseline / elapsed:>9.2f}{moves:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Сравнение бэкендов очереди A*: раскрытые вершины и время.
+
+    python -m benchmarks.bench_queues --radius 60 --queries 200
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from core.game_state import GameState
+from core.pathfinding import HexPathfinder
+from utils.priority_queue import QUEUES
+
+# доли типов тайлов: пусто / грязь / кислота / камни
+TERRAIN = ((2, 0.70), (3, 0.15), (4, 0.08), (5, 0.07))
+TILE_COST = {1: 1, 2: 1, 3: 2, 4: 1, 5: 0}
+
+
+def make_arena(radius: int, seed: int) -> dict:
+    rnd = random.Random(seed)
+    types, weights = zip(*TERRAIN)
+    tiles = []
+    for q in range(-radius, radius + 1):
+        for r in range(max(-radius, -q - radius), min(radius, -q + radius) + 1):
+            t = 1 if (q, r) == (0, 0) else rnd.choices(types, weights)[0]
+            tiles.append({"q": q, "r": r, "type": t, "cost": TILE_COST[t]})
+    return {
+        "ants": [], "enemies": [], "food": [], "home": [{"q": 0, "r": 0}],
+        "map": tiles, "spot": {"q": 0, "r": 0}, "turnNo": 1, "nextTurnIn": 1.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--radius", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    world = GameState(make_arena(args.radius, args.seed))
+    cells = [c for c, t in world.tiles.items() if t["type"] != 5]
+    rnd = random.Random(args.seed)
+    pairs = [(rnd.choice(cells), rnd.choice(cells)) for _ in range(args.queries)]
+
+    print(f"map: {len(world.tiles)} tiles, {len(pairs)} queries")
+    print(f"{'queue':<10}{'time, s':>10}{'expanded':>12}{'stale':>10}{'found':>8}")
+    for name in QUEUES:
+        # свой поисковик на бэкенд: без кеша путей предыдущего и без HPA*,
+        # чтобы все запросы шли через A* с этой очередью
+        pathfinder = HexPathfinder(world, queue=name, incremental=False)
+        pathfinder.hierarchy = None
+        expanded = stale = found = 0
+        t0 = time.perf_counter()
+        for start, goal in pairs:
+            if pathfinder.find_path(start, goal):
+                found += 1
+            expanded += pathfinder.last_expanded
+            stale += pathfinder.last_stale
+        elapsed = time.perf_counter() - t0
+        print(f"{name:<10}{elapsed:>10.3f}{expanded:>12}{stale:>10}{found:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""Локальный стенд вместо сервера DatsPulse — для нагрузочных прогонов.
+
+    python -m benchmarks.local_server --port 8080 --turn 1.0 --latency 0.03 --jitter 0.02 \\
+        --p429 0.02 --p5xx 0.01
+    API_URL=http://127.0.0.1:8080 API_TOKEN=team1 python bot.py
+
+Отвечает на /api/register, /api/arena, /api/move и /api/logs в формате
+настоящего сервера. Симулируются гекс-карта с рельефом, ресурсы (сбор и
+доставка в муравейник), блуждающие враги (и муравьи других команд) и
+ходы по таймеру; бой не симулируется. Лимит запросов соблюдается на
+токен (скользящее окно, 429 с Retry-After), а сеть портится по желанию:
+задержка, разброс, случайные 429 и 5xx.
+
+GET /stats — пропускная способность и доля ходов, на которые ходы
+команды пришли до конца хода (deadline hit rate); при остановке сводка
+печатается.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import itertools
+import random
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from aiohttp import web
+
+from benchmarks.bench_queues import TILE_COST, make_arena
+from config import MOVE_COSTS
+from utils import json_codec
+from utils.hex_math import HexMath
+
+Cell = Tuple[int, int]
+
+# параметры юнитов: рабочий, боец, разведчик
+SPEED = {0: 5, 1: 4, 2: 7}
+VISION = {0: 1, 1: 1, 2: 4}
+HEALTH = {0: 130, 1: 180, 2: 80}
+ATTACK = {0: 30, 1: 70, 2: 20}
+CAPACITY = {0: 8, 1: 2, 2: 2}
+ANT_MIX = (0, 0, 0, 1, 2)       # состав стартового отряда по кругу
+FOOD_AMOUNT = (5, 20)
+ROCK = 5
+
+
+def respond(payload, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    return web.Response(
+        body=json_codec.dumps(payload), status=status,
+        content_type="application/json", headers=headers,
+    )
+
+
+class Team:
+    def __init__(self, token: str, spot: Cell, ants: int, ids):
+        self.token = token
+        self.spot = spot
+        self.home = [spot] + HexMath.neighbors(spot)[:2]
+        self.score = 0
+        self.ants = [
+            {
+                "id": f"{token[:8]}-{next(ids)}", "type": ANT_MIX[i % len(ANT_MIX)],
+                "q": spot[0], "r": spot[1], "health": HEALTH[ANT_MIX[i % len(ANT_MIX)]],
+                "food": {"type": 0, "amount": 0}, "lastMove": [], "move": [], "lastAttack": None,
+            }
+            for i in range(ants)
+        ]
+        self.moves: Dict[str, List[Cell]] = {}
+        self.logs: collections.deque = collections.deque(maxlen=100)
+        # учёт дедлайнов: ходы, на которые пришли ходы команды вовремя
+        self.served_turns: Set[int] = set()
+        self.hit_turns: Set[int] = set()
+        self.requests = 0
+        self.limited = 0
+        self._window: collections.deque = collections.deque()
+
+
+class World:
+    """Состояние игры: карта, ресурсы, враги, команды и смена ходов."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rnd = random.Random(args.seed)
+        arena = make_arena(args.radius, args.seed)
+        self.tiles: Dict[Cell, int] = {(t["q"], t["r"]): t["type"] for t in arena["map"]}
+        self.cells = [c for c, t in self.tiles.items() if t != ROCK]
+        self.food: Dict[Cell, Dict] = {}
+        for _ in range(args.food):
+            self._spawn_food()
+        self.enemies = [self._enemy(self.rnd.choice(self.cells)) for _ in range(args.enemies)]
+        self.teams: Dict[str, Team] = {}
+        self._ids = itertools.count()
+        self.turn = 0
+        self.turn_started = time.monotonic()
+        self.game_over = False
+        self.started = time.monotonic()
+        # счётчики стенда
+        self.requests = 0
+        self.injected_429 = 0
+        self.injected_5xx = 0
+
+    # ─── генерация ─────────────────────────────────────────────────
+    def _spawn_food(self) -> None:
+        cell = self.rnd.choice(self.cells)
+        self.food[cell] = {
+            "q": cell[0], "r": cell[1], "type": self.rnd.choice((1, 2, 3)),
+            "amount": self.rnd.randint(*FOOD_AMOUNT),
+        }
+
+    def _enemy(self, cell: Cell) -> Dict:
+        kind = self.rnd.choice((0, 1, 2))
+        return {
+            "q": cell[0], "r": cell[1], "type": kind, "health": HEALTH[kind],
+            "attack": ATTACK[kind], "food": {"type": 0, "amount": 0},
+        }
+
+    def register(self, token: str) -> Team:
+        team = self.teams.get(token)
+        if team is None:
+            spot = self.rnd.choice(self.cells)
+            team = self.teams[token] = Team(token, spot, self.args.ants, self._ids)
+            for cell in team.home:
+                self.tiles[cell] = 1
+        return team
+
+    # ─── смена хода ────────────────────────────────────────────────
+    def next_turn_in(self) -> float:
+        return max(0.0, self.turn_started + self.args.turn - time.monotonic())
+
+    def advance(self) -> None:
+        for team in self.teams.values():
+            if self.turn in team.served_turns and self.turn not in team.hit_turns:
+                team.logs.append({"message": f"turn {self.turn}: no moves before deadline"})
+            for ant in team.ants:
+                self._step(team, ant, team.moves.get(ant["id"], []))
+            team.moves = {}
+        for enemy in self.enemies:
+            options = [c for c in HexMath.neighbors((enemy["q"], enemy["r"])) if self.tiles.get(c, ROCK) != ROCK]
+            if options:
+                enemy["q"], enemy["r"] = self.rnd.choice(options)
+        self.turn += 1
+        self.turn_started = time.monotonic()
+        if self.args.turns and self.turn >= self.args.turns:
+            self.game_over = True
+
+    def _step(self, team: Team, ant: Dict, path: List[Cell]) -> None:
+        budget, pos, walked = SPEED[ant["type"]], (ant["q"], ant["r"]), []
+        for cell in path:
+            hex_type = self.tiles.get(cell, ROCK)
+            cost = MOVE_COSTS.get(hex_type, 1)
+            if cell not in HexMath.neighbors(pos) or hex_type == ROCK or cost > budget:
+                break
+            budget -= cost
+            pos = cell
+            walked.append({"q": cell[0], "r": cell[1]})
+        ant["q"], ant["r"] = pos
+        ant["lastMove"], ant["move"] = walked, []
+        load = ant["food"]
+        if pos in team.home and load["amount"]:
+            team.score += load["amount"] * (10, 20, 60)[load["type"] - 1]
+            ant["food"] = {"type": 0, "amount": 0}
+        elif pos in self.food and not load["amount"]:
+            food = self.food[pos]
+            taken = min(CAPACITY[ant["type"]], food["amount"])
+            ant["food"] = {"type": food["type"], "amount": taken}
+            food["amount"] -= taken
+            if not food["amount"]:
+                del self.food[pos]
+                self._spawn_food()
+
+    # ─── ответы ────────────────────────────────────────────────────
+    def arena(self, team: Team) -> Dict:
+        team.served_turns.add(self.turn)
+        visible: Set[Cell] = set(team.home)
+        for ant in team.ants:
+            visible.update(HexMath.spiral((ant["q"], ant["r"]), VISION[ant["type"]]))
+        tiles = self.tiles
+        others = [
+            {"q": a["q"], "r": a["r"], "type": a["type"], "health": a["health"],
+             "attack": ATTACK[a["type"]], "food": a["food"]}
+            for t in self.teams.values() if t is not team for a in t.ants
+        ]
+        return {
+            "ants": team.ants,
+            "enemies": [e for e in self.enemies + others if (e["q"], e["r"]) in visible],
+            "food": [f for c, f in self.food.items() if c in visible],
+            "home": [{"q": q, "r": r} for q, r in team.home],
+            "map": [
+                {"q": q, "r": r, "type": tiles[(q, r)], "cost": TILE_COST[tiles[(q, r)]]}
+                for q, r in visible if (q, r) in tiles
+            ],
+            "nextTurnIn": round(self.next_turn_in(), 3),
+            "score": team.score,
+            "spot": {"q": team.spot[0], "r": team.spot[1]},
+            "turnNo": self.turn,
+        }
+
+    def accept_moves(self, team: Team, moves: List[Dict]) -> Dict:
+        own = {ant["id"] for ant in team.ants}
+        errors = []
+        for move in moves:
+            if move.get("ant") not in own:
+                errors.append(f"unknown ant {move.get('ant')}")
+                continue
+            team.moves[move["ant"]] = [(c["q"], c["r"]) for c in move.get("path", [])]
+        team.hit_turns.add(self.turn)
+        return {"accepted": len(moves) - len(errors), "errors": errors}
+
+    def stats(self) -> Dict:
+        elapsed = max(1e-9, time.monotonic() - self.started)
+        teams = {}
+        for token, team in self.teams.items():
+            served = len([t for t in team.served_turns if t < self.turn])
+            hits = len([t for t in team.hit_turns if t < self.turn])
+            teams[token] = {
+                "score": team.score, "requests": team.requests, "rate_limited": team.limited,
+                "turns_seen": served, "deadline_hits": hits,
+                "hit_rate": round(hits / served, 3) if served else None,
+            }
+        return {
+            "turn": self.turn, "elapsed": round(elapsed, 2), "requests": self.requests,
+            "throughput_rps": round(self.requests / elapsed, 2),
+            "injected_429": self.injected_429, "injected_5xx": self.injected_5xx, "teams": teams,
+        }
+
+
+def make_app(args) -> web.Application:
+    world = World(args)
+
+    @web.middleware
+    async def network(request: web.Request, handler):
+        """Сеть и лимиты: задержка, отказы и окно запросов на токен."""
+        world.requests += 1
+        delay = args.latency + world.rnd.uniform(0, args.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if request.path.startswith("/api/"):
+            roll = world.rnd.random()
+            if roll < args.p429:
+                world.injected_429 += 1
+                return respond({"error": "rate limit (injected)"}, 429, {"Retry-After": "0.2"})
+            if roll < args.p429 + args.p5xx:
+                world.injected_5xx += 1
+                return respond({"error": "server error (injected)"}, world.rnd.choice((500, 502, 503)))
+            token = request.headers.get("X-Auth-Token", "")
+            if not token:
+                return respond({"error": "no token"}, 401)
+            team = world.teams.get(token)
+            if team is not None:
+                team.requests += 1
+                now, window = time.monotonic(), team._window
+                while window and now - window[0] > 1.0:
+                    window.popleft()
+                if len(window) >= args.rate:
+                    team.limited += 1
+                    retry = 1.0 - (now - window[0])
+                    return respond({"error": "rate limit"}, 429, {"Retry-After": f"{retry:.2f}"})
+                window.append(now)
+        return await handler(request)
+
+    def team_of(request: web.Request) -> Team:
+        team = world.teams.get(request.headers.get("X-Auth-Token", ""))
+        if team is None:
+            raise web.HTTPBadRequest(text='{"error": "not registered"}', content_type="application/json")
+        return team
+
+    async def register(request: web.Request) -> web.Response:
+        team = world.register(request.headers["X-Auth-Token"])
+        return respond({"name": team.token, "lobbyEndsIn": 0, "nextTurn": world.next_turn_in()})
+
+    async def arena(request: web.Request) -> web.Response:
+        if world.game_over:
+            return respond({"gameOver": True, "turnNo": world.turn})
+        return respond(world.arena(team_of(request)))
+
+    async def move(request: web.Request) -> web.Response:
+        team = team_of(request)
+        body = json_codec.loads(await request.read())
+        return respond(world.accept_moves(team, body.get("moves", [])))
+
+    async def logs(request: web.Request) -> web.Response:
+        return respond(list(team_of(request).logs))
+
+    async def stats(_request: web.Request) -> web.Response:
+        return respond(world.stats())
+
+    async def ticker(app: web.Application):
+        async def loop():
+            while not world.game_over:
+                await asyncio.sleep(world.next_turn_in())
+                world.advance()
+        task = asyncio.create_task(loop())
+        yield
+        task.cancel()
+        print(json_codec.dumps(world.stats()).decode())
+
+    app = web.Application(middlewares=[network])
+    app.add_routes([
+        web.post("/api/register", register),
+        web.get("/api/arena", arena),
+        web.post("/api/move", move),
+        web.get("/api/logs", logs),
+        web.get("/stats", stats),
+    ])
+    app.cleanup_ctx.append(ticker)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--radius", type=int, default=40, help="радиус карты в гексах")
+    parser.add_argument("--ants", type=int, default=20, help="муравьёв у команды")
+    parser.add_argument("--food", type=int, default=60, help="ресурсов на карте")
+    parser.add_argument("--enemies", type=int, default=10, help="блуждающих врагов")
+    parser.add_argument("--turn", type=float, default=1.0, help="длительность хода, с")
+    parser.add_argument("--turns", type=int, default=0, help="ходов до конца игры (0 — бесконечно)")
+    parser.add_argument("--rate", type=int, default=3, help="запросов в секунду на токен")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, с")
+    parser.add_argument("--jitter", type=float, default=0.0, help="случайная добавка к задержке, с")
+    parser.add_argument("--p429", type=float, default=0.0, help="доля случайных 429")
+    parser.add_argument("--p5xx", type=float, default=0.0, help="доля случайных 5xx")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    web.run_app(make_app(args), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
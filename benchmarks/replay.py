@@ -0,0 +1,103 @@
+"""Офлайн-прогон записанной игры через GameState и стратегию.
+
+    python -m benchmarks.replay records/game-20261016-120000.dpr --strategy smart
+
+Арены из журнала (core/recorder.py) идут подряд без пауз, как их видел бот:
+повторные опросы того же хода пропускаются. Печатает задержку обновления
+мира и расчёта хода (p50 / p95 / max) и память: пиковый RSS процесса, а с
+``--tracemalloc`` — ещё и пик аллокаций Python (заметно замедляет прогон).
+С ``--trace FILE`` включается трассировка фаз (core/tracing.py): сводка
+перцентилей по фазам и Chrome trace JSON в FILE.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import List
+
+try:
+    import resource
+except ImportError:  # не POSIX
+    resource = None
+
+from bot_strat import make_strategy
+from core.game_state import GameState
+from core.recorder import GameLog
+from core.tracing import tracer
+
+
+def percentile(values: List[float], share: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def report(name: str, values: List[float]) -> None:
+    print(f"{name:<8}{percentile(values, 0.5) * 1000:>10.2f}{percentile(values, 0.95) * 1000:>10.2f}"
+          f"{max(values, default=0.0) * 1000:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log", help="журнал GameRecorder (.dpr)")
+    parser.add_argument("--strategy", default="smart")
+    parser.add_argument("--turns", type=int, default=0, help="не больше стольких ходов (0 — все)")
+    parser.add_argument("--tracemalloc", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="строка на каждый ход")
+    parser.add_argument("--trace", metavar="FILE", help="трассировка фаз, Chrome trace в FILE")
+    args = parser.parse_args()
+
+    strategy = make_strategy(args.strategy)
+    tracer.enabled = bool(args.trace)
+    if args.tracemalloc:
+        tracemalloc.start()
+    world = None
+    last_turn = None
+    update_times: List[float] = []
+    plan_times: List[float] = []
+    moves = 0
+    started = time.perf_counter()
+    for turn, arena in GameLog(args.log).arenas():
+        if turn == last_turn or arena.get("gameOver"):
+            continue
+        last_turn = turn
+        t0 = time.perf_counter()
+        if world is None:
+            world = GameState(arena)
+        else:
+            world.update(arena)
+        t1 = time.perf_counter()
+        batch = strategy.plan(arena, world)
+        t2 = time.perf_counter()
+        update_times.append(t1 - t0)
+        plan_times.append(t2 - t1)
+        moves += len(batch)
+        if args.verbose:
+            print(f"turn {turn:>5}: update {(t1 - t0) * 1000:8.2f} ms, plan {(t2 - t1) * 1000:8.2f} ms, "
+                  f"moves {len(batch)}")
+        if args.turns and len(plan_times) >= args.turns:
+            break
+    elapsed = time.perf_counter() - started
+    strategy.close()
+
+    print(f"turns: {len(plan_times)}, moves: {moves}, wall: {elapsed:.2f} s")
+    print(f"{'ms':<8}{'p50':>10}{'p95':>10}{'max':>10}")
+    report("update", update_times)
+    report("plan", plan_times)
+    report("total", [u + p for u, p in zip(update_times, plan_times)])
+    if resource is not None:
+        # ru_maxrss в КБ на Linux
+        print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+    if args.tracemalloc:
+        _current, peak = tracemalloc.get_traced_memory()
+        print(f"peak Python allocations: {peak / 2**20:.1f} MB")
+    if args.trace:
+        print(tracer.format_summary())
+        tracer.export_chrome(args.trace)
+        print(f"trace written to {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Набор бенчмарков поиска пути, разбора арены и расчёта хода.
+
+    python -m benchmarks.suite                # сравнить с baseline.json
+    python -m benchmarks.suite --check-time   # сравнивать и время
+    python -m benchmarks.suite --save         # записать новый baseline
+    python -m benchmarks.suite --full -k plan # с картами на 100k тайлов, только plan
+
+Арены — из benchmarks.arena_gen, детерминированы по seed. Для каждого
+случая пишутся время (минимум по ``--repeat`` прогонам), раскрытые
+вершины (A* и поля расстояний) и пик аллокаций Python (отдельным
+прогоном под tracemalloc, чтобы не портить время). Если метрика выросла
+сильнее допуска относительно baseline — код выхода 1.
+
+Вместе с метриками в baseline пишется окружение (версии Python и NumPy):
+от него зависят и аллокации, и выбор словарного или плотного
+представления карты. При другом окружении сравнение пропускается.
+Вершины детерминированы и сравниваются почти строго, аллокации — с
+запасом; время зависит от машины и сравнивается только с ``--check-time``.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks.arena_gen import ROCK, generate
+from bot_strat import SmartStrategy
+from core.dense_grid import np
+from core.game_state import GameState
+from core.pathfinding import HexPathfinder
+from utils import json_codec
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+# допустимый рост метрики относительно baseline
+TOLERANCE = {"time": 0.40, "expanded": 0.02, "alloc": 0.25}
+PATH_QUERIES = 100
+
+
+class Case(NamedTuple):
+    name: str
+    tiles: int
+    ants: int
+    full: bool      # только с --full: долгие случаи
+    nest_ants: int = 0  # сколько муравьёв стоят на муравейнике (занятые цели полей)
+
+
+CASES = [
+    Case("find_path", 1_000, 20, False),
+    Case("find_path", 10_000, 50, False),
+    Case("find_path", 100_000, 100, False),
+    Case("game_state", 1_000, 20, False),
+    Case("game_state", 10_000, 50, False),
+    Case("game_state", 100_000, 500, False),
+    Case("plan", 1_000, 20, False),
+    Case("plan", 10_000, 50, False),
+    Case("plan_nest", 1_000, 20, False, nest_ants=20),
+    Case("plan", 100_000, 100, True),
+]
+
+
+def case_id(case: Case) -> str:
+    return f"{case.name}/{case.tiles // 1000}k"
+
+
+# ─── измеряемые функции: подготовка вне замера, возвращают раскрытые вершины ───
+def prepare_find_path(arena: Dict, seed: int) -> Callable[[], int]:
+    world = GameState(arena)
+    cells = [c for c, t in world.tiles.items() if t["type"] != ROCK]
+    rnd = random.Random(seed)
+    pairs = [(rnd.choice(cells), rnd.choice(cells)) for _ in range(PATH_QUERIES)]
+
+    def run() -> int:
+        # свежий поисковик: без кеша путей и D*-планировщиков прошлых прогонов
+        pathfinder = HexPathfinder(world)
+        for start, goal in pairs:
+            pathfinder.find_path(start, goal)
+        return pathfinder.total_expanded
+
+    return run
+
+
+def prepare_game_state(arena: Dict, seed: int) -> Callable[[], int]:
+    def run() -> int:
+        GameState(arena)
+        return 0
+
+    return run
+
+
+def prepare_plan(arena: Dict, seed: int) -> Callable[[], int]:
+    def run() -> int:
+        world = GameState(arena)
+        strategy = SmartStrategy(workers=1)
+        try:
+            strategy.plan(arena, world)
+        finally:
+            strategy.close()
+        return world.pathfinder.total_expanded + world.fields.stats()["expanded"]
+
+    return run
+
+
+PREPARE = {
+    "find_path": prepare_find_path,
+    "game_state": prepare_game_state,
+    "plan": prepare_plan,
+    "plan_nest": prepare_plan,
+}
+
+
+def measure(case: Case, repeat: int, seed: int) -> Dict[str, float]:
+    arena = generate(case.tiles, seed, ants=case.ants, nest_ants=case.nest_ants)
+    run = PREPARE[case.name](arena, seed)
+    best, expanded = float("inf"), 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        expanded = run()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        run()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"time": round(best, 6), "expanded": expanded, "alloc": peak}
+
+
+def environment() -> Dict[str, Optional[str]]:
+    """Окружение, в котором записан baseline."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__ if np is not None else None,
+    }
+
+
+def compare(current: Dict, baseline: Dict, scale: float, check_time: bool = False) -> List[str]:
+    """Регрессии: метрики, выросшие сильнее допуска."""
+    regressions = []
+    for cid, metrics in current.items():
+        base = baseline.get(cid)
+        if base is None:
+            continue
+        for metric, value in metrics.items():
+            if metric == "time" and not check_time:
+                continue
+            old = base.get(metric)
+            if not old:
+                continue
+            limit = old * (1 + TOLERANCE[metric] * scale)
+            if value > limit:
+                regressions.append(f"{cid} {metric}: {value:g} > {old:g} (+{(value / old - 1) * 100:.1f}%)")
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    """{"env": окружение, "cases": {случай: метрики}} или None."""
+    try:
+        with open(path, "rb") as f:
+            return json_codec.loads(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="only", help="только случаи, в имени которых есть подстрока")
+    parser.add_argument("--full", action="store_true", help="включить долгие случаи")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="записать результаты как baseline")
+    parser.add_argument("--check-time", action="store_true",
+                        help="сравнивать и время (baseline записан на этой же машине)")
+    parser.add_argument("--tolerance-scale", type=float, default=1.0,
+                        help="множитель допусков (например, 2 на шумной машине)")
+    args = parser.parse_args()
+
+    cases = [
+        c for c in CASES
+        if (args.full or not c.full) and (not args.only or args.only in case_id(c))
+    ]
+    stored = load_baseline(args.baseline)
+    env = environment()
+    baseline = stored["cases"] if stored is not None and stored.get("env") == env else None
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'case':<18}{'time, ms':>12}{'expanded':>12}{'alloc, KB':>12}{'vs base':>10}")
+    for case in cases:
+        cid = case_id(case)
+        metrics = results[cid] = measure(case, args.repeat, args.seed)
+        old = (baseline or {}).get(cid, {}).get("time")
+        delta = f"{(metrics['time'] / old - 1) * 100:+.1f}%" if old else "-"
+        print(f"{cid:<18}{metrics['time'] * 1000:>12.2f}{metrics['expanded']:>12}"
+              f"{metrics['alloc'] / 1024:>12.0f}{delta:>10}")
+
+    if args.save:
+        # случаи из baseline другого окружения не смешиваются с новыми
+        merged = dict(baseline or {})
+        merged.update(results)
+        with open(args.baseline, "wb") as f:
+            f.write(json_codec.dumps({"env": env, "cases": merged}))
+        print(f"baseline saved: {args.baseline}")
+        return
+    if stored is None:
+        print(f"no baseline at {args.baseline}; run with --save to record one")
+        return
+    if baseline is None:
+        print(f"baseline recorded in {stored.get('env')}, running in {env}; comparison skipped")
+        return
+    regressions = compare(results, baseline, args.tolerance_scale, args.check_time)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
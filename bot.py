@@ -6,9 +6,13 @@
 • Получает арену через APIClient.
 • Обновляет GameState.
 • Вызывает адаптивную стратегию `smart` из strategies.py.
-• Отправляет сгенерированные пути на `/api/move`.
+• Отправляет сгенерированные пути на `/api/move` — параллельно с ожиданием
+  следующего хода; арена опрашивается по оценке границы хода (TurnClock).
 
-Поддерживается переменная окружения STRAT — по умолчанию "smart".
+Поддерживается переменная окружения STRAT — по умолчанию "smart";
+PLAN_WORKERS=N включает параллельное планирование в N процессах.
+TRACE=1 включает замеры фаз хода (core/tracing.py): сводка перцентилей в
+логе, а с TRACE_FILE=путь — Chrome trace JSON по завершении.
 Других стратегий нет; если указано несуществующее имя, бот падает с
 ошибкой, чтобы не скрывать опечатки.
 """
@@ -17,11 +21,17 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 
 from core.api_client import APIClient
 from core.game_state import GameState
+from core.recorder import GameRecorder
+from core.scheduler import FairGate, PlanningScheduler, TurnPlan
+from core.tracing import span, tracer
+from core.turn_clock import TurnClock
 from bot_strat import STRATEGIES  # новый файл с одной стратегией «smart»
+from config import RECORD_DIR, TRACE_FILE, TRACE_SUMMARY_EVERY
 
 logging.basicConfig(
     level=logging.INFO,
@@ -29,60 +39,147 @@ logging.basicConfig(
 )
 
 
+class _BotLog(logging.LoggerAdapter):
+    """Префикс имени бота, когда в процессе их несколько."""
+
+    def process(self, msg, kwargs):
+        bot = self.extra["bot"]
+        return (f"[{bot}] {msg}" if bot else msg), kwargs
+
+
 class DatsPulseBot:
     """Главный управляющий класс бота."""
 
-    def __init__(self) -> None:
-        self.api = APIClient()
+    def __init__(
+        self,
+        api: Optional[APIClient] = None,
+        strategy=None,
+        gate: Optional[FairGate] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        """Без аргументов — одиночный бот. MultiBotRunner передаёт свой
+        клиент (общая сессия), отдельный экземпляр стратегии и общий
+        FairGate; ``name`` добавляется в начало строк лога."""
+        self.api = api or APIClient()
         self.world: GameState | None = None
+        self.name = name
+        self.log = _BotLog(logging.getLogger(__name__), {"bot": name})
+        # журнал арен и ходов (RECORD_DIR), открывается в run()
+        self.recorder: Optional[GameRecorder] = None
 
         # ─── выбор стратегии ────────────────────────────────────
-        strat_name = os.getenv("STRAT", "smart")  # единственный вариант
-        self.strategy = STRATEGIES.get(strat_name)
-        if not self.strategy:
-            raise ValueError(
-                f"Unknown STRAT='{strat_name}'. Available: {', '.join(STRATEGIES)}"
-            )
-        logging.info("Using strategy: %s", self.strategy.name)
+        if strategy is None:
+            strat_name = os.getenv("STRAT", "smart")  # единственный вариант
+            strategy = STRATEGIES.get(strat_name)
+            if not strategy:
+                raise ValueError(
+                    f"Unknown STRAT='{strat_name}'. Available: {', '.join(STRATEGIES)}"
+                )
+        self.strategy = strategy
+        self.log.info("Using strategy: %s", self.strategy.name)
+        # расчёт хода в потоке с дедлайном от nextTurnIn
+        self.scheduler = PlanningScheduler(self.strategy, gate=gate)
+        # оценка границ ходов сервера: когда опрашивать арену
+        self.clock = TurnClock()
+        self._rate_wait_logged = 0.0
 
     # ────────────────────────────────────────────────────────────
     async def run(self) -> None:
-        logging.info("Launching bot …")
+        self.log.info("Launching bot …")
         await self.api.connect()
         await self.api.register()
-        logging.info("Registered on server.")
+        self.log.info("Registered on server.")
+        if RECORD_DIR:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            self.recorder = GameRecorder(
+                os.path.join(RECORD_DIR, f"{self.name or 'game'}-{stamp}.dpr")
+            )
+            self.log.info("Recording to %s", self.recorder.path)
 
         last_turn = -1
+        submit: Optional[asyncio.Task] = None
         while True:
+            sent = time.perf_counter()
             arena: Dict = await self.api.get_arena()
+            received = time.perf_counter()
             if not arena:
                 await asyncio.sleep(1.0)
                 continue
-
             # graceful exit
             if arena.get("gameOver"):
-                logging.info("Game over — exiting loop.")
+                if self.recorder is not None:
+                    self.recorder.arena(arena.get("turnNo", -1), arena)
+                self.log.info("Game over — exiting loop.")
                 break
 
             turn = arena["turnNo"]
+            self.clock.observe(turn, arena.get("nextTurnIn", 0), sent, received)
             if turn == last_turn:
-                await asyncio.sleep(max(0.1, arena.get("nextTurnIn", 0.5)))
+                # ход ещё не сменился: опрашиваем чаще по мере приближения границы
+                await asyncio.sleep(self.clock.poll_delay(time.perf_counter()))
                 continue
             last_turn = turn
-            logging.debug("Turn %d", turn)
-
-            # обновляем мир
-            if self.world is None:
-                self.world = GameState(arena)
-            else:
-                self.world.update(arena)
-
-            # генерируем действия
-            moves: List[Dict] = self.strategy.plan(arena, self.world)
-            await self.api.post_move(moves)
-            logging.info("Turn %d | moves sent: %d", turn, len(moves))
-
-            await asyncio.sleep(max(0.1, arena.get("nextTurnIn", 0.5)))
+            self.log.debug("Turn %d", turn)
+            # в запись — одна арена на ход, без повторных опросов
+            if self.recorder is not None:
+                self.recorder.arena(turn, arena)
+
+            with span("bot.turn", turn=turn):
+                # обновляем мир (прошлый расчёт мог ещё работать с ним)
+                with span("bot.settle"):
+                    await self.scheduler.settle()
+                if self.world is None:
+                    self.world = GameState(arena)
+                else:
+                    self.world.update(arena)
+
+                # генерируем действия: по дедлайну уходит то, что успели
+                with span("bot.plan"):
+                    plan = await self.scheduler.plan(arena, self.world, self.api.rtt, received)
+
+                # отправка идёт параллельно с ожиданием и опросом следующего хода
+                if submit is not None and not submit.done():
+                    with span("bot.submit_wait"):
+                        await submit
+                submit = asyncio.create_task(
+                    self._submit(turn, plan, received), name=f"{self.name or 'bot'}.submit"
+                )
+            if tracer.enabled and turn % TRACE_SUMMARY_EVERY == 0:
+                self.log.info("Turn %d | phase timings:\n%s", turn, tracer.format_summary())
+            await asyncio.sleep(self.clock.poll_delay(time.perf_counter()))
+
+        if submit is not None:
+            await submit
+        await self.scheduler.settle()
+        self.strategy.close()
+        if self.recorder is not None:
+            # дописывает очередь записи в потоке, не блокируя цикл
+            await asyncio.to_thread(self.recorder.close)
+        self.log.info("API metrics: %s", self.api.metrics())
+
+    async def _submit(self, turn: int, plan: TurnPlan, received: float) -> None:
+        """POST ходов и отчёт о задержке решения: от начала хода на сервере
+        до ответа на POST."""
+        if self.recorder is not None:
+            self.recorder.moves(turn, plan.moves)
+        try:
+            with span("bot.submit", turn=turn):
+                # после конца хода ходы устарели: не отправляем и не повторяем
+                await self.api.post_move(plan.moves, self.clock.boundary_of(turn))
+        except Exception:
+            self.log.exception("Turn %d | failed to send moves", turn)
+            return
+        accepted = time.perf_counter()
+        started = self.clock.turn_started(turn) or received
+        rate_wait = self.api.bucket.wait_time - self._rate_wait_logged
+        self._rate_wait_logged = self.api.bucket.wait_time
+        self.log.info(
+            "Turn %d | moves sent: %d | ants planned: %d, deferred: %d | plan %.0f of %.0f ms"
+            " | decision latency %.0f ms | clock offset %+.0f ms | rate-limit wait %.0f ms",
+            turn, len(plan.moves), len(plan.planned), len(plan.deferred),
+            plan.deadline.elapsed() * 1000, plan.deadline.budget * 1000,
+            (accepted - started) * 1000, self.clock.offset * 1000, rate_wait * 1000,
+        )
 
     # тестовая точка входа для off‑line
     def plan_one_turn_offline(self, arena: Dict) -> List[Dict]:
@@ -90,7 +187,7 @@ class DatsPulseBot:
             self.world = GameState(arena)
         else:
             self.world.update(arena)
-        return self.strategy.plan(arena, self.world)
+        return list(self.strategy.plan(arena, self.world))
 
 
 if __name__ == "__main__":
@@ -99,3 +196,7 @@ if __name__ == "__main__":
         asyncio.run(bot.run())
     except KeyboardInterrupt:
         logging.info("Bot stopped by user")
+    finally:
+        if tracer.enabled and TRACE_FILE:
+            tracer.export_chrome(TRACE_FILE)
+            logging.info("Trace written to %s", TRACE_FILE)
@@ -11,26 +11,42 @@
 from __future__ import annotations
 
 import math
-import random
 import logging
-from typing import Dict, List, Tuple
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from config import PLAN_WORKERS
+from core.assignment import assign, build_cost_matrix
+from core.columns import AntView
+from core.hex_path import HexPath, MoveBatch
+from core.influence import InfluenceMap
+from core.parallel import ParallelPlanner, Task, resolve, run_task
+from core.pathfinding import CostProfile
+from core.scheduler import TurnPlan
+from core.tracing import span
+from utils.hex_math import HexMath
 
 # ────────────────────────────────────────────────────────────────────
 # Константы
 # ────────────────────────────────────────────────────────────────────
-NEIGHBORS = [(+1, 0), (+1, -1), (0, -1), (-1, 0), (-1, +1), (0, +1)]
+NEIGHBORS = HexMath.DIRECTIONS
 UNIT_SPEED = {0: 5, 1: 4, 2: 7}
 CALORIES = {1: 10, 2: 20, 3: 60}
 ACID, ROCK, DIRT = 4, 5, 3
 IDLE_LIMIT = 3
 
+# оборона: угроза в радиусе DEFENCE_RADIUS от муравейника, начиная с
+# которой все бойцы идут на перехват (≈ слабый враг в этом радиусе)
+DEFENCE_RADIUS = 3
+DEFENCE_THREAT = 15
+# угроза, при которой ценность ресурса для рабочих падает вдвое
+WORKER_THREAT_SCALE = 50
+
 # стоимость передвижения (дублируем локально)
 MOVE_COSTS = {1: 1, 2: 1, 3: 2, 4: 1, 5: math.inf}
 
 
-def hex_distance(a: Tuple[int, int], b: Tuple[int, int]) -> int:
-    dq, dr = abs(a[0] - b[0]), abs(a[1] - b[1])
-    return max(dq, dr, abs(a[0] + a[1] - b[0] - b[1]))
+hex_distance = HexMath.distance
 
 
 # ────────────────────────────────────────────────────────────────────
@@ -39,155 +55,364 @@ def hex_distance(a: Tuple[int, int], b: Tuple[int, int]) -> int:
 class StrategyBase:
     name = "base"
 
+    # на длинных списках (фронтир, ресурсы) считается одной матрицей NumPy
     @staticmethod
     def _closest(start: Tuple[int, int], cells: List[Tuple[int, int]]):
-        return min(cells, key=lambda c: hex_distance(start, c)) if cells else None
+        return HexMath.closest(start, cells)
 
-    # A* wrapper (с учётом кислот / камней) + обрезка до speed
-    def plan_path(self, world, start, goal, speed, hp=999):
+    # A* wrapper: один поиск с профилем стоимости (кислота — штраф по hp,
+    # камни — запрет) + обрезка по очкам хода
+    def plan_path(self, world, start, goal, speed, hp=999, ant_id=None):
         if start == goal or goal is None:
-            return []
-
-        def _astar(allow_acid):
-            raw = world.astar(start, goal, speed)
-            if not raw:
-                return []
-            for q, r in raw:
-                t = world.tiles.get((q, r), {}).get("type", 2)
-                if t == ROCK:
-                    return []
-                if t == ACID and not allow_acid:
-                    return []
-            return raw
-
-        path = _astar(False) or (hp >= 50 and _astar(True)) or []
-        return path[:speed]
+            return HexPath()
+        profile = CostProfile.for_ant(hp, speed)
+        path = world.astar(start, goal, speed, ant_id, profile)
+        return world.pathfinder.clip(path, profile)
+
+    # один поиск до ближайшей достижимой цели из набора (фронтир, сектор
+    # фронтира) вместо выбора по прямой и A*, который может не дойти
+    def plan_to_any(self, world, start, goals, speed, hp=999, ant_id=None, sector=None):
+        profile = CostProfile.for_ant(hp, speed)
+        path = world.pathfinder.find_path_to_any(start, goals, sector, ant_id, profile)
+        return world.pathfinder.clip(path, profile)
+
+    # добавляет ход в план и резервирует конечную клетку, чтобы другие
+    # муравьи не строили пути в уже занятую на этот ход клетку; False —
+    # план уже закрыт по дедлайну
+    @staticmethod
+    def _emit(plan: TurnPlan, world, ant_id: str, path: HexPath) -> bool:
+        if not plan.add(ant_id, path):
+            return False
+        world.reserve_cell(path[-1], ant_id)
+        return True
+
+    def close(self) -> None:
+        """Освобождает ресурсы стратегии (пул процессов и т. п.)."""
 
     # вес маршрута — сумма MOVE_COSTS (грязь=2) для оценки ETA
     @staticmethod
-    def _path_cost(world, path: List[Tuple[int, int]]):
-        return sum(MOVE_COSTS.get(world.tiles.get(p, {}).get("type", 2), 1) for p in path) or 1
+    def _path_cost(world, path: HexPath):
+        return sum(MOVE_COSTS.get(world.get_hex_type(p), 1) for p in path) or 1
 
 
 # ────────────────────────────────────────────────────────────────────
 # Smart v3
 # ────────────────────────────────────────────────────────────────────
+@dataclass
+class TurnContext:
+    """Разобранный ход, общий для всех фаз планирования."""
+
+    arena: Dict
+    world: object
+    plan: TurnPlan
+    nest: Tuple[int, int]
+    workers: List[AntView]
+    fighters: List[AntView]
+    scouts: List[AntView]
+    foods: List[Tuple[int, int, int, int]]
+    influence: InfluenceMap
+    profiles: Dict[str, CostProfile]
+    # пул для независимых поисков; None — всё считается в этом потоке
+    pool: Optional[ParallelPlanner] = None
+
+
 class SmartStrategy(StrategyBase):
     name = "smart"
 
-    def __init__(self):
+    def __init__(self, workers: int = PLAN_WORKERS):
         self.idle: dict[str, int] = {}
+        # параллельный режим: рабочие без груза, разведчики и простаивающие
+        # считаются в пуле процессов по снимку мира (core/parallel.py)
+        self.parallel = ParallelPlanner(workers) if workers > 1 else None
+
+    def close(self) -> None:
+        if self.parallel is not None:
+            self.parallel.close()
 
     # --------------------------------------------------------- main
-    def plan(self, arena: Dict, world) -> List[Dict]:
-        moves: List[Dict] = []
-        nest = (arena["spot"]["q"], arena["spot"]["r"])
-        turn = arena["turnNo"]
+    def plan(self, arena: Dict, world, turn_plan: Optional[TurnPlan] = None) -> MoveBatch:
+        """Ходы на текущий ход. Муравьи планируются по приоритету: оборона,
+        рабочие с грузом, остальные. С ``turn_plan`` ходы пишутся в него, а
+        по его дедлайну оставшиеся муравьи откладываются.
 
-        # разбор сущностей
-        ants = arena["ants"]
-        workers = [a for a in ants if a["type"] == 0]
-        fighters = [a for a in ants if a["type"] == 1]
-        scouts   = [a for a in ants if a["type"] == 2]
+        Юниты и ресурсы берутся из уже разобранных колонок ``world``, а не
+        из ``arena`` повторно."""
+        with span("plan", turn=world.turn_no):
+            return self._plan(arena, world, turn_plan or TurnPlan())
 
-        enemy_pos = [(e["q"], e["r"]) for e in arena.get("enemies", [])]
-        enemy_near = [p for p in enemy_pos if hex_distance(p, nest) <= 3]
+    def _plan(self, arena: Dict, world, plan: TurnPlan) -> MoveBatch:
+        with span("plan.context"):
+            ctx = self._context(arena, world, plan)
+        with span("plan.defence"):
+            self._plan_defence(ctx)
+        with span("plan.laden"):
+            self._plan_laden(ctx)
+        with span("plan.fighters"):
+            self._plan_fighters(ctx)
+        if self.parallel is not None and not plan.expired():
+            with span("plan.publish"):
+                self.parallel.publish(world)
+            ctx.pool = self.parallel
+        with span("plan.workers"):
+            self._plan_workers(ctx)
+        with span("plan.scouts"):
+            self._plan_scouts(ctx)
+        with span("plan.idle"):
+            self._plan_idle(ctx)
+        return plan.moves
 
-        # ресурсы (q,r,cal,type)
-        foods = [(f["q"], f["r"], CALORIES[f["type"]], f["type"]) for f in arena.get("food", [])]
+    @staticmethod
+    def _context(arena: Dict, world, plan: TurnPlan) -> TurnContext:
+        workers = world.get_workers()
+        food = world.food
+        return TurnContext(
+            arena=arena,
+            world=world,
+            plan=plan,
+            nest=(world.spot.q, world.spot.r),
+            workers=workers,
+            fighters=world.get_fighters(),
+            scouts=world.get_scouts(),
+            # ресурсы (q,r,cal,type)
+            foods=[(q, r, CALORIES[t], t) for q, r, t in zip(food.q, food.r, food.type)],
+            # карта влияния: угроза врагов, поддержка своих, потребность в эскорте
+            influence=InfluenceMap(world),
+            profiles={w.id: CostProfile.for_ant(w.health, UNIT_SPEED[0]) for w in workers},
+        )
+
+    # время хода вышло: муравей откладывается
+    @staticmethod
+    def _due(ctx: TurnContext, ant_id: str) -> bool:
+        if ctx.plan.expired():
+            ctx.plan.defer(ant_id)
+            return True
+        return False
 
-        # резерв целей, чтобы не дублировать
-        reserved: set[Tuple[int, int]] = set()
+    def _move(self, ctx: TurnContext, ant_id: str, path: HexPath) -> None:
+        if path and self._emit(ctx.plan, ctx.world, ant_id, path):
+            self.idle[ant_id] = 0
+
+    # независимые задачи: в пуле процессов (до дедлайна хода) или здесь же;
+    # None — задача не успела
+    @staticmethod
+    def _run(ctx: TurnContext, tasks: List[Task]) -> list:
+        if ctx.pool is None:
+            return [run_task(ctx.world, task) for task in tasks]
+        remaining = ctx.plan.deadline.remaining()
+        return ctx.pool.map(tasks, None if remaining == math.inf else max(0.0, remaining))
+
+    # слияние результатов пула в порядке задач: путь обрезается по очкам
+    # хода и перед клетками, которые уже заняли муравьи, слитые раньше
+    def _merge(self, ctx: TurnContext, moves) -> None:
+        world = ctx.world
+        for ant_id, path, profile in moves:
+            if path is None:
+                ctx.plan.defer(ant_id)
+                continue
+            path = world.pathfinder.clip(path, profile)
+            self._move(ctx, ant_id, resolve(world, ant_id, path))
+
+    # ------------------------------------------------------ экстренная оборона
+    def _plan_defence(self, ctx: TurnContext) -> None:
+        focus, home_threat = ctx.influence.hottest(HexMath.spiral(ctx.nest, DEFENCE_RADIUS))
+        if home_threat < DEFENCE_THREAT:
+            return
+        for f in ctx.fighters:
+            if self._due(ctx, f.id):
+                continue
+            path = self.plan_path(ctx.world, f.position, focus, UNIT_SPEED[1], f.health, f.id)
+            self._move(ctx, f.id, path)
 
-        # ------------------------------------------------------ бойцы: пары
+    # ------------------------------------------------------ рабочие с грузом
+    # обратное поле до муравейника — точная цена и путь возврата
+    def _plan_laden(self, ctx: TurnContext) -> None:
+        for w in ctx.workers:
+            wid = w.id
+            if w.food_amount <= 0 or self._due(ctx, wid):
+                continue
+            profile = ctx.profiles[wid]
+            path = ctx.world.fields.nest(profile).path_from(w.position)
+            self._move(ctx, wid, ctx.world.pathfinder.clip(path, profile))
+
+    # ------------------------------------------------------ бойцы: эскорт / патруль / пары
+    def _plan_fighters(self, ctx: TurnContext) -> None:
+        world, influence, fighters = ctx.world, ctx.influence, ctx.fighters
         pair_targets: Dict[str, Tuple[int, int]] = {}
-        if fighters:
-            lead = fighters[0::2]
-            wing = fighters[1::2]
-            for l, w in zip(lead, wing):
-                pair_targets[w["id"]] = (l["q"], l["r"])  # ведомый тянется к лидеру
-
-        # ------------------------------------------------------ экстренная оборона
-        if enemy_near:
-            focus = self._closest(nest, enemy_near)
-            for f in fighters:
-                path = self.plan_path(world, (f["q"], f["r"]), focus, UNIT_SPEED[1], f["health"])
-                if path:
-                    moves.append({"ant": f["id"], "path": [{"q": q, "r": r} for q, r in path]})
-                    self.idle[f["id"]] = 0
-        # ------------------------------------------------------ бойцы: эскорт / патруль / пары
-        laden = [(w["q"], w["r"]) for w in workers if w.get("food", {}).get("amount", 0) > 0]
-        ring = [(nest[0] + dq*2, nest[1] + dr*2) for dq,dr in NEIGHBORS]
+        lead = fighters[0::2]
+        wing = fighters[1::2]
+        for l, w in zip(lead, wing):
+            pair_targets[w.id] = l.position  # ведомый тянется к лидеру
+
+        laden = [w.position for w in ctx.workers if w.food_amount > 0]
+        # рабочие с грузом под угрозой, не прикрытой своими, — в первую очередь
+        threatened = [c for c in laden if influence.pressure(c) > 0]
+        ring = HexMath.ring(ctx.nest, 2)
         for f in fighters:
-            fid, pos, hp = f["id"], (f["q"], f["r"]), f["health"]
+            fid, pos, hp = f.id, f.position, f.health
+            if fid in ctx.plan.planned or self._due(ctx, fid):
+                continue
             tgt = pair_targets.get(fid)
+            if not tgt and threatened:
+                tgt = max(threatened, key=lambda c: (influence.pressure(c), -hex_distance(pos, c)))
             if not tgt:
-                tgt = self._closest(pos, laden) or self._closest(pos, ring)
-            path = self.plan_path(world, pos, tgt, UNIT_SPEED[1], hp)
-            if path:
-                moves.append({"ant": fid, "path": [{"q": q, "r": r} for q, r in path]})
-                self.idle[fid] = 0
-
-        # ------------------------------------------------------ workers: ETA-scoring
-        for w in workers:
-            wid, pos, hp = w["id"], (w["q"], w["r"]), w["health"]
-            carrying = w.get("food", {}).get("amount", 0) > 0
-            if carrying:
-                tgt = nest
-            else:
-                best_score, tgt = -1, None
-                for q,r,cal,_t in foods:
-                    cell = (q,r)
-                    if cell in reserved:
-                        continue
-                    path = self.plan_path(world, pos, cell, UNIT_SPEED[0], hp)
-                    if not path:
-                        continue
-                    trip = self._path_cost(world, path) + hex_distance(cell, nest)  # back cost по прямой
-                    score = cal/ trip
-                    if score > best_score:
-                        best_score, tgt = score, cell
-                if tgt:
-                    reserved.add(tgt)
-            if not carrying and tgt is None:
-                tgt = self._closest(pos, list(world.unexplored_frontier()))
-            path = self.plan_path(world, pos, tgt, UNIT_SPEED[0], hp)
-            if path:
-                moves.append({"ant": wid, "path": [{"q": q, "r": r} for q, r in path]})
-                self.idle[wid] = 0
-
-        # ------------------------------------------------------ scouts: секторы по азимуту
-        frontier = list(world.unexplored_frontier())
-        if frontier and scouts:
-            for s in scouts:
-                sid, pos, hp = s["id"], (s["q"], s["r"]), s["health"]
-                idx = scouts.index(s)  # 0..n
-                angle_sector = idx % 6  # 60° сектор
-                sector_cells = [c for c in frontier if (math.atan2(c[1]-nest[1], c[0]-nest[0])%(2*math.pi)) // (math.pi/3) == angle_sector]
-                tgt = self._closest(pos, sector_cells) or random.choice(frontier)
-                path = self.plan_path(world, pos, tgt, UNIT_SPEED[2], hp)
-                if path:
-                    moves.append({"ant": sid, "path": [{"q": q, "r": r} for q, r in path]})
-                    self.idle[sid] = 0
-
-        # ------------------------------------------------------ idle fallback
-        active = {m["ant"] for m in moves}
-        for a in ants:
-            aid = a["id"]
-            if aid in active:
+                tgt = self._closest(pos, laden)
+            if not tgt:
+                # патруль: точка кольца, где угроза и нужда в эскорте выше
+                tgt = max(ring, key=lambda c: (
+                    influence.threat(c) + influence.escort(c), -hex_distance(pos, c)
+                ))
+            self._move(ctx, fid, self.plan_path(world, pos, tgt, UNIT_SPEED[1], hp, fid))
+
+    # ------------------------------------------------------ workers: ETA-scoring
+    # Поля расстояний вместо A* на каждую пару «рабочий × ресурс» и
+    # глобальное назначение рабочих на ресурсы (калории за ход пути
+    # туда и обратно) вместо жадного выбора по порядку списка.
+    def _plan_workers(self, ctx: TurnContext) -> None:
+        world = ctx.world
+        free = [w for w in ctx.workers if w.food_amount <= 0]
+        if not free:
+            return
+        if ctx.plan.expired():
+            for w in free:
+                ctx.plan.defer(w.id)
+            return
+        with span("plan.assign"):
+            targets = self._assign_food(ctx, free)
+        if ctx.pool is not None:
+            # без назначенного ресурса — к ближайшему фронтиру, одной пачкой
+            todo = [w for w in free if not self._due(ctx, w.id)]
+            missing = [w for w in todo if w.id not in targets]
+            tasks = [Task("any", w.id, w.position, ctx.profiles[w.id], None, None) for w in missing]
+            for w, path in zip(missing, self._run(ctx, tasks)):
+                targets[w.id] = path
+            self._merge(ctx, [(w.id, targets[w.id], ctx.profiles[w.id]) for w in todo])
+            return
+        for w in free:
+            wid, pos, hp = w.id, w.position, w.health
+            if self._due(ctx, wid):
+                continue
+            path = targets.get(wid)
+            if path is None:
+                path = self.plan_to_any(world, pos, world.frontier, UNIT_SPEED[0], hp, wid)
+            self._move(ctx, wid, world.pathfinder.clip(path, ctx.profiles[wid]))
+
+    # ------------------------------------------------------ scouts: секторы по азимуту
+    # фронтир уже разложен по секторам вокруг муравейника
+    def _plan_scouts(self, ctx: TurnContext) -> None:
+        world = ctx.world
+        frontier = world.frontier
+        if not len(frontier):
+            return
+        if ctx.pool is not None:
+            tasks = [
+                Task("any", s.id, s.position, CostProfile.for_ant(s.health, UNIT_SPEED[2]), None, idx % 6)
+                for idx, s in enumerate(ctx.scouts)
+                if not self._due(ctx, s.id)
+            ]
+            results = self._run(ctx, tasks)
+            self._merge(ctx, [(t.ant_id, path, t.profile) for t, path in zip(tasks, results)])
+            return
+        for idx, s in enumerate(ctx.scouts):
+            sid, pos, hp = s.id, s.position, s.health
+            if self._due(ctx, sid):
+                continue
+            angle_sector = idx % 6  # 60° сектор
+            path = self.plan_to_any(world, pos, frontier, UNIT_SPEED[2], hp, sid, angle_sector)
+            if not path:
+                # в своём секторе достижимых клеток нет — любой фронтир
+                path = self.plan_to_any(world, pos, frontier, UNIT_SPEED[2], hp, sid)
+            self._move(ctx, sid, path)
+
+    # ------------------------------------------------------ idle fallback
+    def _plan_idle(self, ctx: TurnContext) -> None:
+        plan = ctx.plan
+        tasks: List[Task] = []
+        for a in ctx.world.ants:
+            aid = a.id
+            if aid in plan.planned or aid in plan.deferred:
                 continue
             self.idle[aid] = self.idle.get(aid, 0) + 1
-            if self.idle[aid] >= IDLE_LIMIT:
-                pos = (a["q"], a["r"])
-                tgt = self._closest(pos, list(world.unexplored_frontier()))
-                path = self.plan_path(world, pos, tgt, UNIT_SPEED[a["type"]], a["health"])
-                if path:
-                    moves.append({"ant": aid, "path": [{"q": q, "r": r} for q, r in path]})
-                    self.idle[aid] = 0
+            if self.idle[aid] >= IDLE_LIMIT and not self._due(ctx, aid):
+                if ctx.pool is not None:
+                    profile = CostProfile.for_ant(a.health, UNIT_SPEED[a.type])
+                    tasks.append(Task("any", aid, a.position, profile, None, None))
+                    continue
+                path = self.plan_to_any(
+                    ctx.world, a.position, ctx.world.frontier, UNIT_SPEED[a.type], a.health, aid
+                )
+                self._move(ctx, aid, path)
+        if tasks:
+            results = self._run(ctx, tasks)
+            self._merge(ctx, [(t.ant_id, path, t.profile) for t, path in zip(tasks, results)])
 
-        return moves
+    # --------------------------------------------------------- workers
+    def _assign_food(self, ctx: TurnContext, free: List[AntView]) -> Dict[str, HexPath]:
+        """Пути свободных рабочих к назначенным им ресурсам: id → путь.
+
+        Рабочие с одинаковым профилем стоимости делят поля: одно обратное
+        поле до муравейника и по полю на рабочего либо на ресурс — в
+        зависимости от того, кого меньше. Ресурсы под угрозой врагов
+        ценятся ниже. Поля на рабочего / ресурс — независимые задачи
+        (в параллельном режиме уходят в пул).
+        """
+        foods, profiles = ctx.foods, ctx.profiles
+        if not free or not foods:
+            return {}
+        fields = ctx.world.fields
+        food_cells = [(q, r) for q, r, _cal, _t in foods]
+        cells = [w.position for w in free]
+        groups: Dict[tuple, List[int]] = {}
+        for i, w in enumerate(free):
+            groups.setdefault(profiles[w.id].key, []).append(i)
+
+        there: List[List[float]] = [[]] * len(free)
+        back: List[List[float]] = [[]] * len(free)
+        per_food: Dict[int, bool] = {}
+        for idx in groups.values():
+            profile = profiles[free[idx[0]].id]
+            home = fields.nest(profile).distances(food_cells)
+            group_cells = [cells[i] for i in idx]
+            by_food = len(food_cells) < len(idx)
+            unreachable = [math.inf] * (len(group_cells) if by_food else len(food_cells))
+            if by_food:
+                tasks = [Task("to", None, None, profile, group_cells, cell) for cell in food_cells]
+                columns = [col or unreachable for col in self._run(ctx, tasks)]
+                rows = [list(row) for row in zip(*columns)]
+            else:
+                tasks = [Task("from", free[i].id, cells[i], profile, food_cells, None) for i in idx]
+                rows = [row or unreachable for row in self._run(ctx, tasks)]
+            for i, row in zip(idx, rows):
+                there[i], back[i], per_food[i] = row, home, by_food
+
+        calories = [
+            cal / (1 + ctx.influence.threat((q, r)) / WORKER_THREAT_SCALE) for q, r, cal, _t in foods
+        ]
+        cost = build_cost_matrix(there, back, calories)
+        pairs = assign(cost)
+        tasks = []
+        for i, f in pairs:
+            w, tgt = free[i], food_cells[f]
+            profile = profiles[w.id]
+            if per_food[i]:
+                group_cells = [cells[j] for j in groups[profile.key]]
+                tasks.append(Task("path_from", None, cells[i], profile, group_cells, tgt))
+            else:
+                tasks.append(Task("path_to", w.id, cells[i], profile, food_cells, tgt))
+        return {
+            free[i].id: path
+            for (i, _f), path in zip(pairs, self._run(ctx, tasks))
+            if path is not None
+        }
 
 
 # экспорт
 smart = SmartStrategy()
-STRATEGIES = {smart.name: smart}
\ No newline at end of file
+STRATEGIES = {smart.name: smart}
+
+
+def make_strategy(name: str):
+    """Новый экземпляр стратегии со своим состоянием — для нескольких
+    ботов в одном процессе (STRATEGIES хранит общие экземпляры)."""
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown STRAT='{name}'. Available: {', '.join(STRATEGIES)}")
+    return type(STRATEGIES[name])()
\ No newline at end of file
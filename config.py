@@ -1,7 +1,9 @@
+import os
+
 # Конфигурация API
-API_URL = "https://games-test.datsteam.dev"  # Тестовый сервер
+API_URL = os.getenv("API_URL", "https://games-test.datsteam.dev")  # Тестовый сервер
 # API_URL = "https://games.datsteam.dev"  # Боевой сервер
-API_TOKEN = "de91dd2e-c345-4efb-8ff0-254773ec7c33"
+API_TOKEN = os.getenv("API_TOKEN", "de91dd2e-c345-4efb-8ff0-254773ec7c33")
 
 # Константы типов
 ANT_TYPES = {
@@ -32,3 +34,52 @@ MOVE_COSTS = {
     4: 1,   # acid
     5: float('inf')  # stones (непроходимо)
 }
+
+# Поиск пути
+PATH_QUEUE = "bucket"  # очередь A*: "heap" | "bucket" | "indexed"
+PATH_CACHE_SIZE = 4096  # записей в LRU-кеше путей
+INCREMENTAL_REPLANNING = False  # D* Lite на муравья вместо A* с нуля каждый ход
+HIERARCHICAL_PATHFINDING = True  # HPA* для дальних маршрутов
+HPA_CLUSTER_SIZE = 10   # сторона кластера HPA* в гексах
+HPA_MIN_DISTANCE = 40   # с какого расстояния запрос идёт через HPA*
+DENSE_GRID = True       # плотный NumPy-бэкенд карты (если NumPy установлен)
+
+# Назначение рабочих на ресурсы
+ASSIGN_TIME_BUDGET = 0.05  # с на венгерский алгоритм, дальше — жадное назначение
+
+# Карта влияния
+INFLUENCE_RADIUS = 6    # на сколько шагов распространяется влияние юнита
+INFLUENCE_DECAY = 0.7   # множитель за каждый шаг пути
+
+# Планирование хода
+PLAN_SAFETY_MARGIN = 0.05  # с, запас до конца хода после отправки ходов
+PLAN_MIN_BUDGET = 0.02     # с, минимум на расчёт, даже если ход почти истёк
+# процессов для параллельного планирования (0/1 — без пула); env PLAN_WORKERS
+PLAN_WORKERS = int(os.getenv("PLAN_WORKERS", "0"))
+PLAN_USAGE_DECAY = 0.5     # затухание учёта времени расчёта ботов (FairGate)
+
+# Опрос арены
+POLL_LEAD = 0.05          # с, за сколько до ожидаемой границы хода начинать опрос
+POLL_MIN_INTERVAL = 0.05  # с, пауза между опросами у границы хода
+
+# Транспорт API
+API_RATE_LIMIT = 3        # запросов в секунду на старте (документированный лимит)
+API_RATE_LIMIT_MAX = 5    # выше этого бакет скорость не поднимает
+API_RETRIES = 3           # повторов на сетевые ошибки, 429 и 5xx
+API_BACKOFF = 0.05        # с, база экспоненциальной паузы между повторами
+API_TIMEOUT = 5.0         # с, общий таймаут запроса
+
+# Запись игр для офлайн-прогона (benchmarks/replay.py); пусто — не писать
+RECORD_DIR = os.getenv("RECORD_DIR", "")
+
+# Несколько ботов в одном процессе (multi_bot.py)
+API_TOKENS = [t for t in os.getenv("API_TOKENS", "").split(",") if t]  # токены аккаунтов
+MULTI_POOL_LIMIT = 64     # соединений в общем пуле aiohttp
+MULTI_PLAN_SLOTS = 4      # одновременных расчётов ходов на все боты
+
+# Трассировка фаз хода (core/tracing.py); выключена — почти бесплатна
+TRACE = os.getenv("TRACE", "") not in ("", "0")
+TRACE_FILE = os.getenv("TRACE_FILE", "")  # Chrome trace JSON по завершении (chrome://tracing, Perfetto)
+TRACE_WINDOW = 500         # последних замеров на фазу для перцентилей
+TRACE_MAX_EVENTS = 200_000  # событий в памяти для экспорта (старые вытесняются)
+TRACE_SUMMARY_EVERY = 50   # ходов между сводками в лог
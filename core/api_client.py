@@ -1,73 +1,195 @@
 import aiohttp
 import asyncio
-from config import API_URL, API_TOKEN
+import random
+import time
+from config import (
+    API_BACKOFF,
+    API_RATE_LIMIT,
+    API_RATE_LIMIT_MAX,
+    API_RETRIES,
+    API_TIMEOUT,
+    API_TOKEN,
+    API_URL,
+)
+from core.hex_path import MoveBatch
+from core.rate_limit import TokenBucket
+from core.tracing import span
+from utils import json_codec
 
 import logging
 
+# статусы, после которых запрос стоит повторить
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def make_session(limit: int = 8) -> aiohttp.ClientSession:
+    """Сессия с keep-alive соединениями и кешем DNS. Одну сессию (и пул
+    соединений) могут делить несколько клиентов с разными токенами."""
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        keepalive_timeout=30,
+        use_dns_cache=True,
+        ttl_dns_cache=300,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=API_TIMEOUT),
+    )
+
+
 class APIClient:
-    def __init__(self):
-        self.session = None
+    def __init__(self, token: str = API_TOKEN, session: aiohttp.ClientSession = None):
+        # чужая (общая) сессия клиентом не закрывается
+        self.session = session
+        self._own_session = session is None
         self.base_url = API_URL
-        self.headers = {"X-Auth-Token": API_TOKEN}
-        logging.info(f"APIClient headers: {self.headers}")
-        self.rate_limit = 3
-        self.last_request_time = 0
+        # токен — в заголовках каждого запроса: сессия может быть общей
+        self.headers = {"X-Auth-Token": token}
+        self._body_headers = {**self.headers, "Content-Type": "application/json"}
+        logging.info("APIClient: %s, json codec: %s", self.base_url, json_codec.NAME)
+        # лимит общий на аккаунт: один бакет на все эндпоинты
+        self.bucket = TokenBucket(API_RATE_LIMIT, max_rate=API_RATE_LIMIT_MAX)
+        self.retries = API_RETRIES
+        self.backoff = API_BACKOFF
+        # сглаженное время запроса туда-обратно, с (для бюджета планирования)
+        self.rtt = 0.0
+        self.rtt_alpha = 0.2
+        # счётчики транспорта (ожидание лимита — в self.bucket)
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.dropped = 0        # запросы, снятые по дедлайну хода
 
     async def connect(self):
-        """Инициализация сессии"""
-        self.session = aiohttp.ClientSession(
-            headers=self.headers,
-            timeout=aiohttp.ClientTimeout(total=5.0)
-        )
-    
+        """Инициализация сессии (если общая не передана в конструктор)"""
+        if self.session is None:
+            self.session = make_session()
+
     async def ensure_rate_limit(self):
-        """Соблюдение ограничения скорости запросов"""
-        current_time = asyncio.get_event_loop().time()
-        elapsed = current_time - self.last_request_time
-        if elapsed < 1 / self.rate_limit:
-            await asyncio.sleep(1 / self.rate_limit - elapsed)
-        self.last_request_time = asyncio.get_event_loop().time()
+        """Соблюдение ограничения скорости запросов (token bucket)"""
+        return await self.bucket.acquire()
 
+    def _observe_rtt(self, started: float):
+        """Учитывает длительность запроса в скользящем среднем RTT."""
+        elapsed = time.perf_counter() - started
+        self.rtt = elapsed if not self.rtt else self.rtt + self.rtt_alpha * (elapsed - self.rtt)
 
-    async def get_arena(self):
-        await self.ensure_rate_limit()
-        async with self.session.get(f"{self.base_url}/api/arena") as response:
-            text = await response.text()
-            logging.debug(f"GET /api/arena status={response.status}, body={text}")
-            if response.status == 200:
-                return await response.json()
-            return None
+    def metrics(self) -> dict:
+        """Снимок метрик транспорта."""
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "throttled": self.bucket.throttled,
+            "rate": self.bucket.rate,
+            "rate_waits": self.bucket.waits,
+            "rate_wait_time": self.bucket.wait_time,
+            "rtt": self.rtt,
+        }
+
+    async def _request(self, method: str, path: str, body: bytes = None, deadline: float = None):
+        """Запрос с лимитом, повторами и одним разбором тела.
 
-    async def post_move(self, moves):
-        """Отправка команд перемещения (POST /api/move)"""
-        await self.ensure_rate_limit()
-        payload = {"moves": moves}
-        async with self.session.post(
-            f"{self.base_url}/api/move",
-            json=payload
-        ) as response:
-            if response.status == 200:
-                return await response.json()
+        Повторяются сетевые ошибки, 429 и 5xx — с экспоненциальной паузой
+        и случайным разбросом. Возвращает разобранный JSON или None.
+
+        С ``deadline`` (момент time.perf_counter) запрос не переживает
+        его: таймаут попытки урезается до дедлайна, повтор, который не
+        успевает, не начинается, а после таймаута повтора нет — сервер мог
+        уже принять тело.
+        """
+        headers = self.headers if body is None else self._body_headers
+        url = f"{self.base_url}{path}"
+        timeout = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                pause = random.uniform(0, self.backoff * 2 ** attempt)
+                if deadline is not None and time.perf_counter() + pause >= deadline:
+                    break
+                self.retried += 1
+                await asyncio.sleep(pause)
+            with span("api.rate_wait"):
+                await self.ensure_rate_limit()
+            if deadline is not None:
+                left = deadline - time.perf_counter()
+                if left <= 0:
+                    break
+                timeout = aiohttp.ClientTimeout(total=min(API_TIMEOUT, left))
+            self.requests += 1
+            started = time.perf_counter()
+            try:
+                with span("api.http", path=path, attempt=attempt):
+                    async with self.session.request(
+                        method, url, data=body, headers=headers, timeout=timeout
+                    ) as response:
+                        raw = await response.read()
+                        self._observe_rtt(started)
+                        status = response.status
+                        retry_after = response.headers.get("Retry-After")
+            except asyncio.TimeoutError:
+                logging.warning("%s %s timed out (attempt %d)", method, path, attempt + 1)
+                if deadline is not None:
+                    break
+                continue
+            except aiohttp.ClientError as exc:
+                logging.warning("%s %s failed: %r (attempt %d)", method, path, exc, attempt + 1)
+                continue
+
+            logging.debug("%s %s status=%d, %d bytes", method, path, status, len(raw))
+            if status == 200:
+                self.bucket.on_success()
+                if not raw:
+                    return None
+                with span("api.decode"):
+                    return json_codec.loads(raw)
+            if status == 429:
+                try:
+                    self.bucket.on_throttled(float(retry_after) if retry_after else None)
+                except ValueError:
+                    self.bucket.on_throttled()
+            if status not in RETRY_STATUSES:
+                logging.warning("%s %s status=%d: %s", method, path, status, raw[:200])
+                self.failures += 1
+                return None
+            logging.warning("%s %s status=%d (attempt %d)", method, path, status, attempt + 1)
+        else:
+            self.failures += 1
+            logging.error("%s %s: giving up after %d attempts", method, path, self.retries + 1)
             return None
+        self.dropped += 1
+        logging.warning("%s %s: dropped, deadline passed", method, path)
+        return None
+
+    async def get_arena(self):
+        with span("api.arena"):
+            return await self._request("GET", "/api/arena")
+
+    async def post_move(self, moves, deadline: float = None):
+        """Отправка команд перемещения (POST /api/move).
+
+        ``moves`` — MoveBatch (тело уже закодировано) или список словарей.
+        ``deadline`` — конец хода (time.perf_counter): позже ходы устарели
+        и не отправляются.
+        """
+        with span("api.move"):
+            with span("api.encode"):
+                if isinstance(moves, MoveBatch):
+                    body = moves.encode()
+                else:
+                    body = json_codec.dumps({"moves": moves})
+            return await self._request("POST", "/api/move", body, deadline)
 
     async def get_logs(self):
         """Получение логов (GET /api/logs)"""
-        await self.ensure_rate_limit()
-        async with self.session.get(f"{self.base_url}/api/logs") as response:
-            if response.status == 200:
-                return await response.json()
-            return None
+        return await self._request("GET", "/api/logs")
 
     async def register(self):
-        await self.ensure_rate_limit()
-        async with self.session.post(f"{self.base_url}/api/register") as response:
-            text = await response.text()
-            logging.info(f"POST /api/register status: {response.status}, body: {text}")
-            if response.status == 200:
-                return await response.json()
-            return None
+        data = await self._request("POST", "/api/register")
+        logging.info("POST /api/register: %s", data)
+        return data
 
     async def close(self):
-        """Закрытие сессии"""
-        if self.session:
+        """Закрытие сессии (только своей)"""
+        if self.session and self._own_session:
             await self.session.close()
@@ -0,0 +1,184 @@
+"""core/assignment.py — глобальное назначение рабочих на ресурсы.
+
+Вместо жадного выбора «по порядку списка» строится матрица стоимостей
+рабочий × ресурс (минус калории за ход пути туда и обратно) и решается
+задача о назначениях венгерским алгоритмом (O(n²·m), n ≤ m). Если решение
+не укладывается в бюджет времени, используется жадное назначение по
+отсортированным парам — оно дешевле и на больших задачах почти не хуже.
+
+NumPy опционален: без него те же алгоритмы работают на списках.
+"""
+from __future__ import annotations
+
+import math
+import time
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy опционален
+    np = None
+
+from config import ASSIGN_TIME_BUDGET
+
+Pair = Tuple[int, int]
+
+# замена inf для венгерского алгоритма. Стоимости — минус выигрыш (≤ 0),
+# поэтому недостижимая пара стоит столько же, сколько «не назначать»:
+# такие пары потом отбрасываются
+FORBIDDEN = 0.0
+
+
+def build_cost_matrix(there, back, calories: Sequence[float]):
+    """Матрица стоимостей W × F: ``-calories / (there + back)``.
+
+    ``there[w][f]`` — путь рабочего до ресурса, ``back[w][f]`` (или строка
+    на всех ``back[f]``) — путь от ресурса до муравейника. Недостижимые
+    пары — ``inf``.
+    """
+    if np is not None:
+        trip = np.asarray(there, dtype=np.float64) + np.asarray(back, dtype=np.float64)
+        cal = np.asarray(calories, dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            cost = -cal / np.maximum(trip, 1)
+        cost[~np.isfinite(trip)] = math.inf
+        return cost
+    rows = []
+    for w, row in enumerate(there):
+        back_row = back[w] if back and isinstance(back[0], (list, tuple)) else back
+        rows.append([
+            -cal / max(d + b, 1) if d + b != math.inf else math.inf
+            for d, b, cal in zip(row, back_row, calories)
+        ])
+    return rows
+
+
+def assign(cost, time_budget: float = ASSIGN_TIME_BUDGET) -> List[Pair]:
+    """Назначение минимальной суммарной стоимости (стоимости ≤ 0): список
+    пар (рабочий, ресурс), без недостижимых. Если венгерский алгоритм не
+    уложился в ``time_budget`` секунд — жадное назначение."""
+    rows = len(cost)
+    cols = len(cost[0]) if rows else 0
+    if not rows or not cols:
+        return []
+    deadline = time.perf_counter() + time_budget
+    # венгерский алгоритм требует строк не больше, чем столбцов
+    transposed = rows > cols
+    if np is not None:
+        matrix = np.asarray(cost, dtype=np.float64)
+        matrix = np.where(np.isfinite(matrix), matrix, FORBIDDEN)
+        if transposed:
+            matrix = matrix.T
+        pairs = _hungarian_np(matrix, deadline)
+    else:
+        matrix = [[c if c != math.inf else FORBIDDEN for c in row] for row in cost]
+        if transposed:
+            matrix = [list(col) for col in zip(*matrix)]
+        pairs = _hungarian(matrix, deadline)
+    if pairs is None:
+        return greedy(cost)
+    if transposed:
+        pairs = [(w, f) for f, w in pairs]
+    return sorted((w, f) for w, f in pairs if cost[w][f] != math.inf)
+
+
+def greedy(cost) -> List[Pair]:
+    """Жадное назначение: пары по возрастанию стоимости, каждый рабочий
+    и каждый ресурс — не больше одного раза."""
+    rows = len(cost)
+    cols = len(cost[0]) if rows else 0
+    if np is not None:
+        matrix = np.asarray(cost, dtype=np.float64)
+        flat = np.flatnonzero(np.isfinite(matrix))
+        order = flat[np.argsort(matrix.ravel()[flat], kind="stable")].tolist()
+    else:
+        order = sorted(
+            (w * cols + f for w in range(rows) for f in range(cols) if cost[w][f] != math.inf),
+            key=lambda i: cost[i // cols][i % cols],
+        )
+    limit = min(rows, cols)
+    used_w, used_f, pairs = set(), set(), []
+    for i in order:
+        w, f = divmod(i, cols)
+        if w in used_w or f in used_f:
+            continue
+        used_w.add(w)
+        used_f.add(f)
+        pairs.append((w, f))
+        if len(pairs) == limit:
+            break
+    return sorted(pairs)
+
+
+# ─────────────────────────────────────────────────────────────
+# Венгерский алгоритм (потенциалы, кратчайшие увеличивающие пути)
+# ─────────────────────────────────────────────────────────────
+def _hungarian(a: List[List[float]], deadline: float) -> Optional[List[Pair]]:
+    n, m = len(a), len(a[0])
+    inf = math.inf
+    u, v = [0.0] * (n + 1), [0.0] * (m + 1)
+    p, way = [0] * (m + 1), [0] * (m + 1)
+    for i in range(1, n + 1):
+        if time.perf_counter() > deadline:
+            return None
+        p[0], j0 = i, 0
+        minv, used = [inf] * (m + 1), [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0, delta, j1 = p[j0], inf, 0
+            row, ui = a[i0 - 1], u[i0]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - ui - v[j]
+                    if cur < minv[j]:
+                        minv[j], way[j] = cur, j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    return [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j]]
+
+
+def _hungarian_np(a: "np.ndarray", deadline: float) -> Optional[List[Pair]]:
+    """То же, что _hungarian, с векторным внутренним циклом по столбцам."""
+    n, m = a.shape
+    u, v = np.zeros(n + 1), np.zeros(m + 1)
+    p, way = np.zeros(m + 1, dtype=np.int64), np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        if time.perf_counter() > deadline:
+            return None
+        p[0], j0 = i, 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used
+            cur = a[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            j1 = int(np.argmin(np.where(free[1:], minv[1:], np.inf))) + 1
+            delta = minv[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    return [(int(p[j]) - 1, j - 1) for j in range(1, m + 1) if p[j]]
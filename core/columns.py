@@ -0,0 +1,300 @@
+"""core/columns.py — колоночное (struct-of-arrays) представление арены.
+
+Ответ /api/arena разбирается за один проход в типизированные массивы
+``array``: по колонке на поле (q, r, тип, здоровье, ...), переменные по
+длине поля (``move``, ``lastMove``) — плоским массивом со смещениями.
+Объекты на юнит не создаются: ``AntColumns`` / ``EnemyColumns`` /
+``FoodColumns`` сами ведут себя как последовательности и отдают лёгкие
+представления (``AntView``, ``EnemyView``, ``Food``) только по запросу.
+``TileMap`` — ленивая замена словаря ``world.tiles[(q, r)]["type"]``.
+
+Горячий код (индекс занятости, карта влияния) читает колонки напрямую.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from array import array
+from collections import namedtuple
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from core.hex_path import HexPath
+
+Cell = Tuple[int, int]
+
+Food = namedtuple("Food", ["q", "r", "type", "amount"])
+Tile = namedtuple("Tile", ["q", "r", "type", "cost"])
+
+
+class _Columns(ABC):
+    """Общая часть: длина и ленивая последовательность представлений."""
+
+    __slots__ = ()
+
+    def __len__(self) -> int:
+        return len(self.q)
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return self._view(i)
+
+    def __iter__(self):
+        return map(self._view, range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)})"
+
+    def cells(self) -> Iterator[Cell]:
+        """Координаты (q, r) по порядку, без создания представлений."""
+        return zip(self.q, self.r)
+
+    @abstractmethod
+    def _view(self, i: int):
+        """Представление строки ``i``."""
+
+
+# ────────────────────────────────────────────────────────────────────
+# Свои муравьи
+# ────────────────────────────────────────────────────────────────────
+class AntView:
+    """Муравей ``i`` в колонках; поля читаются из массивов при обращении."""
+
+    __slots__ = ("_cols", "_i")
+
+    def __init__(self, cols: "AntColumns", i: int):
+        self._cols = cols
+        self._i = i
+
+    @property
+    def id(self) -> str:
+        return self._cols.ids[self._i]
+
+    @property
+    def type(self) -> int:
+        return self._cols.type[self._i]
+
+    @property
+    def q(self) -> int:
+        return self._cols.q[self._i]
+
+    @property
+    def r(self) -> int:
+        return self._cols.r[self._i]
+
+    @property
+    def health(self) -> int:
+        return self._cols.health[self._i]
+
+    @property
+    def food_amount(self) -> int:
+        return self._cols.food_amount[self._i]
+
+    @property
+    def food(self) -> Dict[str, int]:
+        """Совместимость: ``{"type": .., "amount": ..}`` (создаётся на лету)."""
+        return {"type": self._cols.food_type[self._i], "amount": self._cols.food_amount[self._i]}
+
+    @property
+    def move(self) -> HexPath:
+        return self._cols.move.path(self._i)
+
+    @property
+    def last_move(self) -> HexPath:
+        return self._cols.last_move.path(self._i)
+
+    @property
+    def last_attack(self) -> Optional[Cell]:
+        cols, i = self._cols, self._i
+        return (cols.attack_q[i], cols.attack_r[i]) if cols.has_attack[i] else None
+
+    @property
+    def position(self) -> Cell:
+        """Координаты муравья (q, r) — требуются PathFinder-у."""
+        return self._cols.q[self._i], self._cols.r[self._i]
+
+    def __repr__(self) -> str:
+        return f"Ant(id={self.id!r}, type={self.type}, q={self.q}, r={self.r}, health={self.health})"
+
+
+class _Paths:
+    """Пути переменной длины: плоский ``array('h')`` и смещения по юнитам."""
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self):
+        self.data = array("h")
+        self.offsets = array("i", [0])
+
+    def append(self, cells) -> None:
+        data = self.data
+        for cell in cells:
+            data.append(cell["q"])
+            data.append(cell["r"])
+        self.offsets.append(len(data))
+
+    def path(self, i: int) -> HexPath:
+        return HexPath._wrap(self.data[self.offsets[i]:self.offsets[i + 1]])
+
+
+class AntColumns(_Columns):
+    __slots__ = (
+        "ids", "type", "q", "r", "health", "food_type", "food_amount",
+        "move", "last_move", "attack_q", "attack_r", "has_attack", "index",
+    )
+
+    def __init__(self, data: Iterable[Dict] = ()):
+        self.ids = []
+        self.type, self.q, self.r = array("b"), array("h"), array("h")
+        self.health, self.food_type, self.food_amount = array("i"), array("b"), array("i")
+        self.move, self.last_move = _Paths(), _Paths()
+        self.attack_q, self.attack_r, self.has_attack = array("h"), array("h"), array("b")
+        for ant in data:
+            self.ids.append(ant["id"])
+            self.type.append(ant["type"])
+            self.q.append(ant["q"])
+            self.r.append(ant["r"])
+            self.health.append(ant["health"])
+            food = ant.get("food") or {}
+            self.food_type.append(food.get("type", 0))
+            self.food_amount.append(food.get("amount", 0))
+            self.move.append(ant.get("move") or ())
+            self.last_move.append(ant.get("lastMove") or ())
+            attack = ant.get("lastAttack")
+            self.has_attack.append(1 if attack else 0)
+            self.attack_q.append(attack["q"] if attack else 0)
+            self.attack_r.append(attack["r"] if attack else 0)
+        # id → номер строки
+        self.index: Dict[str, int] = {ant_id: i for i, ant_id in enumerate(self.ids)}
+
+    def _view(self, i: int) -> AntView:
+        return AntView(self, i)
+
+    def get(self, ant_id: str) -> Optional[AntView]:
+        i = self.index.get(ant_id)
+        return None if i is None else AntView(self, i)
+
+    def of_type(self, ant_type: int) -> list:
+        return [AntView(self, i) for i, t in enumerate(self.type) if t == ant_type]
+
+
+# ────────────────────────────────────────────────────────────────────
+# Враги
+# ────────────────────────────────────────────────────────────────────
+class EnemyView:
+    __slots__ = ("_cols", "_i")
+
+    def __init__(self, cols: "EnemyColumns", i: int):
+        self._cols = cols
+        self._i = i
+
+    @property
+    def q(self) -> int:
+        return self._cols.q[self._i]
+
+    @property
+    def r(self) -> int:
+        return self._cols.r[self._i]
+
+    @property
+    def type(self) -> int:
+        return self._cols.type[self._i]
+
+    @property
+    def health(self) -> int:
+        return self._cols.health[self._i]
+
+    @property
+    def attack(self) -> int:
+        return self._cols.attack[self._i]
+
+    @property
+    def food(self) -> Dict[str, int]:
+        return {"type": self._cols.food_type[self._i], "amount": self._cols.food_amount[self._i]}
+
+    def __repr__(self) -> str:
+        return f"Enemy(q={self.q}, r={self.r}, type={self.type}, health={self.health})"
+
+
+class EnemyColumns(_Columns):
+    __slots__ = ("q", "r", "type", "health", "attack", "food_type", "food_amount")
+
+    def __init__(self, data: Iterable[Dict] = ()):
+        self.q, self.r, self.type = array("h"), array("h"), array("b")
+        self.health, self.attack = array("i"), array("i")
+        self.food_type, self.food_amount = array("b"), array("i")
+        for enemy in data:
+            self.q.append(enemy["q"])
+            self.r.append(enemy["r"])
+            self.type.append(enemy["type"])
+            self.health.append(enemy["health"])
+            self.attack.append(enemy.get("attack", 0))
+            food = enemy.get("food") or {}
+            self.food_type.append(food.get("type", 0))
+            self.food_amount.append(food.get("amount", 0))
+
+    def _view(self, i: int) -> EnemyView:
+        return EnemyView(self, i)
+
+
+# ────────────────────────────────────────────────────────────────────
+# Ресурсы и тайлы
+# ────────────────────────────────────────────────────────────────────
+class FoodColumns(_Columns):
+    __slots__ = ("q", "r", "type", "amount", "index")
+
+    def __init__(self, data: Iterable[Dict] = ()):
+        self.q, self.r, self.type, self.amount = array("h"), array("h"), array("b"), array("i")
+        for food in data:
+            self.q.append(food["q"])
+            self.r.append(food["r"])
+            self.type.append(food["type"])
+            self.amount.append(food["amount"])
+        # (q, r) → номер строки
+        self.index: Dict[Cell, int] = {cell: i for i, cell in enumerate(self.cells())}
+
+    def _view(self, i: int) -> Food:
+        return Food(self.q[i], self.r[i], self.type[i], self.amount[i])
+
+    def at(self, cell: Cell) -> Optional[Food]:
+        i = self.index.get(cell)
+        return None if i is None else self._view(i)
+
+
+class VisibleTiles(_Columns):
+    """Тайлы текущего хода: координаты колонками, сами Tile — из
+    постоянной карты (там они переиспользуются между ходами)."""
+
+    __slots__ = ("q", "r", "_known")
+
+    def __init__(self, known: Dict[Cell, Tile]):
+        self.q, self.r = array("h"), array("h")
+        self._known = known
+
+    def _view(self, i: int) -> Tile:
+        return self._known[(self.q[i], self.r[i])]
+
+
+class TileMap(Mapping):
+    """Совместимость: ``world.tiles[(q, r)]`` → ``{"type": .., "cost": ..}``
+    поверх постоянной карты; словари создаются только при обращении."""
+
+    __slots__ = ("_known",)
+
+    def __init__(self, known: Dict[Cell, Tile]):
+        self._known = known
+
+    def __getitem__(self, cell: Cell) -> Dict[str, int]:
+        tile = self._known[cell]
+        return {"type": tile.type, "cost": tile.cost}
+
+    def __contains__(self, cell) -> bool:
+        return cell in self._known
+
+    def __iter__(self) -> Iterator[Cell]:
+        return iter(self._known)
+
+    def __len__(self) -> int:
+        return len(self._known)
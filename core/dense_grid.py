@@ -0,0 +1,168 @@
+"""core/dense_grid.py — плотное NumPy-представление карты.
+
+Осевые координаты (q, r) отображаются в смещения плоских массивов
+(строка — r, столбец — q). Хранятся тип тайла, стоимость входа и
+занятость. Вокруг известной
+области всегда есть рамка неизвестных клеток, поэтому соседи по таблице
+смещений ``offsets`` никогда не выходят за пределы массива. При расширении
+карты массивы растут с запасом ``margin``.
+
+NumPy — опциональная зависимость: без него ``DenseGrid`` недоступен
+(``np is None``), и GameState работает только на словарях.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover — NumPy опционален
+    np = None
+
+from config import MOVE_COSTS
+from utils.hex_math import HexMath
+
+Cell = Tuple[int, int]
+
+UNKNOWN = 0
+MAX_TYPE = 8                # размер таблицы тип → стоимость
+
+
+class DenseGrid:
+    """Плотная сетка тайлов с автоматическим ростом."""
+
+    def __init__(self, margin: int = 16):
+        self.margin = margin
+        self.q0 = self.r0 = 0
+        self.width = self.height = 0
+        self.version = 0            # растёт при любом изменении типов тайлов
+        self.types = np.zeros(0, dtype=np.int8)
+        self.costs = np.zeros(0, dtype=np.float32)
+        self.occupancy = np.zeros(0, dtype=np.int16)
+        self.offsets = np.zeros(6, dtype=np.int64)
+        cost_lut = np.full(MAX_TYPE, np.inf, dtype=np.float32)
+        for hex_type, cost in MOVE_COSTS.items():
+            cost_lut[hex_type] = cost
+        self._cost_lut = cost_lut
+        self._flat_cache: Dict[tuple, List[float]] = {}
+
+    # ─────────────────────────────────────────────────────────────
+    # Индексация и рост
+    # ─────────────────────────────────────────────────────────────
+    @property
+    def size(self) -> int:
+        return self.width * self.height
+
+    def index(self, cell: Cell) -> int:
+        """Плоский индекс клетки; -1 — клетка вне сетки."""
+        col, row = cell[0] - self.q0, cell[1] - self.r0
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return row * self.width + col
+        return -1
+
+    def cell(self, idx: int) -> Cell:
+        row, col = divmod(idx, self.width)
+        return col + self.q0, row + self.r0
+
+    def indices(self, qs, rs):
+        """Векторный вариант index() для клеток внутри сетки.
+
+        Координаты приводятся к intp: колонки арены — array('h'), и в int16
+        плоский индекс переполнился бы уже на сетке шире 181×181.
+        """
+        rs = np.asarray(rs, dtype=np.intp)
+        qs = np.asarray(qs, dtype=np.intp)
+        return (rs - self.r0) * self.width + (qs - self.q0)
+
+    def ensure(self, q_min: int, q_max: int, r_min: int, r_max: int) -> None:
+        """Расширяет сетку так, чтобы вокруг прямоугольника оставалась рамка."""
+        if self.size and (
+            q_min - 1 >= self.q0 and q_max + 1 < self.q0 + self.width
+            and r_min - 1 >= self.r0 and r_max + 1 < self.r0 + self.height
+        ):
+            return
+        if self.size:
+            q_min, r_min = min(q_min, self.q0 + 1), min(r_min, self.r0 + 1)
+            q_max = max(q_max, self.q0 + self.width - 2)
+            r_max = max(r_max, self.r0 + self.height - 2)
+        q0, r0 = q_min - self.margin, r_min - self.margin
+        width = q_max - q_min + 1 + 2 * self.margin
+        height = r_max - r_min + 1 + 2 * self.margin
+
+        def grow(old, fill, dtype):
+            new = np.full((height, width), fill, dtype=dtype)
+            if self.size:
+                dq, dr = self.q0 - q0, self.r0 - r0
+                new[dr:dr + self.height, dq:dq + self.width] = old.reshape(self.height, self.width)
+            return new.ravel()
+
+        self.types = grow(self.types, UNKNOWN, np.int8)
+        self.costs = grow(self.costs, np.inf, np.float32)
+        self.occupancy = grow(self.occupancy, 0, np.int16)
+        self.q0, self.r0, self.width, self.height = q0, r0, width, height
+        self.offsets = np.array([dq + dr * width for dq, dr in HexMath.DIRECTIONS], dtype=np.int64)
+        self._flat_cache = {}
+
+    # ─────────────────────────────────────────────────────────────
+    # Запись состояния (вызывает GameState)
+    # ─────────────────────────────────────────────────────────────
+    def set_tiles(self, qs: Sequence[int], rs: Sequence[int], types: Sequence[int]) -> None:
+        """Записывает изменившиеся тайлы."""
+        if not len(qs):
+            return
+        qs, rs = np.asarray(qs), np.asarray(rs)
+        self.ensure(int(qs.min()), int(qs.max()), int(rs.min()), int(rs.max()))
+        idx = self.indices(qs, rs)
+        types = np.asarray(types, dtype=np.int8)
+        self.types[idx] = types
+        self.costs[idx] = self._cost_lut[types]
+        self.version += 1
+        self._flat_cache = {}
+
+    def set_occupancy(self, qs: Sequence[int], rs: Sequence[int]) -> None:
+        """Пересобирает счётчики юнитов в клетках (юниты вне сетки
+        игнорируются — там всё равно нет известных тайлов)."""
+        self.occupancy[:] = 0
+        if not len(qs):
+            return
+        qs, rs = np.asarray(qs), np.asarray(rs)
+        inside = (
+            (qs >= self.q0) & (qs < self.q0 + self.width)
+            & (rs >= self.r0) & (rs < self.r0 + self.height)
+        )
+        np.add.at(self.occupancy, self.indices(qs[inside], rs[inside]), 1)
+
+    # ─────────────────────────────────────────────────────────────
+    # Векторные запросы
+    # ─────────────────────────────────────────────────────────────
+    def step_costs(self, profile) -> "np.ndarray":
+        """Стоимость входа в каждую клетку по профилю (без учёта занятости)."""
+        lut = np.full(MAX_TYPE, np.inf, dtype=np.float32)
+        for hex_type, cost in profile.costs.items():
+            lut[hex_type] = cost
+        return lut[self.types]
+
+    def flat_step_costs(self, profile) -> List[float]:
+        """step_costs() в виде списка Python — для поисков по плоским
+        индексам без NumPy-скаляров. Кешируется до изменения карты."""
+        key = profile.key
+        costs = self._flat_cache.get(key)
+        if costs is None:
+            costs = self._flat_cache[key] = self.step_costs(profile).tolist()
+        return costs
+
+    def flat_known(self) -> List[bool]:
+        """Маска известных клеток списком Python (кешируется до изменения карты)."""
+        known = self._flat_cache.get("known")
+        if known is None:
+            known = self._flat_cache["known"] = (self.types != UNKNOWN).tolist()
+        return known
+
+    def offsets_list(self) -> List[int]:
+        return self.offsets.tolist()
+
+
+def make_dense_grid() -> Optional[DenseGrid]:
+    """DenseGrid, если доступен NumPy, иначе None."""
+    return DenseGrid() if np is not None else None
+
@@ -0,0 +1,319 @@
+"""core/distance_field.py — поля расстояний (многоисточниковая Дейкстра).
+
+Одно поле отвечает сразу на все запросы «сколько стоит дойти» от (или до)
+набора источников, поэтому вместо A* на каждую пару «муравей × цель»
+достаточно одного поиска на муравья или на цель:
+
+* прямое поле (``reverse=False``) — стоимость пути ИЗ источников в клетку;
+* обратное поле (``reverse=True``) — стоимость пути ИЗ клетки ДО ближайшего
+  источника, плюс направление следующего шага (flow field).
+
+Стоимость шага берётся из CostProfile тайла, в который входим. Неизвестные
+и заблокированные тайлы, а также занятые клетки не проходимы.
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.hex_path import HexPath
+from core.pathfinding import DEFAULT_PROFILE, CostProfile
+from utils.hex_math import HexMath
+
+FIELD_LIMIT = 20_000        # максимум раскрытых вершин на одно поле
+
+Cell = Tuple[int, int]
+
+
+class DistanceField:
+    """Поле стоимостей от набора источников.
+
+    Если у мира есть плотная сетка (``world.dense``), поиск идёт по плоским
+    индексам NumPy-массивов, иначе — по словарям с ключами (q, r). Внешний
+    API в обоих случаях принимает и возвращает клетки (q, r).
+    """
+
+    def __init__(
+        self,
+        world,
+        sources: Iterable[Cell],
+        *,
+        ant_id: Optional[str] = None,
+        profile: CostProfile = DEFAULT_PROFILE,
+        reverse: bool = False,
+        targets: Optional[Iterable[Cell]] = None,
+        limit: int = FIELD_LIMIT,
+    ):
+        self.world = world
+        self.ant_id = ant_id
+        self.profile = profile
+        self.reverse = reverse
+        self.sources = list(dict.fromkeys(sources))
+        # ключи — клетки (q, r) или плоские индексы плотной сетки
+        self.dist: Dict = {}
+        # для прямого поля — предыдущая вершина, для обратного — следующий шаг
+        self.parent: Dict = {}
+        self.expanded = 0
+        self._dense = world.dense
+        targets = set(targets) if targets is not None else None
+        if self._dense is not None:
+            self._run_dense(targets, limit)
+        else:
+            self._run(targets, limit)
+
+    # ─────────────────────────────────────────────────────────────
+    # Дейкстра по словарям
+    # ─────────────────────────────────────────────────────────────
+    def _step_cost(self, cell: Cell) -> float:
+        """Стоимость входа в клетку (inf — войти нельзя)."""
+        world = self.world
+        if world.is_occupied(cell, self.ant_id):
+            return math.inf
+        return self.profile.step_cost(world.get_hex_type(cell))
+
+    def _run(self, targets, limit: int) -> None:
+        world = self.world
+        dist, parent = self.dist, self.parent
+        frontier = world.pathfinder.queue_factory()
+        # в обратном поле источник — цель, в которую нужно войти; занятость
+        # целей не учитывается: муравьи обычно стоят на своём муравейнике
+        sources = set(self.sources)
+        for cell in sources:
+            dist[cell] = 0
+            frontier.put(cell, 0)
+
+        closed = set()
+        step_cost = self._step_cost
+        while not frontier.empty():
+            current = frontier.get()
+            if current in closed:
+                continue
+            closed.add(current)
+            self.expanded += 1
+            if self.expanded > limit:
+                break
+            if targets is not None:
+                targets.discard(current)
+                if not targets:
+                    break
+
+            base = dist[current]
+            if self.reverse:
+                # соседи входят в current: стоимость одна на всех
+                if current in sources:
+                    enter = self.profile.step_cost(world.get_hex_type(current))
+                else:
+                    enter = step_cost(current)
+                if enter == math.inf:
+                    continue
+            for cell in HexMath.neighbors(current):
+                if cell in closed:
+                    continue
+                if self.reverse:
+                    # из неизвестной клетки тоже можно выйти, но не войти в неё
+                    if not world.is_known(cell):
+                        continue
+                    new_cost = base + enter
+                else:
+                    cost = step_cost(cell)
+                    if cost == math.inf:
+                        continue
+                    new_cost = base + cost
+                if new_cost < dist.get(cell, math.inf):
+                    dist[cell] = new_cost
+                    parent[cell] = current
+                    frontier.put(cell, new_cost)
+
+    # ─────────────────────────────────────────────────────────────
+    # Дейкстра по плоским индексам плотной сетки
+    # ─────────────────────────────────────────────────────────────
+    def _run_dense(self, targets, limit: int) -> None:
+        world, dense = self.world, self._dense
+        costs = dense.flat_step_costs(self.profile)
+        known = dense.flat_known()
+        occupied = world.occupied_flat()
+        offsets = dense.offsets_list()
+        # клетки, зарезервированные чужими запланированными ходами
+        planned = {
+            dense.index(cell)
+            for cell, owner in world.planned_cells().items()
+            if owner != self.ant_id
+        }
+        own = -1
+        ant = world.get_ant_by_id(self.ant_id) if self.ant_id is not None else None
+        if ant is not None:
+            own = dense.index((ant.q, ant.r))
+        inf = math.inf
+
+        def step_cost(idx: int) -> float:
+            busy = occupied[idx] - (1 if idx == own else 0)
+            if busy > 0 or idx in planned:
+                return inf
+            return costs[idx]
+
+        dist, parent = self.dist, self.parent
+        frontier = world.pathfinder.queue_factory()
+        sources = set()
+        for cell in self.sources:
+            idx = dense.index(cell)
+            if idx < 0:
+                continue
+            sources.add(idx)
+            dist[idx] = 0
+            frontier.put(idx, 0)
+        if targets is not None:
+            targets = {dense.index(cell) for cell in targets}
+
+        closed = set()
+        reverse = self.reverse
+        while not frontier.empty():
+            current = frontier.get()
+            if current in closed:
+                continue
+            closed.add(current)
+            self.expanded += 1
+            if self.expanded > limit:
+                break
+            if targets is not None:
+                targets.discard(current)
+                if not targets:
+                    break
+
+            base = dist[current]
+            if reverse:
+                # в источник входим по цене рельефа, без учёта занятости
+                enter = costs[current] if current in sources else step_cost(current)
+                if enter == inf:
+                    continue
+            for offset in offsets:
+                nxt = current + offset
+                if nxt in closed:
+                    continue
+                if reverse:
+                    if not known[nxt]:
+                        continue
+                    new_cost = base + enter
+                else:
+                    cost = step_cost(nxt)
+                    if cost == inf:
+                        continue
+                    new_cost = base + cost
+                if new_cost < dist.get(nxt, inf):
+                    dist[nxt] = new_cost
+                    parent[nxt] = current
+                    frontier.put(nxt, new_cost)
+
+    # ─────────────────────────────────────────────────────────────
+    # Запросы
+    # ─────────────────────────────────────────────────────────────
+    def _node(self, cell: Cell):
+        return cell if self._dense is None else self._dense.index(cell)
+
+    def _cell(self, node) -> Cell:
+        return node if self._dense is None else self._dense.cell(node)
+
+    def distance(self, cell: Cell) -> float:
+        return self.dist.get(self._node(cell), math.inf)
+
+    def distances(self, cells: Iterable[Cell]) -> List[float]:
+        get, node = self.dist.get, self._node
+        return [get(node(c), math.inf) for c in cells]
+
+    def next_step(self, cell: Cell) -> Optional[Cell]:
+        """Следующая клетка по направлению к источнику (обратное поле)."""
+        if not self.reverse:
+            return None
+        nxt = self.parent.get(self._node(cell))
+        return None if nxt is None else self._cell(nxt)
+
+    def path_from(self, cell: Cell) -> HexPath:
+        """Путь из ``cell`` до источника по обратному полю (без ``cell``)."""
+        path: List[Cell] = []
+        node = self._node(cell)
+        if not self.reverse or node not in self.dist:
+            return HexPath()
+        while self.dist[node] > 0:
+            node = self.parent[node]
+            path.append(self._cell(node))
+        return HexPath(path)
+
+    def path_to(self, cell: Cell) -> HexPath:
+        """Путь от источника до ``cell`` по прямому полю (без источника)."""
+        path: List[Cell] = []
+        node = self._node(cell)
+        if self.reverse or node not in self.dist:
+            return HexPath()
+        while self.dist[node] > 0:
+            path.append(self._cell(node))
+            node = self.parent[node]
+        path.reverse()
+        return HexPath(path)
+
+
+class FieldService:
+    """Кеш полей на один ход: каждое поле строится один раз и
+    переиспользуется всеми запросами, пока не сменится ход или карта."""
+
+    def __init__(self, world):
+        self.world = world
+        self._stamp: Tuple[int, int] = (-1, -1)
+        self._fields: Dict[tuple, DistanceField] = {}
+
+    def _cache(self) -> Dict[tuple, DistanceField]:
+        stamp = (self.world.turn_no, self.world.map_version)
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._fields = {}
+        return self._fields
+
+    def stats(self) -> Dict[str, int]:
+        """Поля текущего хода и сколько вершин они раскрыли."""
+        return {
+            "fields": len(self._fields),
+            "expanded": sum(f.expanded for f in self._fields.values()),
+        }
+
+    def nest(self, profile: CostProfile = DEFAULT_PROFILE) -> DistanceField:
+        """Обратное поле до домашних клеток — точная стоимость возврата."""
+        cache = self._cache()
+        key = ("nest", profile.key)
+        field = cache.get(key)
+        if field is None:
+            home = [(h.q, h.r) for h in self.world.home] or [tuple(self.world.spot)]
+            field = cache[key] = DistanceField(
+                self.world, home, profile=profile, reverse=True
+            )
+        return field
+
+    def from_cell(
+        self,
+        cell: Cell,
+        ant_id: Optional[str] = None,
+        profile: CostProfile = DEFAULT_PROFILE,
+        targets: Optional[Iterable[Cell]] = None,
+    ) -> DistanceField:
+        """Прямое поле из клетки (обычно — позиции муравья)."""
+        cache = self._cache()
+        key = ("from", cell, ant_id, profile.key)
+        field = cache.get(key)
+        if field is None:
+            field = cache[key] = DistanceField(
+                self.world, [cell], ant_id=ant_id, profile=profile, targets=targets
+            )
+        return field
+
+    def to_cell(
+        self,
+        cell: Cell,
+        profile: CostProfile = DEFAULT_PROFILE,
+        targets: Optional[Iterable[Cell]] = None,
+    ) -> DistanceField:
+        """Обратное поле до клетки (обычно — ресурса)."""
+        cache = self._cache()
+        key = ("to", cell, profile.key)
+        field = cache.get(key)
+        if field is None:
+            field = cache[key] = DistanceField(
+                self.world, [cell], profile=profile, reverse=True, targets=targets
+            )
+        return field
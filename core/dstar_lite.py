@@ -0,0 +1,166 @@
+"""core/dstar_lite.py — инкрементальное перепланирование (D* Lite).
+
+Поиск идёт от цели к муравью, поэтому при смещении муравья и локальных
+изменениях карты (тип тайла, занятость) прошлые значения g/rhs остаются
+верными почти везде и досчитываются только вокруг изменённых клеток.
+Состояние планировщика живёт между ходами в HexPathfinder (по муравью).
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.hex_math import HexMath
+
+Cell = Tuple[int, int]
+
+
+class DStarLite:
+    """D* Lite на гекс-сетке со стоимостью входа в клетку."""
+
+    def __init__(self, goal: Cell, enter_cost: Callable[[Cell], float], limit: int):
+        self.goal = goal
+        self.enter_cost = enter_cost    # стоимость входа в клетку (inf — нельзя)
+        self.limit = limit
+        self.g: Dict[Cell, float] = {}
+        self.rhs: Dict[Cell, float] = {goal: 0}
+        self.km = 0
+        self.start: Optional[Cell] = None
+        self.expanded = 0
+        self._heap: List[tuple] = []
+        self._open: Dict[Cell, tuple] = {}
+        # стоимости входа меняются только в клетках из changed — между
+        # вызовами replan их можно помнить
+        self._costs: Dict[Cell, float] = {}
+
+    def _cost(self, cell: Cell) -> float:
+        cost = self._costs.get(cell)
+        if cost is None:
+            cost = self._costs[cell] = self.enter_cost(cell)
+        return cost
+
+    # ─────────────────────────────────────────────────────────────
+    # Очередь с ленивым удалением
+    # ─────────────────────────────────────────────────────────────
+    def _push(self, cell: Cell, key: tuple) -> None:
+        self._open[cell] = key
+        heapq.heappush(self._heap, (key, cell))
+
+    def _top(self):
+        heap, open_ = self._heap, self._open
+        while heap and open_.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    # ─────────────────────────────────────────────────────────────
+    # D* Lite
+    # ─────────────────────────────────────────────────────────────
+    def _key(self, cell: Cell) -> tuple:
+        best = min(self.g.get(cell, math.inf), self.rhs.get(cell, math.inf))
+        return (best + HexMath.distance(self.start, cell) + self.km, best)
+
+    def _update_vertex(self, cell: Cell) -> None:
+        """Полный пересчёт rhs по всем соседям и обновление очереди."""
+        g = self.g
+        if cell != self.goal:
+            best = math.inf
+            for nxt in HexMath.neighbors(cell):
+                cost = self._cost(nxt)
+                if cost != math.inf:
+                    cost += g.get(nxt, math.inf)
+                    if cost < best:
+                        best = cost
+            self.rhs[cell] = best
+        self._requeue(cell)
+
+    def _requeue(self, cell: Cell) -> None:
+        if self.g.get(cell, math.inf) != self.rhs.get(cell, math.inf):
+            self._push(cell, self._key(cell))
+        else:
+            self._open.pop(cell, None)
+
+    def _compute(self) -> bool:
+        """Досчитывает кратчайшие пути; False — упёрлись в лимит раскрытий."""
+        g, rhs, start, goal = self.g, self.rhs, self.start, self.goal
+        expanded = 0
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            start_key = self._key(start)
+            if top[0] >= start_key and rhs.get(start, math.inf) == g.get(start, math.inf):
+                break
+            expanded += 1
+            if expanded > self.limit:
+                self.expanded += expanded
+                return False
+
+            old_key, cell = top
+            new_key = self._key(cell)
+            if old_key < new_key:
+                self._push(cell, new_key)
+                continue
+            heapq.heappop(self._heap)
+            del self._open[cell]
+
+            # все соседи входят в cell по одной цене — это и даёт
+            # дешёвое O(1)-обновление rhs соседей в частом случае
+            enter = self._cost(cell)
+            if g.get(cell, math.inf) > rhs.get(cell, math.inf):
+                g[cell] = rhs[cell]
+                through = enter + g[cell]
+                for pred in HexMath.neighbors(cell):
+                    if pred != goal and through < rhs.get(pred, math.inf):
+                        rhs[pred] = through
+                        self._requeue(pred)
+            else:
+                old_through = enter + g.get(cell, math.inf)
+                g[cell] = math.inf
+                for pred in HexMath.neighbors(cell) + [cell]:
+                    if pred != goal and rhs.get(pred, math.inf) == old_through:
+                        self._update_vertex(pred)
+                    else:
+                        self._requeue(pred)
+        self.expanded += expanded
+        return True
+
+    def replan(self, start: Cell, changed: Iterable[Cell] = ()) -> List[Cell]:
+        """Путь от ``start`` до цели с учётом изменившихся клеток."""
+        changed = list(changed)
+        for cell in changed:
+            self._costs.pop(cell, None)
+        if self.start is None:
+            self.start = start
+            self._push(self.goal, self._key(self.goal))
+        else:
+            self.km += HexMath.distance(self.start, start)
+            self.start = start
+        # изменилась стоимость входа в cell → пересчитать всех, кто в неё входит;
+        # при g(cell) = inf ребро в cell ни на чей rhs не влияет
+        g = self.g
+        for cell in changed:
+            if g.get(cell, math.inf) == math.inf:
+                continue
+            for pred in HexMath.neighbors(cell):
+                self._update_vertex(pred)
+        # старт тоже мог стать «новой» вершиной — его rhs нужно знать
+        self._update_vertex(start)
+
+        if not self._compute() or self.g.get(start, math.inf) == math.inf:
+            return []
+        return self._extract(start)
+
+    def _extract(self, start: Cell) -> List[Cell]:
+        g, path, cell = self.g, [], start
+        while cell != self.goal:
+            best, nxt_cell = math.inf, None
+            for nxt in HexMath.neighbors(cell):
+                cost = self._cost(nxt)
+                if cost != math.inf and cost + g.get(nxt, math.inf) < best:
+                    best, nxt_cell = cost + g.get(nxt, math.inf), nxt
+            if nxt_cell is None or len(path) > len(g):
+                return []
+            path.append(nxt_cell)
+            cell = nxt_cell
+        return path
@@ -0,0 +1,140 @@
+"""core/frontier.py — постоянный фронтир разведки.
+
+Фронтир — неизвестные клетки, соседствующие с известными. Он не
+пересчитывается по всей карте, а обновляется только по впервые увиденным
+тайлам, поэтому стоимость обновления пропорциональна новой площади.
+Клетки заранее разложены по угловым секторам вокруг муравейника
+(см. HexMath.sector); отсортированные списки фронтира и секторов
+поддерживаются вставкой (bisect), а массивы для запросов по расстоянию
+кешируются до следующего изменения.
+"""
+from __future__ import annotations
+
+import bisect
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy опционален
+    np = None
+
+from utils.hex_math import BATCH_MIN, HexMath
+
+Cell = Tuple[int, int]
+
+SECTORS = 6
+
+
+def _remove(ordered: List[Cell], cell: Cell) -> None:
+    """Удаляет клетку из отсортированного списка (она там есть)."""
+    del ordered[bisect.bisect_left(ordered, cell)]
+
+
+class Frontier:
+    def __init__(self, sectors: int = SECTORS):
+        self.sectors = sectors
+        self.center: Optional[Cell] = None
+        self.cells: Set[Cell] = set()
+        self._buckets: List[Set[Cell]] = [set() for _ in range(sectors)]
+        # None — весь фронтир, иначе номер сектора → отсортированный список
+        self._ordered: Dict[Optional[int], List[Cell]] = {k: [] for k in (None, *range(sectors))}
+        # те же ключи → массив NumPy для запросов по расстоянию (None — нет)
+        self._arrays: Dict[Optional[int], object] = {}
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __contains__(self, cell: Cell) -> bool:
+        return cell in self.cells
+
+    # ─────────────────────────────────────────────────────────────
+    # Обновление
+    # ─────────────────────────────────────────────────────────────
+    def recenter(self, center: Cell) -> None:
+        """Задаёт центр секторов; при смене центра раскладывает заново."""
+        center = tuple(center)
+        if center == self.center:
+            return
+        self.center = center
+        self._buckets = [set() for _ in range(self.sectors)]
+        for cell in self.cells:
+            self._buckets[self._sector(cell)].add(cell)
+        self._ordered = {None: sorted(self.cells)}
+        for sector, bucket in enumerate(self._buckets):
+            self._ordered[sector] = sorted(bucket)
+        self._arrays = {}
+
+    def reveal(self, cells: Iterable[Cell], is_known: Callable[[Cell], bool]) -> None:
+        """Учитывает впервые увиденные клетки: они уходят из фронтира,
+        а их неизвестные соседи добавляются."""
+        touched: Set[Optional[int]] = set()
+        ordered = self._ordered
+        for cell in cells:
+            if cell in self.cells:
+                self.cells.discard(cell)
+                sector = self._sector(cell)
+                self._buckets[sector].discard(cell)
+                _remove(ordered[None], cell)
+                _remove(ordered[sector], cell)
+                touched.add(sector)
+            for nb in HexMath.neighbors(cell):
+                if nb not in self.cells and not is_known(nb):
+                    self.cells.add(nb)
+                    sector = self._sector(nb)
+                    self._buckets[sector].add(nb)
+                    bisect.insort(ordered[None], nb)
+                    bisect.insort(ordered[sector], nb)
+                    touched.add(sector)
+        if touched:
+            touched.add(None)
+            for key in touched:
+                self._arrays.pop(key, None)
+
+    def _sector(self, cell: Cell) -> int:
+        if self.center is None or cell == self.center:
+            return 0
+        return HexMath.sector(cell, self.center, self.sectors)
+
+    # ─────────────────────────────────────────────────────────────
+    # Запросы
+    # ─────────────────────────────────────────────────────────────
+    def _view(self, sector: Optional[int]) -> tuple:
+        key = None if sector is None else sector % self.sectors
+        cells = self._ordered[key]
+        if key in self._arrays:
+            return cells, self._arrays[key]
+        array = None
+        if np is not None and len(cells) >= BATCH_MIN:
+            array = np.asarray(cells, dtype=np.int64)
+        self._arrays[key] = array
+        return cells, array
+
+    def members(self, sector: Optional[int] = None) -> Set[Cell]:
+        """Множество клеток фронтира (или сектора) для проверок
+        принадлежности — живое, не изменять."""
+        return self.cells if sector is None else self._buckets[sector % self.sectors]
+
+    def sector(self, sector: int) -> List[Cell]:
+        """Клетки фронтира в секторе, по порядку (живой список, не изменять)."""
+        return self._view(sector)[0]
+
+    def all(self) -> List[Cell]:
+        """Весь фронтир отсортированным списком (живой список, не изменять)."""
+        return self._view(None)[0]
+
+    def nearest(self, point: Cell, sector: Optional[int] = None) -> Optional[Cell]:
+        """Ближайшая к point клетка фронтира (во всём фронтире или в секторе)."""
+        cells, array = self._view(sector)
+        if not cells:
+            return None
+        if array is None:
+            return HexMath.closest(point, cells)
+        return cells[int(np.argmin(HexMath.distance_matrix([point], array)[0]))]
+
+    def within(self, point: Cell, radius: int, sector: Optional[int] = None) -> List[Cell]:
+        """Клетки фронтира не дальше radius от point."""
+        cells, array = self._view(sector)
+        if array is None:
+            return [c for c in cells if HexMath.distance(point, c) <= radius]
+        mask = HexMath.distance_matrix([point], array)[0] <= radius
+        return [cells[i] for i in np.flatnonzero(mask)]
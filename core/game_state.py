@@ -4,42 +4,38 @@
 from __future__ import annotations
 
 from collections import namedtuple
-from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple, Set
 
-from core.pathfinding import HexPathfinder
+from config import DENSE_GRID
+from core.columns import (
+    AntColumns,
+    AntView,
+    EnemyColumns,
+    EnemyView,
+    Food,
+    FoodColumns,
+    Tile,
+    TileMap,
+    VisibleTiles,
+)
+from core.dense_grid import make_dense_grid
+from core.distance_field import FieldService
+from core.frontier import Frontier
+from core.pathfinding import CostProfile, HexPathfinder
+from core.tracing import span
 
 # ────────────────────────────────────────────────────────────────────
 # Структуры данных
 # ────────────────────────────────────────────────────────────────────
-
-@dataclass(slots=True)
-class Ant:
-    """Дружественный муравей."""
-
-    id: str
-    type: int  # 0 — worker, 1 — fighter, 2 — scout
-    q: int
-    r: int
-    health: int
-    food: Dict
-    last_move: List[Tuple[int, int]]
-    move: List[Tuple[int, int]]
-    last_attack: Optional[Tuple[int, int]]
-
-    @property
-    def position(self) -> Tuple[int, int]:
-        """Координаты муравья (q, r) — требуются PathFinder-у."""
-        return self.q, self.r
-
-
-Enemy = namedtuple("Enemy", [
-    "q", "r", "type", "health", "attack", "food"
-])
-Food = namedtuple("Food", ["q", "r", "type", "amount"])
-Tile = namedtuple("Tile", ["q", "r", "type", "cost"])
+# Юниты и ресурсы хранятся колонками (core/columns.py); Ant и Enemy —
+# ленивые представления строки колонок.
+Ant = AntView
+Enemy = EnemyView
 Hex = namedtuple("Hex", ["q", "r"])
 
+# идентификатор-заглушка для врагов в индексе занятости (у врагов нет id)
+ENEMY_ID = "enemy"
+
 
 class GameState:
     """Объект, инкапсулирующий всё состояние арены на текущем ходе."""
@@ -48,108 +44,102 @@ class GameState:
     # Инициализация / парсинг «сыра» от сервера
     # ────────────────────────────────────────────────────────────────
     def __init__(self, raw_data: Dict):
-        self.raw_data = raw_data
+        # Долгоживущая модель карты: объединение всех когда-либо виденных
+        # тайлов. Между ходами не пересоздаётся, а дополняется в update().
+        self._tile_by_position: Dict[Tuple[int, int], Tile] = {}
+        # совместимость: старые стратегии ожидают world.tiles[(q,r)]["type"]
+        self.tiles = TileMap(self._tile_by_position)
+        self._occupancy: Dict[Tuple[int, int], Tuple[str, ...]] = {}
+        self._planned = {}
+
+        # версия карты растёт при любом изменении тайлов; dirty_cells —
+        # клетки, изменившиеся (или впервые увиденные) на последнем ходе
+        self.map_version: int = 0
+        self.dirty_cells: Set[Tuple[int, int]] = set()
+        # впервые увиденные на последнем ходе клетки и фронтир разведки,
+        # который обновляется только по ним
+        self.revealed_cells: List[Tuple[int, int]] = []
+        self.frontier = Frontier()
+        # опциональный плотный NumPy-бэкенд карты (None без NumPy)
+        self.dense = make_dense_grid() if DENSE_GRID else None
+        self._occupied_flat: Optional[List[int]] = None
 
-        self.ants: List[Ant] = self._parse_ants()
-        self.enemies: List[Enemy] = self._parse_enemies()
-        self.food: List[Food] = self._parse_food()
-        self.home: List[Hex] = self._parse_home()
-        self.map_tiles: List[Tile] = self._parse_map()
-        self.spot: Hex = self._parse_spot()
+        self.pathfinder = HexPathfinder(self)
+        self.fields = FieldService(self)
+        with span("state.parse"):
+            self._ingest(raw_data)
+
+    def _ingest(self, raw_data: Dict) -> None:
+        """Разбирает очередной ответ /api/arena поверх уже известной карты.
+
+        Юниты и ресурсы разбираются в колонки за один проход; сам ответ
+        после разбора не хранится.
+        """
+        with span("state.units"):
+            self.ants = AntColumns(raw_data.get("ants", ()))
+            self.enemies = EnemyColumns(raw_data.get("enemies", ()))
+            self.food = FoodColumns(raw_data.get("food", ()))
+        self.home: List[Hex] = [Hex(h["q"], h["r"]) for h in raw_data.get("home", [])]
+        with span("state.map"):
+            self.map_tiles: VisibleTiles = self._parse_map(raw_data)
+        spot = raw_data.get("spot", {})
+        self.spot: Hex = Hex(spot.get("q", 0), spot.get("r", 0))
 
         self.next_turn_in: float = raw_data.get("nextTurnIn", 0)
         self.score: int = raw_data.get("score", 0)
         self.turn_no: int = raw_data.get("turnNo", 0)
 
-        # кеши для быстрого доступа
-        self._ant_by_id: Dict[str, Ant] = {ant.id: ant for ant in self.ants}
-        self._tile_by_position: Dict[Tuple[int, int], Tile] = {
-            (tile.q, tile.r): tile for tile in self.map_tiles
-        }
-        self._food_by_position: Dict[Tuple[int, int], Food] = {
-            (food.q, food.r): food for food in self.food
-        }
+        self._home_cells: Set[Tuple[int, int]] = {(h.q, h.r) for h in self.home}
+        with span("state.frontier"):
+            self.frontier.recenter((self.spot.q, self.spot.r))
+            self.frontier.reveal(self.revealed_cells, self.is_known)
 
-        self.pathfinder = HexPathfinder(self)
-        # совместимость: старые стратегии ожидают .tiles как dict координат→Tile
-        # для обратной совместимости старых стратегий, которые
-        # ожидают world.tiles[(q,r)]["type"]
-        self.tiles: Dict[Tuple[int, int], Dict[str, int]] = {
-            pos: {"type": tile.type, "cost": tile.cost}
-            for pos, tile in self._tile_by_position.items()
-        }
+        # клетки, чья стоимость входа могла измениться с прошлого хода:
+        # сменившие тип, а также занятые тогда или сейчас
+        with span("state.occupancy"):
+            changed = set(self.dirty_cells)
+            changed.update(self._occupancy, self._planned)
+            self._build_occupancy()
+            changed.update(self._occupancy)
+            self.pathfinder.on_world_update(self.dirty_cells, changed, self.ants.index)
 
     # ────────────────────────────────────────────────────────────────
-    # Low‑level парсеры «сыра»
+    # Разбор карты
     # ────────────────────────────────────────────────────────────────
-    def _parse_ants(self) -> List[Ant]:
-        ants: List[Ant] = []
-        for ant_data in self.raw_data.get("ants", []):
-            food_data = ant_data.get("food", {})
-            ant = Ant(
-                id=ant_data["id"],
-                type=ant_data["type"],
-                q=ant_data["q"],
-                r=ant_data["r"],
-                health=ant_data["health"],
-                food={
-                    "type": food_data.get("type", 0),
-                    "amount": food_data.get("amount", 0),
-                },
-                last_move=[(h["q"], h["r"]) for h in ant_data.get("lastMove", [])],
-                move=[(h["q"], h["r"]) for h in ant_data.get("move", [])],
-                last_attack=(
-                    ant_data["lastAttack"]["q"],
-                    ant_data["lastAttack"]["r"],
-                )
-                if ant_data.get("lastAttack")
-                else None,
+    def _parse_map(self, raw_data: Dict) -> VisibleTiles:
+        """Тайлы текущего хода; попутно вливает их в постоянную карту.
+
+        Неизменившиеся тайлы переиспользуют уже созданные объекты Tile,
+        а видимая область хранится двумя колонками координат, поэтому на
+        стабильной карте ход почти ничего не аллоцирует.
+        """
+        known = self._tile_by_position
+        dirty: Set[Tuple[int, int]] = set()
+        revealed: List[Tuple[int, int]] = []
+        visible = VisibleTiles(known)
+        vis_q, vis_r = visible.q, visible.r
+        for t in raw_data.get("map", []):
+            q, r = t["q"], t["r"]
+            pos = (q, r)
+            tile = known.get(pos)
+            if tile is None:
+                revealed.append(pos)
+            if tile is None or tile.type != t["type"] or tile.cost != t["cost"]:
+                known[pos] = Tile(q=q, r=r, type=t["type"], cost=t["cost"])
+                dirty.add(pos)
+            vis_q.append(q)
+            vis_r.append(r)
+
+        self.dirty_cells = dirty
+        self.revealed_cells = revealed
+        if dirty:
+            self.map_version += 1
+        if self.dense is not None and dirty:
+            changed = [known[pos] for pos in dirty]
+            self.dense.set_tiles(
+                [t.q for t in changed], [t.r for t in changed], [t.type for t in changed]
             )
-            ants.append(ant)
-        return ants
-
-    def _parse_enemies(self) -> List[Enemy]:
-        enemies: List[Enemy] = []
-        for enemy_data in self.raw_data.get("enemies", []):
-            food_data = enemy_data.get("food", {})
-            enemies.append(
-                Enemy(
-                    q=enemy_data["q"],
-                    r=enemy_data["r"],
-                    type=enemy_data["type"],
-                    health=enemy_data["health"],
-                    attack=enemy_data.get("attack", 0),
-                    food={
-                        "type": food_data.get("type", 0),
-                        "amount": food_data.get("amount", 0),
-                    },
-                )
-            )
-        return enemies
-
-    def _parse_food(self) -> List[Food]:
-        return [
-            Food(
-                q=f["q"],
-                r=f["r"],
-                type=f["type"],
-                amount=f["amount"],
-            )
-            for f in self.raw_data.get("food", [])
-        ]
-
-    def _parse_home(self) -> List[Hex]:
-        return [Hex(h["q"], h["r"]) for h in self.raw_data.get("home", [])]
-
-    def _parse_map(self) -> List[Tile]:
-        return [
-            Tile(q=t["q"], r=t["r"], type=t["type"], cost=t["cost"])
-            for t in self.raw_data.get("map", [])
-        ]
-
-    def _parse_spot(self) -> Hex:
-        spot = self.raw_data.get("spot", {})
-        return Hex(spot.get("q", 0), spot.get("r", 0))
+        return visible
 
     # ────────────────────────────────────────────────────────────────
     # Геттеры и helpers
@@ -159,60 +149,144 @@ class GameState:
         return tile.type if tile else 0
 
     def get_ant_by_id(self, ant_id: str) -> Optional[Ant]:
-        return self._ant_by_id.get(ant_id)
+        return self.ants.get(ant_id)
 
     def get_tile_at(self, q: int, r: int) -> Optional[Tile]:
         return self._tile_by_position.get((q, r))
 
     def get_food_at(self, q: int, r: int) -> Optional[Food]:
-        return self._food_by_position.get((q, r))
+        return self.food.at((q, r))
 
     def is_home_hex(self, q: int, r: int) -> bool:
-        return any(h.q == q and h.r == r for h in self.home)
+        return (q, r) in self._home_cells
 
     def get_visible_area(self) -> Set[Tuple[int, int]]:
-        return {(t.q, t.r) for t in self.map_tiles}
+        """Клетки, видимые на текущем ходе."""
+        return set(self.map_tiles.cells())
+
+    def get_known_area(self) -> Set[Tuple[int, int]]:
+        """Все клетки, которые когда-либо были видны."""
+        return set(self._tile_by_position)
+
+    def is_known(self, cell: Tuple[int, int]) -> bool:
+        return cell in self._tile_by_position
+
+    def known_tiles(self) -> Dict[Tuple[int, int], Tile]:
+        """Постоянная карта: клетка → Tile (не изменять)."""
+        return self._tile_by_position
 
     # ─── фильтры муравьев ─────────────────────────────────────────
     def get_workers(self) -> List[Ant]:
-        return [a for a in self.ants if a.type == 0]
+        return self.ants.of_type(0)
 
     def get_fighters(self) -> List[Ant]:
-        return [a for a in self.ants if a.type == 1]
+        return self.ants.of_type(1)
 
     def get_scouts(self) -> List[Ant]:
-        return [a for a in self.ants if a.type == 2]
+        return self.ants.of_type(2)
+
+    # ────────────────────────────────────────────────────────────────
+    # Индекс занятости клеток
+    # ────────────────────────────────────────────────────────────────
+    def _build_occupancy(self) -> None:
+        """Пересобирает на ход индекс клетка → id стоящих на ней юнитов."""
+        occupancy: Dict[Tuple[int, int], Tuple[str, ...]] = {}
+        for pos, ant_id in zip(self.ants.cells(), self.ants.ids):
+            occupancy[pos] = occupancy.get(pos, ()) + (ant_id,)
+        for pos in self.enemies.cells():
+            occupancy[pos] = occupancy.get(pos, ()) + (ENEMY_ID,)
+        self._occupancy = occupancy
+        # клетки, уже занятые запланированными на этот ход перемещениями
+        self._planned = {}
+        if self.dense is not None:
+            self.dense.set_occupancy([c[0] for c in occupancy], [c[1] for c in occupancy])
+            self._occupied_flat = None
+
+    def occupied_flat(self) -> List[int]:
+        """Занятость в плоских индексах DenseGrid (список, кешируется на ход)."""
+        if self._occupied_flat is None:
+            self._occupied_flat = self.dense.occupancy.tolist()
+        return self._occupied_flat
+
+    def occupied_cells(self) -> Dict[Tuple[int, int], Tuple[str, ...]]:
+        """Индекс занятости на ход: клетка → id юнитов (не изменять)."""
+        return self._occupancy
+
+    def occupants_at(self, cell: Tuple[int, int]) -> Tuple[str, ...]:
+        """id юнитов в клетке (враги — ENEMY_ID)."""
+        return self._occupancy.get(cell, ())
+
+    def is_occupied(
+        self,
+        cell: Tuple[int, int],
+        ant_id: Optional[str] = None,
+        exclude: Optional[Set[str]] = None,
+    ) -> bool:
+        """Занята ли клетка кем-то, кроме ``ant_id`` и юнитов из ``exclude``.
+
+        Учитываются и стоящие юниты, и клетки, зарезервированные
+        запланированными ходами (reserve_cell).
+        """
+        units = self._occupancy.get(cell)
+        if units is not None:
+            for unit_id in units:
+                if unit_id != ant_id and (exclude is None or unit_id not in exclude):
+                    return True
+        owner = self._planned.get(cell)
+        return (
+            owner is not None
+            and owner != ant_id
+            and (exclude is None or owner not in exclude)
+        )
+
+    def reserve_cell(self, cell: Tuple[int, int], ant_id: str) -> None:
+        """Помечает клетку как цель запланированного хода муравья."""
+        self._planned[cell] = ant_id
+
+    def planned_cells(self) -> Dict[Tuple[int, int], str]:
+        """Клетки, зарезервированные запланированными ходами: клетка → id."""
+        return self._planned
+
+    def release_cell(self, cell: Tuple[int, int], ant_id: Optional[str] = None) -> None:
+        if ant_id is None or self._planned.get(cell) == ant_id:
+            self._planned.pop(cell, None)
 
     # ────────────────────────────────────────────────────────────────
     # Прочее API
     # ────────────────────────────────────────────────────────────────
     def all_units(self) -> List:
         """Все юниты на карте (дружественные + враги)."""
-        return self.ants + self.enemies
+        return [*self.ants, *self.enemies]
 
     def update(self, raw_data: Dict):
-        """Полное обновление состояния (используется для simplicity)."""
-        self.__init__(raw_data)
+        """Инкрементальное обновление: юниты и еда перечитываются целиком,
+        карта дополняется только изменившимися тайлами."""
+        with span("state.update"):
+            self._ingest(raw_data)
 
     # ────────────────────────────────────────────────────────────────
     # Геометрия / разведка
     # ────────────────────────────────────────────────────────────────
     def unexplored_frontier(self) -> Set[Tuple[int, int]]:
-        """Клетки, соседствующие с видимыми, но пока не разведанные."""
-        visible = self.get_visible_area()
-        frontier: Set[Tuple[int, int]] = set()
-        directions = [(1, 0), (0, 1), (-1, 1), (-1, 0), (0, -1), (1, -1)]
-
-        for q, r in visible:
-            for dq, dr in directions:
-                neighbour = (q + dq, r + dr)
-                if neighbour not in visible:
-                    frontier.add(neighbour)
-        return frontier
+        """Клетки, соседствующие с известными, но пока не разведанные.
+
+        Копия постоянного фронтира; для запросов по расстоянию и секторам
+        используйте ``self.frontier`` напрямую.
+        """
+        return set(self.frontier.cells)
 
     # ────────────────────────────────────────────────────────────────
     # Path‑finding wrapper
     # ────────────────────────────────────────────────────────────────
-    def astar(self, start: Tuple[int, int], goal: Tuple[int, int], speed=None):
+    def astar(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        speed=None,
+        ant_id=None,
+        profile: Optional[CostProfile] = None,
+    ):
         """Упрощённая обёртка над HexPathfinder.find_path()"""
-        return self.pathfinder.find_path(start, goal)
+        if profile is None:
+            profile = CostProfile(horizon=speed)
+        return self.pathfinder.find_path(start, goal, ant_id, profile)
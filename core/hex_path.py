@@ -0,0 +1,130 @@
+"""core/hex_path.py — компактные пути и пакет ходов для /api/move.
+
+``HexPath`` хранит путь в ``array('h')`` (q и r подряд) вместо списка
+кортежей и ведёт себя как неизменяемая последовательность клеток (q, r):
+индекс, срез, итерация, ``index``/``in``, сравнение со списком.
+
+``MoveBatch`` собирает тело POST /api/move сразу в байты — без
+промежуточных словарей ``{"q": q, "r": r}`` на каждую клетку. Формат на
+проводе прежний: ``{"moves": [{"ant": id, "path": [{"q": .., "r": ..}]}]}``.
+"""
+from __future__ import annotations
+
+from array import array
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy опционален
+    np = None
+
+from utils import json_codec
+
+Cell = Tuple[int, int]
+
+
+class HexPath:
+    """Путь как плоский ``array('h')``: q0, r0, q1, r1, ..."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, cells: Iterable[Cell] = ()):
+        if isinstance(cells, HexPath):
+            self._data = array("h", cells._data)
+        else:
+            self._data = array("h", chain.from_iterable(cells))
+
+    @classmethod
+    def _wrap(cls, data: array) -> "HexPath":
+        path = cls.__new__(cls)
+        path._data = data
+        return path
+
+    def __len__(self) -> int:
+        return len(self._data) >> 1
+
+    def __bool__(self) -> bool:
+        return bool(self._data)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return HexPath(list(self)[item])
+            return self._wrap(self._data[2 * start:2 * max(start, stop)])
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("HexPath index out of range")
+        return self._data[2 * item], self._data[2 * item + 1]
+
+    def __iter__(self) -> Iterator[Cell]:
+        it = iter(self._data)
+        return zip(it, it)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, HexPath):
+            return self._data == other._data
+        try:
+            return list(self) == [tuple(c) for c in other]
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __contains__(self, cell) -> bool:
+        return any(c == cell for c in self)
+
+    def index(self, cell: Cell) -> int:
+        for i, c in enumerate(self):
+            if c == cell:
+                return i
+        raise ValueError(f"{cell} is not in path")
+
+    def __repr__(self) -> str:
+        return f"HexPath({list(self)})"
+
+    def to_numpy(self):
+        """Массив int16 формы (n, 2) — копия без разбора на кортежи."""
+        if np is None:
+            raise RuntimeError("NumPy is not installed")
+        return np.frombuffer(self._data, dtype=np.int16).reshape(-1, 2).copy()
+
+    def to_json(self) -> bytes:
+        """Путь в формате /api/move: ``[{"q":..,"r":..}, ...]``."""
+        it = iter(self._data)
+        return b"[" + b",".join(b'{"q":%d,"r":%d}' % qr for qr in zip(it, it)) + b"]"
+
+
+class MoveBatch:
+    """Ходы на один ход игры, сразу закодированные для POST /api/move."""
+
+    def __init__(self):
+        self._ants: List[str] = []
+        self._paths: List[HexPath] = []
+        self._parts: List[bytes] = []
+
+    def add(self, ant_id: str, path: Iterable[Cell]) -> None:
+        if not isinstance(path, HexPath):
+            path = HexPath(path)
+        self._ants.append(ant_id)
+        self._paths.append(path)
+        self._parts.append(
+            b'{"ant":' + json_codec.dumps(ant_id) + b',"path":' + path.to_json() + b"}"
+        )
+
+    def __len__(self) -> int:
+        return len(self._ants)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Ходы в виде словарей (совместимость; на горячем пути не нужен)."""
+        for ant_id, path in zip(self._ants, self._paths):
+            yield {"ant": ant_id, "path": [{"q": q, "r": r} for q, r in path]}
+
+    def ants(self) -> List[str]:
+        return list(self._ants)
+
+    def encode(self) -> bytes:
+        """Тело запроса /api/move."""
+        return b'{"moves":[' + b",".join(self._parts) + b"]}"
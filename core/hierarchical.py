@@ -0,0 +1,303 @@
+"""core/hierarchical.py — иерархический поиск пути (HPA*) для больших карт.
+
+Известная карта режется на кластеры ``size × size`` в осевых координатах.
+На границах соседних кластеров выбираются входы (по одному на каждый
+связный проходимый участок границы, на длинных — ещё и по краям), внутри
+кластера входы связаны рёбрами с точной стоимостью. Дальний запрос — это
+A* по абстрактному графу входов (сотни вершин вместо десятков тысяч
+клеток), после чего детально достраиваются только первые отрезки пути —
+столько, сколько юнит реально пройдёт за ход.
+
+Абстрактный граф строится по рельефу (MOVE_COSTS) отдельно для каждого
+набора запрещённых типов профиля (``CostProfile.blocked``: камни, а для
+слабых муравьёв ещё и кислота), чтобы маршрут не вёл туда, куда юниту
+нельзя. Занятость и штрафы профиля учитывает уточнение отрезков обычным
+A*; если отрезок не достраивается, запрос считается ненайденным. При
+изменении тайлов пересобираются только затронутые кластеры.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from config import HPA_CLUSTER_SIZE, MOVE_COSTS
+from utils.hex_math import HexMath
+
+Cell = Tuple[int, int]
+Cluster = Tuple[int, int]
+
+ROCK = 5
+DEFAULT_BLOCKED = frozenset({ROCK})
+LONG_BORDER = 6             # с такой длины участок границы получает 3 входа
+ABSTRACT_LIMIT = 20_000     # лимит раскрытий абстрактного A*
+
+
+class AbstractGraph:
+    """Граф входов кластеров для одного набора запрещённых типов тайлов."""
+
+    def __init__(self, owner: "HierarchicalPathfinder", blocked: FrozenSet[int]):
+        self.owner = owner
+        self.game_state = owner.game_state
+        self.blocked = blocked
+        # входы на границе пары кластеров: (a, b), a — в первом, b — во втором
+        self._entrances: Dict[Tuple[Cluster, Cluster], List[Tuple[Cell, Cell]]] = {}
+        self._nodes: Dict[Cluster, Set[Cell]] = {}
+        self._intra: Dict[Cluster, Dict[Cell, Dict[Cell, float]]] = {}
+        self._inter: Dict[Cell, Dict[Cell, float]] = {}
+        # новый граф собирается по всем уже известным кластерам
+        self._dirty: Set[Cluster] = set(owner._cells)
+
+    def _terrain_cost(self, cell: Cell) -> float:
+        hex_type = self.game_state.get_hex_type(cell)
+        if hex_type in self.blocked:
+            return math.inf
+        return MOVE_COSTS.get(hex_type, math.inf)
+
+    def mark_dirty(self, clusters: Iterable[Cluster]) -> None:
+        self._dirty.update(clusters)
+
+    # ─────────────────────────────────────────────────────────────
+    # Пересборка
+    # ─────────────────────────────────────────────────────────────
+    def rebuild(self) -> None:
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        adjacent = self.owner.adjacent
+
+        # все границы, касающиеся изменённых кластеров
+        borders: Set[Tuple[Cluster, Cluster]] = set()
+        for cluster in dirty:
+            for other in adjacent(cluster):
+                borders.add((min(cluster, other), max(cluster, other)))
+
+        touched: Set[Cluster] = set()
+        for border in borders:
+            for a, b in self._entrances.pop(border, ()):
+                self._inter.get(a, {}).pop(b, None)
+                self._inter.get(b, {}).pop(a, None)
+            entrances = self._find_entrances(*border)
+            if entrances:
+                self._entrances[border] = entrances
+            for a, b in entrances:
+                self._inter.setdefault(a, {})[b] = self._terrain_cost(b)
+                self._inter.setdefault(b, {})[a] = self._terrain_cost(a)
+            touched.update(border)
+
+        for cluster in touched | dirty:
+            nodes: Set[Cell] = set()
+            for other in adjacent(cluster):
+                border = (min(cluster, other), max(cluster, other))
+                side = 0 if cluster == border[0] else 1
+                nodes.update(pair[side] for pair in self._entrances.get(border, ()))
+            for node in self._nodes.get(cluster, set()) - nodes:
+                self._inter.pop(node, None)
+            self._nodes[cluster] = nodes
+            self._intra[cluster] = {
+                node: self.local_costs(node, cluster, nodes) for node in nodes
+            }
+            self.owner.rebuilt += 1
+
+    def _find_entrances(self, c1: Cluster, c2: Cluster) -> List[Tuple[Cell, Cell]]:
+        """Пары соседних проходимых клеток на границе c1|c2, по несколько
+        на каждый связный участок границы."""
+        cells = self.owner._cells
+        pairs: Dict[Cell, Cell] = {}
+        c2_cells = cells.get(c2, ())
+        for cell in cells.get(c1, ()):
+            if self._terrain_cost(cell) == math.inf:
+                continue
+            for nb in HexMath.neighbors(cell):
+                if nb in c2_cells and self._terrain_cost(nb) != math.inf:
+                    pairs.setdefault(cell, nb)
+                    break
+
+        entrances: List[Tuple[Cell, Cell]] = []
+        seen: Set[Cell] = set()
+        for cell in sorted(pairs):
+            if cell in seen:
+                continue
+            run, stack = [], [cell]
+            seen.add(cell)
+            while stack:
+                cur = stack.pop()
+                run.append(cur)
+                for nb in HexMath.neighbors(cur):
+                    if nb in pairs and nb not in seen:
+                        seen.add(nb)
+                        stack.append(nb)
+            run.sort()
+            picks = {run[len(run) // 2]}
+            if len(run) >= LONG_BORDER:
+                picks.update((run[0], run[-1]))
+            entrances.extend((a, pairs[a]) for a in sorted(picks))
+        return entrances
+
+    def local_costs(
+        self, source: Cell, cluster: Cluster, targets: Set[Cell], reverse: bool = False
+    ) -> Dict[Cell, float]:
+        """Дейкстра внутри кластера: стоимости от source до targets
+        (reverse=True — от targets до source)."""
+        cells = self.owner._cells.get(cluster, set())
+        dist = {source: 0}
+        heap = [(0, source)]
+        found: Dict[Cell, float] = {}
+        while heap:
+            d, cur = heapq.heappop(heap)
+            if d > dist[cur]:
+                continue
+            if cur in targets:
+                found[cur] = d
+                if len(found) == len(targets):
+                    break
+            if reverse:
+                enter = self._enter_goal(cur) if cur == source else self._terrain_cost(cur)
+                if enter == math.inf:
+                    continue
+            for nb in HexMath.neighbors(cur):
+                if nb not in cells:
+                    continue
+                step = enter if reverse else self._terrain_cost(nb)
+                if step == math.inf:
+                    continue
+                nd = d + step
+                if nd < dist.get(nb, math.inf):
+                    dist[nb] = nd
+                    heapq.heappush(heap, (nd, nb))
+        return found
+
+    def _enter_goal(self, cell: Cell) -> float:
+        # неразведанная цель (клетка фронтира) стоит как пустая
+        return 1 if self.game_state.get_hex_type(cell) == 0 else self._terrain_cost(cell)
+
+    # ─────────────────────────────────────────────────────────────
+    # Поиск
+    # ─────────────────────────────────────────────────────────────
+    def route(self, start: Cell, goal: Cell) -> List[Cell]:
+        """Вершины абстрактного маршрута start → входы → goal ([] — нет)."""
+        cluster_of = self.owner.cluster_of
+        start_cluster, goal_cluster = cluster_of(start), cluster_of(goal)
+        from_start = self.local_costs(start, start_cluster, self._nodes.get(start_cluster, set()))
+        to_goal = self.local_costs(goal, goal_cluster, self._nodes.get(goal_cluster, set()), reverse=True)
+        if not from_start or not to_goal:
+            return []
+
+        dist = {start: 0}
+        came_from: Dict[Cell, Cell] = {}
+        heap = [(HexMath.distance(start, goal), start)]
+        closed: Set[Cell] = set()
+        owner = self.owner
+        while heap:
+            _f, cur = heapq.heappop(heap)
+            if cur in closed:
+                continue
+            closed.add(cur)
+            owner.last_expanded += 1
+            if cur == goal or owner.last_expanded > ABSTRACT_LIMIT:
+                break
+            if cur == start:
+                # start сам может быть входом: тогда ещё и рёбра через границу
+                edges = list(from_start.items())
+                edges += self._inter.get(start, {}).items()
+            else:
+                edges = list(self._intra[cluster_of(cur)].get(cur, {}).items())
+                edges += self._inter.get(cur, {}).items()
+                if cur in to_goal:
+                    edges.append((goal, to_goal[cur]))
+            for nxt, cost in edges:
+                nd = dist[cur] + cost
+                if nd < dist.get(nxt, math.inf):
+                    dist[nxt] = nd
+                    came_from[nxt] = cur
+                    heapq.heappush(heap, (nd + HexMath.distance(nxt, goal), nxt))
+
+        if goal not in came_from:
+            return []
+        route = [goal]
+        while route[-1] != start:
+            route.append(came_from[route[-1]])
+        route.reverse()
+        return route
+
+
+class HierarchicalPathfinder:
+    def __init__(self, pathfinder, size: int = HPA_CLUSTER_SIZE):
+        self.pathfinder = pathfinder
+        self.game_state = pathfinder.game_state
+        self.size = size
+        self._cells: Dict[Cluster, Set[Cell]] = {}
+        # абстрактные графы по наборам запрещённых типов, создаются по запросу
+        self._graphs: Dict[FrozenSet[int], AbstractGraph] = {}
+        self.rebuilt = 0            # сколько кластеров пересобрано (статистика)
+        self.last_expanded = 0
+
+    # ─────────────────────────────────────────────────────────────
+    # Геометрия кластеров
+    # ─────────────────────────────────────────────────────────────
+    def cluster_of(self, cell: Cell) -> Cluster:
+        return cell[0] // self.size, cell[1] // self.size
+
+    @staticmethod
+    def adjacent(cluster: Cluster) -> Set[Cluster]:
+        cq, cr = cluster
+        return {
+            (cq + 1, cr), (cq - 1, cr), (cq, cr + 1),
+            (cq, cr - 1), (cq + 1, cr - 1), (cq - 1, cr + 1),
+        }
+
+    def mark_dirty(self, cells: Iterable[Cell]) -> None:
+        """Запоминает кластеры с изменившимися тайлами (и их соседей —
+        входы на общей границе зависят от обеих сторон)."""
+        dirty: Set[Cluster] = set()
+        for cell in cells:
+            cluster = self.cluster_of(cell)
+            self._cells.setdefault(cluster, set()).add(cell)
+            dirty.add(cluster)
+            for nb in HexMath.neighbors(cell):
+                other = self.cluster_of(nb)
+                if other != cluster:
+                    dirty.add(other)
+        for graph in self._graphs.values():
+            graph.mark_dirty(dirty)
+
+    def graph(self, profile=None) -> AbstractGraph:
+        blocked = getattr(profile, "blocked", DEFAULT_BLOCKED)
+        graph = self._graphs.get(blocked)
+        if graph is None:
+            graph = self._graphs[blocked] = AbstractGraph(self, blocked)
+        graph.rebuild()
+        return graph
+
+    # ─────────────────────────────────────────────────────────────
+    # Запрос
+    # ─────────────────────────────────────────────────────────────
+    def find_path(self, start: Cell, goal: Cell, ant_id=None, profile=None) -> List[Cell]:
+        """Начало пути start → goal: абстрактный A* по входам кластеров и
+        уточнение отрезков до горизонта ``profile.horizon``. [] — не нашли."""
+        self.last_expanded = 0
+        if self.cluster_of(start) == self.cluster_of(goal):
+            return []
+        route = self.graph(profile).route(start, goal)
+        if not route:
+            return []
+        return self._refine(route, ant_id, profile)
+
+    def _refine(self, route: List[Cell], ant_id, profile) -> List[Cell]:
+        """Детальный путь по первым отрезкам маршрута, пока не наберётся
+        горизонт хода (без горизонта — весь маршрут). Отрезок, который не
+        достраивается (занятость, штрафы профиля), — [] для всего запроса:
+        обрывок пути не выдаётся за путь до цели."""
+        horizon = getattr(profile, "horizon", None)
+        path: List[Cell] = []
+        spent = 0
+        for a, b in zip(route, route[1:]):
+            segment = self.pathfinder._search(a, b, ant_id, profile)
+            if not segment:
+                return []
+            path.extend(segment)
+            if horizon is not None:
+                spent += sum(MOVE_COSTS.get(self.game_state.get_hex_type(c), 1) for c in segment)
+                if spent >= horizon:
+                    break
+        return path
@@ -0,0 +1,134 @@
+"""core/influence.py — карта влияния (угроза, поддержка, потребность в эскорте).
+
+Строится один раз за ход. Каждый слой — максимум по источникам от
+``сила · decay^d``, где d — длина пути в шагах по проходимым известным
+клеткам (камни и неизвестные клетки влияние не пропускают), d ≤ radius:
+
+* threat  — давление атаки врагов;
+* support — поддержка своих юнитов (по силе атаки типа);
+* escort  — потребность в сопровождении вокруг рабочих с грузом.
+
+С плотной сеткой (``world.dense``) слои — плоские NumPy-массивы, а
+распространение — radius векторных шагов по таблице смещений соседей.
+Без NumPy те же слои считаются BFS по словарям. Запрос значения в
+клетке — O(1) в обоих случаях.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy опционален
+    np = None
+
+from config import INFLUENCE_DECAY, INFLUENCE_RADIUS, MOVE_COSTS
+from utils.hex_math import HexMath
+
+Cell = Tuple[int, int]
+
+# сила атаки своих юнитов по типу: рабочий, боец, разведчик
+FRIEND_ATTACK = {0: 30, 1: 70, 2: 20}
+
+
+class InfluenceMap:
+    def __init__(self, world, radius: int = INFLUENCE_RADIUS, decay: float = INFLUENCE_DECAY):
+        self.world = world
+        self.radius = radius
+        self.decay = decay
+        # источники читаются прямо из колонок юнитов (core/columns.py)
+        enemies, ants = world.enemies, world.ants
+        threat = list(zip(enemies.cells(), enemies.attack))
+        support = [(cell, FRIEND_ATTACK.get(t, 0)) for cell, t in zip(ants.cells(), ants.type)]
+        escort = [(cell, amount) for cell, amount in zip(ants.cells(), ants.food_amount) if amount > 0]
+        self._dense = world.dense
+        if self._dense is not None:
+            walk = np.isfinite(self._dense.costs)
+            self._threat = self._spread_dense(threat, walk)
+            self._support = self._spread_dense(support, walk)
+            self._escort = self._spread_dense(escort, walk)
+        else:
+            self._threat = self._spread(threat)
+            self._support = self._spread(support)
+            self._escort = self._spread(escort)
+
+    # ─────────────────────────────────────────────────────────────
+    # Распространение
+    # ─────────────────────────────────────────────────────────────
+    def _spread_dense(self, sources: List[Tuple[Cell, float]], walk) -> "np.ndarray":
+        dense = self._dense
+        layer = np.zeros(dense.size, dtype=np.float32)
+        idx = [(dense.index(cell), strength) for cell, strength in sources]
+        idx = [(i, s) for i, s in idx if i >= 0 and s > 0]
+        if not idx:
+            return layer
+        flat, strength = zip(*idx)
+        np.maximum.at(layer, np.asarray(flat), np.asarray(strength, dtype=np.float32))
+        offsets = dense.offsets_list()
+        for _ in range(self.radius):
+            # клетка получает значение лучшего соседа (рамка сетки всегда
+            # непроходима, поэтому перенос через край массива даёт нули)
+            best = np.roll(layer, -offsets[0])
+            for offset in offsets[1:]:
+                np.maximum(best, np.roll(layer, -offset), out=best)
+            grown = np.maximum(layer, best * self.decay * walk)
+            if np.array_equal(grown, layer):
+                break
+            layer = grown
+        return layer
+
+    def _spread(self, sources: List[Tuple[Cell, float]]) -> Dict[Cell, float]:
+        world = self.world
+        layer: Dict[Cell, float] = {}
+        for source, strength in sources:
+            if strength <= 0:
+                continue
+            seen = {source: 0}
+            queue = deque([source])
+            while queue:
+                cell = queue.popleft()
+                d = seen[cell]
+                value = strength * self.decay ** d
+                if value > layer.get(cell, 0):
+                    layer[cell] = value
+                if d == self.radius:
+                    continue
+                for nb in HexMath.neighbors(cell):
+                    if nb in seen or MOVE_COSTS.get(world.get_hex_type(nb), math.inf) == math.inf:
+                        continue
+                    seen[nb] = d + 1
+                    queue.append(nb)
+        return layer
+
+    # ─────────────────────────────────────────────────────────────
+    # Запросы (O(1) на клетку)
+    # ─────────────────────────────────────────────────────────────
+    def _at(self, layer, cell: Cell) -> float:
+        if self._dense is None:
+            return layer.get(cell, 0.0)
+        idx = self._dense.index(cell)
+        return float(layer[idx]) if idx >= 0 else 0.0
+
+    def threat(self, cell: Cell) -> float:
+        return self._at(self._threat, cell)
+
+    def support(self, cell: Cell) -> float:
+        return self._at(self._support, cell)
+
+    def escort(self, cell: Cell) -> float:
+        return self._at(self._escort, cell)
+
+    def pressure(self, cell: Cell) -> float:
+        """Угроза, не покрытая поддержкой своих (может быть < 0)."""
+        return self.threat(cell) - self.support(cell)
+
+    def hottest(self, cells: Iterable[Cell]) -> Tuple[Cell, float]:
+        """Клетка с наибольшей угрозой и сама угроза ((None, 0) — пусто)."""
+        best, value = None, 0.0
+        for cell in cells:
+            threat = self.threat(cell)
+            if best is None or threat > value:
+                best, value = cell, threat
+        return best, value
@@ -0,0 +1,356 @@
+"""core/parallel.py — параллельное планирование муравьёв в пуле процессов.
+
+Раз в ход (после последовательных фаз: оборона, рабочие с грузом, бойцы)
+снимок мира публикуется в ``multiprocessing.shared_memory``: типы тайлов,
+счётчики занятости (юниты + уже зарезервированные клетки) и фронтир по
+секторам. Независимые поиски — поля расстояний для назначения рабочих,
+пути разведчиков и простаивающих муравьёв — описываются задачами ``Task``
+и раздаются постоянному ``ProcessPoolExecutor``; процессы читают снимок
+без копирования и считают тем же кодом (``run_task``), что и основной
+процесс в последовательном режиме.
+
+Результаты возвращаются в порядке задач, а конфликты целей разрешает
+``resolve``: путь обрезается перед первой клеткой, которую уже занял
+муравей, слитый раньше, — итог не зависит от порядка завершения задач.
+"""
+from __future__ import annotations
+
+import atexit
+import concurrent.futures as cf
+import logging
+import multiprocessing
+import multiprocessing.util
+import struct
+from array import array
+from collections import namedtuple
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from core.distance_field import FieldService
+from core.frontier import SECTORS
+from core.hex_path import HexPath
+from core.pathfinding import HexPathfinder
+
+Cell = Tuple[int, int]
+
+# stamp, q0, r0, width, height, затем границы секторов фронтира
+HEADER = struct.Struct(f"<5i{SECTORS + 1}i")
+CHUNKS_PER_WORKER = 4       # задач на процесс дробим на столько пачек
+
+# kind: "from"      — расстояния из cell (муравей ant_id) до cells;
+#       "to"        — расстояния из cells до goal (обратное поле);
+#       "path_to"   — путь из cell до goal по прямому полю (цели — cells);
+#       "path_from" — путь из cell до goal по обратному полю (источники — cells);
+#       "any"       — путь из cell до ближайшей клетки фронтира сектора goal
+#                     (None — весь фронтир; пустой сектор — весь фронтир).
+Task = namedtuple("Task", ["kind", "ant_id", "cell", "profile", "cells", "goal"])
+
+
+def run_task(world, task: Task):
+    """Выполняет задачу на мире ``world`` (GameState или SnapshotWorld)."""
+    kind, fields = task.kind, world.fields
+    if kind == "from":
+        return fields.from_cell(task.cell, task.ant_id, task.profile, task.cells).distances(task.cells)
+    if kind == "to":
+        return fields.to_cell(task.goal, task.profile, task.cells).distances(task.cells)
+    if kind == "path_to":
+        return fields.from_cell(task.cell, task.ant_id, task.profile, task.cells).path_to(task.goal)
+    if kind == "path_from":
+        return fields.to_cell(task.goal, task.profile, task.cells).path_from(task.cell)
+    if kind == "any":
+        finder, frontier = world.pathfinder, world.frontier
+        path = finder.find_path_to_any(task.cell, frontier, task.goal, task.ant_id, task.profile)
+        if not path and task.goal is not None:
+            path = finder.find_path_to_any(task.cell, frontier, None, task.ant_id, task.profile)
+        return path
+    raise ValueError(f"unknown task kind: {kind!r}")
+
+
+def resolve(world, ant_id: str, path: HexPath) -> HexPath:
+    """Часть пути до первой клетки, занятой для ``ant_id`` (в том числе
+    целями уже слитых муравьёв)."""
+    for i, cell in enumerate(path):
+        if world.is_occupied(cell, ant_id):
+            return path[:i]
+    return path
+
+
+# ────────────────────────────────────────────────────────────────────
+# Снимок мира в разделяемой памяти
+# ────────────────────────────────────────────────────────────────────
+class SharedSnapshot:
+    """Сторона основного процесса: сегмент shared_memory со снимком.
+
+    Раскладка: HEADER, типы тайлов (байт на клетку прямоугольника
+    width × height), занятость (байт на клетку), фронтир — пары int16.
+    Типы перезаписываются только при смене ``map_version`` или сегмента.
+    """
+
+    def __init__(self):
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.stamp = 0
+        self._bounds: Optional[Tuple[int, int, int, int]] = None
+        self._map_version = -1
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.shm.name if self.shm is not None else None
+
+    def publish(self, world) -> None:
+        self.stamp += 1
+        known = world.known_tiles()
+        if world.map_version != self._map_version or self._bounds is None:
+            if known:
+                qs = [q for q, _r in known]
+                rs = [r for _q, r in known]
+                self._bounds = (min(qs), min(rs), max(qs) - min(qs) + 1, max(rs) - min(rs) + 1)
+            else:
+                self._bounds = (0, 0, 0, 0)
+        q0, r0, width, height = self._bounds
+        area = width * height
+
+        sectors = [world.frontier.sector(k) for k in range(SECTORS)]
+        offsets = [0]
+        frontier = array("h")
+        for cells in sectors:
+            for q, r in cells:
+                frontier.append(q)
+                frontier.append(r)
+            offsets.append(len(frontier) >> 1)
+
+        size = HEADER.size + 2 * area + frontier.itemsize * len(frontier)
+        fresh = self.shm is None or self.shm.size < size
+        if fresh:
+            self.close()
+            # запас на рост карты и фронтира, чтобы не пересоздавать каждый ход
+            self.shm = shared_memory.SharedMemory(create=True, size=max(size + size // 2, 4096))
+        buf = self.shm.buf
+        base = HEADER.size
+
+        if fresh or world.map_version != self._map_version:
+            types = bytearray(area)
+            for (q, r), tile in known.items():
+                types[(r - r0) * width + (q - q0)] = tile.type
+            buf[base:base + area] = types
+            self._map_version = world.map_version
+
+        occupancy = bytearray(area)
+        cells = list(world.occupied_cells().items())
+        cells += [(cell, (owner,)) for cell, owner in world.planned_cells().items()]
+        for (q, r), units in cells:
+            if 0 <= q - q0 < width and 0 <= r - r0 < height:
+                idx = (r - r0) * width + (q - q0)
+                occupancy[idx] = min(255, occupancy[idx] + len(units))
+        buf[base + area:base + 2 * area] = occupancy
+
+        raw = frontier.tobytes()
+        buf[base + 2 * area:base + 2 * area + len(raw)] = raw
+        HEADER.pack_into(buf, 0, self.stamp, q0, r0, width, height, *offsets)
+
+    def close(self) -> None:
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class SnapshotFrontier:
+    """Фронтир из снимка с интерфейсом Frontier (sector / all)."""
+
+    def __init__(self, cells: Sequence[int], offsets: Sequence[int]):
+        it = iter(cells)
+        flat = list(zip(it, it))
+        self._sectors = [flat[offsets[k]:offsets[k + 1]] for k in range(SECTORS)]
+        self._all = sorted(flat)
+        # множества для find_path_to_any, строятся при первом запросе
+        self._members: Dict[Optional[int], Set[Cell]] = {}
+
+    def sector(self, sector: int) -> List[Cell]:
+        return self._sectors[sector % SECTORS]
+
+    def all(self) -> List[Cell]:
+        return self._all
+
+    def members(self, sector: Optional[int] = None) -> Set[Cell]:
+        key = None if sector is None else sector % SECTORS
+        members = self._members.get(key)
+        if members is None:
+            cells = self._all if key is None else self._sectors[key]
+            members = self._members[key] = set(cells)
+        return members
+
+    def __iter__(self):
+        return iter(self._all)
+
+
+class SnapshotWorld:
+    """Сторона процесса пула: мир только для чтения поверх снимка.
+
+    Реализует то, что нужно HexPathfinder и DistanceField: типы тайлов,
+    занятость, известность клеток и фронтир. Свою клетку муравья
+    (``own``) задаёт задача — в счётчике занятости муравей учтён.
+    """
+
+    dense = None
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        header = HEADER.unpack_from(shm.buf, 0)
+        self.turn_no = self.map_version = header[0]
+        self.q0, self.r0, self.width, self.height = header[1:5]
+        offsets = header[5:]
+        base, area = HEADER.size, self.width * self.height
+        self._types = shm.buf[base:base + area]
+        self._occupancy = shm.buf[base + area:base + 2 * area]
+        frontier = array("h")
+        frontier.frombytes(bytes(shm.buf[base + 2 * area:base + 2 * area + 4 * offsets[-1]]))
+        self.frontier = SnapshotFrontier(frontier, offsets)
+        self.own: Tuple[Optional[str], Optional[Cell]] = (None, None)
+        self.pathfinder = HexPathfinder(self)
+        self.fields = FieldService(self)
+
+    def release(self) -> None:
+        self._types.release()
+        self._occupancy.release()
+
+    def _index(self, cell: Cell) -> int:
+        q, r = cell[0] - self.q0, cell[1] - self.r0
+        if 0 <= q < self.width and 0 <= r < self.height:
+            return r * self.width + q
+        return -1
+
+    def get_hex_type(self, cell: Cell) -> int:
+        idx = self._index(cell)
+        return self._types[idx] if idx >= 0 else 0
+
+    def is_known(self, cell: Cell) -> bool:
+        return self.get_hex_type(cell) != 0
+
+    def is_occupied(self, cell: Cell, ant_id: Optional[str] = None, exclude=None) -> bool:
+        idx = self._index(cell)
+        if idx < 0:
+            return False
+        busy = self._occupancy[idx]
+        if ant_id is not None and self.own == (ant_id, cell):
+            busy -= 1
+        return busy > 0
+
+    def planned_cells(self) -> Dict[Cell, str]:
+        # резервирования уже учтены в счётчиках занятости
+        return {}
+
+
+# состояние процесса пула: подключённый сегмент и мир текущего снимка
+_attached: Optional[shared_memory.SharedMemory] = None
+_world: Optional[SnapshotWorld] = None
+
+
+def _detach() -> None:
+    """Отпускает представления и сегмент (до close, иначе BufferError)."""
+    global _attached, _world
+    if _world is not None:
+        _world.release()
+        _world = None
+    if _attached is not None:
+        _attached.close()
+        _attached = None
+
+
+def _snapshot(name: str, stamp: int) -> SnapshotWorld:
+    global _attached, _world
+    if _attached is None or _attached.name != name:
+        _detach()
+        _attached = shared_memory.SharedMemory(name=name)
+    if _world is None or _world.turn_no != stamp:
+        if _world is not None:
+            _world.release()
+        _world = SnapshotWorld(_attached)
+    return _world
+
+
+def _run_chunk(name: str, stamp: int, tasks: List[Task]) -> list:
+    world = _snapshot(name, stamp)
+    results = []
+    for task in tasks:
+        world.own = (task.ant_id, task.cell)
+        results.append(run_task(world, task))
+    return results
+
+
+def _init_worker() -> None:
+    # процессы пула завершаются без atexit: отпускаем снимок финализатором
+    multiprocessing.util.Finalize(None, _detach, exitpriority=10)
+
+
+def _ready() -> bool:
+    return True
+
+
+# ────────────────────────────────────────────────────────────────────
+# Пул
+# ────────────────────────────────────────────────────────────────────
+class ParallelPlanner:
+    """Постоянный пул процессов и снимок мира для него.
+
+    Пул и сегмент создаются при первом ``publish``; ``map`` раздаёт задачи
+    пачками и возвращает результаты в порядке задач (None — не успели к
+    таймауту или задача упала).
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.snapshot = SharedSnapshot()
+        self._pool: Optional[cf.ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        # spawn: процессы не наследуют потоки и состояние планировщика
+        self._pool = cf.ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        cf.wait([self._pool.submit(_ready) for _ in range(self.workers)])
+        atexit.register(self.close)
+        logging.info("Parallel planning: %d worker processes", self.workers)
+
+    def publish(self, world) -> None:
+        """Снимок мира для задач этого хода. Сегмент создаётся до пула,
+        чтобы процессы пула делили с основным трекер ресурсов."""
+        self.snapshot.publish(world)
+        self.start()
+
+    def map(self, tasks: Sequence[Task], timeout: Optional[float] = None) -> list:
+        if not tasks:
+            return []
+        size = max(1, -(-len(tasks) // (self.workers * CHUNKS_PER_WORKER)))
+        name, stamp = self.snapshot.name, self.snapshot.stamp
+        chunks = [list(tasks[i:i + size]) for i in range(0, len(tasks), size)]
+        try:
+            futures = [self._pool.submit(_run_chunk, name, stamp, chunk) for chunk in chunks]
+        except BrokenProcessPool:
+            # процесс пула упал: ход досчитывается без этих задач, пул
+            # пересоздаётся при следующей публикации снимка
+            logging.exception("Parallel planning pool is broken")
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            return [None] * len(tasks)
+        cf.wait(futures, timeout=timeout)
+        results: list = []
+        for future, chunk in zip(futures, chunks):
+            if future.done() and not future.cancelled() and future.exception() is None:
+                results.extend(future.result())
+                continue
+            if future.done() and not future.cancelled():
+                logging.error("Parallel planning task failed", exc_info=future.exception())
+            else:
+                future.cancel()
+            results.extend([None] * len(chunk))
+        return results
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        self.snapshot.close()
@@ -2,56 +2,365 @@
 
 Используется GameState.astar().  Учитывает типы гексов, занятость клеток и
 встроенный лимит на количество посещённых вершин, чтобы не зацикливаться.
+Стоимость шага задаёт CostProfile: штрафы по типам тайлов, запрещённые
+типы и горизонт хода (очки перемещения юнита).
+
+Наружу пути отдаются как ``HexPath`` (компактный ``array('h')``, см.
+core/hex_path.py); внутри поиска они собираются обычными списками.
 """
 from __future__ import annotations
 
 import logging
-from typing import Tuple, Dict
+import math
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 
+from core.dstar_lite import DStarLite
+from core.hex_path import HexPath
+from core.hierarchical import HierarchicalPathfinder
 from utils.hex_math import HexMath
-from utils.priority_queue import PriorityQueue
-from config import MOVE_COSTS
+from utils.priority_queue import QUEUES
+from config import (
+    HIERARCHICAL_PATHFINDING,
+    HPA_MIN_DISTANCE,
+    INCREMENTAL_REPLANNING,
+    MOVE_COSTS,
+    PATH_CACHE_SIZE,
+    PATH_QUEUE,
+)
 
 ACID, ROCK = 4, 5
 VISITED_LIMIT = 5_000       # hard-limit, чтобы A* не застревал
+CHANGE_LOG_TURNS = 8        # сколько ходов изменений помнят D*-планировщики
+
+ACID_MIN_HP = 50            # с меньшим hp в кислоту не заходим вовсе
+ACID_PENALTY = 400          # штраф за тайл кислоты = ceil(ACID_PENALTY / hp)
+
+
+@dataclass(frozen=True)
+class CostProfile:
+    """Профиль стоимости пути для конкретного юнита.
+
+    Стоимость входа в тайл = ``MOVE_COSTS`` + штраф из ``penalties``;
+    тайлы из ``blocked`` непроходимы. ``horizon`` — очки хода юнита,
+    по ним обрезается отправляемая часть пути (см. HexPathfinder.clip).
+    """
+
+    penalties: Tuple[Tuple[int, int], ...] = ()
+    blocked: FrozenSet[int] = frozenset({ROCK})
+    horizon: Optional[int] = None
+    costs: Dict[int, float] = field(init=False, repr=False, compare=False, hash=False)
+
+    def __post_init__(self):
+        costs = {t: c for t, c in MOVE_COSTS.items() if t not in self.blocked}
+        for hex_type, penalty in self.penalties:
+            if hex_type in costs:
+                costs[hex_type] += penalty
+        object.__setattr__(self, "costs", costs)
+
+    @classmethod
+    def for_ant(cls, hp: int, speed: Optional[int] = None) -> "CostProfile":
+        """Кислота: запрещена при hp < ACID_MIN_HP, иначе штраф тем
+        больше, чем меньше у муравья здоровья."""
+        if hp < ACID_MIN_HP:
+            return cls(blocked=frozenset({ROCK, ACID}), horizon=speed)
+        return cls(penalties=((ACID, math.ceil(ACID_PENALTY / hp)),), horizon=speed)
+
+    @property
+    def key(self) -> tuple:
+        """Ключ для кешей: горизонт на сам путь не влияет."""
+        return self.penalties, self.blocked
+
+    def step_cost(self, hex_type: int) -> float:
+        return self.costs.get(hex_type, math.inf)
+
+
+DEFAULT_PROFILE = CostProfile()
+
+
+class PathCache:
+    """Ограниченный LRU-кеш найденных путей.
+
+    Ключ — (start, goal, profile.key). Запись живёт между ходами и
+    сбрасывается только когда у клетки на пути меняется тип
+    (invalidate_cells) или клетка оказывается занята (проверка в get).
+    Если точного ключа нет, но муравей стоит на ранее найденном пути к той
+    же цели, отдаётся хвост этого пути — подпуть кратчайшего тоже кратчайший.
+    """
+
+    def __init__(self, capacity: int = PATH_CACHE_SIZE):
+        self.capacity = capacity
+        self._entries: "OrderedDict[tuple, HexPath]" = OrderedDict()
+        self._by_cell: Dict[Tuple[int, int], Set[tuple]] = {}
+        self._by_goal: Dict[tuple, Set[tuple]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, start, goal, profile_key, is_free) -> Optional[HexPath]:
+        """Путь из кеша или None. ``is_free(cell)`` — проверка занятости."""
+        key = (start, goal, profile_key)
+        path = self._entries.get(key)
+        if path is not None:
+            offset = 0
+        else:
+            key, offset = self._find_suffix(start, goal, profile_key)
+            path = self._entries.get(key) if key else None
+        if path is None:
+            self.misses += 1
+            return None
+        tail = path[offset:]
+        if not tail or not all(is_free(cell) for cell in tail):
+            self._drop(key)
+            self.invalidations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return tail
+
+    def _find_suffix(self, start, goal, profile_key):
+        for key in self._by_goal.get((goal, profile_key), ()):
+            path = self._entries[key]
+            try:
+                return key, path.index(start) + 1
+            except ValueError:
+                continue
+        return None, 0
+
+    def put(self, start, goal, profile_key, path: HexPath) -> None:
+        key = (start, goal, profile_key)
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = path
+        for cell in path:
+            self._by_cell.setdefault(cell, set()).add(key)
+        self._by_goal.setdefault((goal, profile_key), set()).add(key)
+        while len(self._entries) > self.capacity:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_cells(self, cells) -> None:
+        """Сбрасывает пути, проходящие через изменившиеся клетки."""
+        by_cell = self._by_cell
+        for cell in cells:
+            for key in list(by_cell.get(cell, ())):
+                self._drop(key)
+                self.invalidations += 1
+
+    def _drop(self, key) -> None:
+        path = self._entries.pop(key)
+        for cell in path:
+            keys = self._by_cell.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_cell[cell]
+        goal_keys = self._by_goal[(key[1], key[2])]
+        goal_keys.discard(key)
+        if not goal_keys:
+            del self._by_goal[(key[1], key[2])]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
 
 
 class HexPathfinder:
-    def __init__(self, game_state):
+    def __init__(
+        self,
+        game_state,
+        queue: str = PATH_QUEUE,
+        incremental: bool = INCREMENTAL_REPLANNING,
+    ):
         self.game_state = game_state
+        self.cache = PathCache()
+        # инкрементальный режим: D* Lite на муравья, живёт между ходами
+        self.incremental = incremental
+        # муравей → (цель и профиль, номер обновления, планировщик,
+        # резервы клеток (клетка, муравей) на момент replan)
+        self._planners: Dict[str, Tuple[tuple, int, Optional[DStarLite], FrozenSet]] = {}
+        # журнал изменившихся клеток по ходам: (номер обновления, клетки)
+        self._change_log: deque = deque(maxlen=CHANGE_LOG_TURNS)
+        self._update_no = 0
+        # HPA* для дальних запросов (и тех, что упёрлись в VISITED_LIMIT)
+        self.hierarchy = HierarchicalPathfinder(self) if HIERARCHICAL_PATHFINDING else None
+        # бэкенд очереди: "heap" | "bucket" | "indexed" (utils.priority_queue)
+        self.queue_factory = QUEUES[queue]
+        # статистика последнего поиска: раскрытые вершины и устаревшие записи
+        self.last_expanded = 0
+        self.last_stale = 0
+        # накопительно с создания: для бенчмарков и профилирования
+        self.total_expanded = 0
+        self.searches = 0
 
     # ─────────────────────────────────────────────────────────────
     # A*-поиск пути
     # ─────────────────────────────────────────────────────────────
-    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int], ant_id=None):
+    def find_path(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        ant_id=None,
+        profile: CostProfile = DEFAULT_PROFILE,
+    ):
         if start == goal or goal is None:
+            return HexPath()
+
+        occupied = self.game_state.is_occupied
+        cached = self.cache.get(
+            start, goal, profile.key, lambda cell: not occupied(cell, ant_id)
+        )
+        if cached is not None:
+            self.last_expanded = self.last_stale = 0
+            return cached
+
+        if self.hierarchy is not None and HexMath.distance(start, goal) >= HPA_MIN_DISTANCE:
+            # дальний запрос: уточнено только начало пути — в кеш не кладём
+            path = self.hierarchy.find_path(start, goal, ant_id, profile)
+            if path:
+                self._count(self.hierarchy.last_expanded, 0)
+                return HexPath(path)
+
+        if self.incremental and ant_id is not None:
+            path = self.replan(ant_id, start, goal, profile)
+        else:
+            path = self._search(start, goal, ant_id, profile)
+        if path:
+            path = HexPath(path)
+            self.cache.put(start, goal, profile.key, path)
+            return path
+        if self.hierarchy is not None and self.last_expanded > VISITED_LIMIT:
+            path = self.hierarchy.find_path(start, goal, ant_id, profile)
+        return HexPath(path)
+
+    def on_world_update(self, dirty_cells, changed_cells, live_ants) -> None:
+        """Вызывается GameState после очередного хода.
+
+        ``dirty_cells`` — клетки со сменившимся типом (сбрасывают кеш путей),
+        ``changed_cells`` — все клетки, чья стоимость входа могла измениться
+        (тип или занятость) — их получат D*-планировщики при следующем replan.
+        Планировщики исчезнувших муравьёв удаляются.
+        """
+        if dirty_cells:
+            self.cache.invalidate_cells(dirty_cells)
+            if self.hierarchy is not None:
+                self.hierarchy.mark_dirty(dirty_cells)
+        self._update_no += 1
+        self._change_log.append((self._update_no, frozenset(changed_cells)))
+        for ant_id in [a for a in self._planners if a not in live_ants]:
+            del self._planners[ant_id]
+
+    # ─────────────────────────────────────────────────────────────
+    # Инкрементальное перепланирование (D* Lite)
+    # ─────────────────────────────────────────────────────────────
+    def replan(self, ant_id: str, start, goal, profile: CostProfile = DEFAULT_PROFILE):
+        """Путь для муравья с переиспользованием его поиска с прошлых ходов.
+
+        Пока цель и профиль муравья не меняются, планировщик досчитывает
+        только окрестности клеток из журнала изменений и резервов текущего
+        хода: журнал пишется раз в ход, а клетки, занятые ходами муравьёв,
+        спланированных раньше в этом же ходу, в него ещё не попали.
+        """
+        key = (goal, profile.key)
+        entry = self._planners.get(ant_id)
+        reserved = frozenset(self.game_state.planned_cells().items())
+        if entry is None or entry[0] != key:
+            # цель сменилась: первый раз ищем обычным A*, а планировщик
+            # заводим, только если муравей продолжит идти к той же цели
+            self._planners[ant_id] = (key, self._update_no, None, reserved)
+            return self._search(start, goal, ant_id, profile)
+
+        planner = entry[2]
+        changed: Set[Tuple[int, int]] = set()
+        if planner is not None and self._log_covers(entry[1]):
+            for update_no, cells in self._change_log:
+                if update_no > entry[1]:
+                    changed |= cells
+            # резервы, появившиеся, снятые или сменившие хозяина с прошлого replan
+            changed.update(cell for cell, _owner in reserved ^ entry[3])
+        else:
+            planner = DStarLite(
+                goal, lambda cell: self._enter_cost(cell, goal, profile, ant_id), VISITED_LIMIT
+            )
+        self._planners[ant_id] = (key, self._update_no, planner, reserved)
+
+        before = planner.expanded
+        path = planner.replan(start, changed)
+        self._count(planner.expanded - before, 0)
+        return path
+
+    def _count(self, expanded: int, stale: int) -> None:
+        self.last_expanded, self.last_stale = expanded, stale
+        self.total_expanded += expanded
+        self.searches += 1
+
+    def _log_covers(self, update_no: int) -> bool:
+        """Есть ли в журнале все изменения после обновления ``update_no``."""
+        if update_no == self._update_no:
+            return True
+        return bool(self._change_log) and self._change_log[0][0] <= update_no + 1
+
+    def _enter_cost(self, cell, goal, profile: CostProfile, ant_id=None) -> float:
+        if cell == goal:
+            return self._goal_cost(goal, profile, ant_id)
+        cost = profile.step_cost(self.game_state.get_hex_type(cell))
+        if cost == math.inf or self.game_state.is_occupied(cell, ant_id):
+            return math.inf
+        return cost
+
+    def _search(self, start, goal, ant_id, profile: CostProfile):
+        goal_cost = self._goal_cost(goal, profile, ant_id)
+        if goal_cost == math.inf:
             return []
 
-        frontier = PriorityQueue()
+        frontier = self.queue_factory()
         frontier.put(start, 0)
 
         came_from: Dict[Tuple[int, int], Tuple[int, int]] = {}
         cost_so_far: Dict[Tuple[int, int], float] = {start: 0}
+        closed: Set[Tuple[int, int]] = set()
 
-        visited = 0
+        visited = stale = 0
+        self.last_expanded = self.last_stale = 0
         while not frontier.empty():
             current = frontier.get()
 
+            # устаревший дубликат уже раскрытой вершины (очередь без decrease-key)
+            if current in closed:
+                stale += 1
+                continue
+            closed.add(current)
+
             # hard-limit
             visited += 1
             if visited > VISITED_LIMIT:
                 logging.debug("A*: прервано по лимиту (%d), %s → %s", visited, start, goal)
+                self._count(visited, stale)
                 return []
 
             if current == goal:
                 break
 
             for candidate in HexMath.neighbors(current):
-                if not self.is_passable(candidate, ant_id):
+                if candidate in closed:
                     continue
-
-                hex_type = self.game_state.get_hex_type(candidate)
-                move_cost = MOVE_COSTS.get(hex_type, float("inf"))
+                if candidate == goal:
+                    move_cost = goal_cost
+                else:
+                    move_cost = profile.step_cost(self.game_state.get_hex_type(candidate))
+                    if move_cost == math.inf or self.game_state.is_occupied(candidate, ant_id):
+                        continue
                 new_cost = cost_so_far[current] + move_cost
 
                 if candidate not in cost_so_far or new_cost < cost_so_far[candidate]:
@@ -60,6 +369,8 @@ class HexPathfinder:
                     frontier.put(candidate, priority)
                     came_from[candidate] = current
 
+        self._count(visited, stale)
+
         # реконструкция
         path = []
         current = goal
@@ -71,6 +382,103 @@ class HexPathfinder:
         path.reverse()
         return path
 
+    def find_path_to_any(
+        self,
+        start: Tuple[int, int],
+        goals,
+        sector: Optional[int] = None,
+        ant_id=None,
+        profile: CostProfile = DEFAULT_PROFILE,
+    ) -> HexPath:
+        """Путь до ближайшей ДОСТИЖИМОЙ цели из набора — одна Дейкстра,
+        которая останавливается на первой раскрытой цели.
+
+        ``goals`` — клетки или объект с разбивкой по секторам (Frontier);
+        при заданном ``sector`` берутся только цели этого сектора. У
+        фронтира берутся его собственные множества (``members``), без
+        копирования; множество строится только из простого набора клеток.
+        Пустой путь — ни одна цель не достижима.
+        """
+        if hasattr(goals, "members"):
+            targets = goals.members(sector)
+        elif isinstance(goals, (set, frozenset)):
+            targets = goals
+        else:
+            targets = set(goals)
+        self.last_expanded = self.last_stale = 0
+        if not targets or (len(targets) == 1 and start in targets):
+            return HexPath()
+
+        game_state = self.game_state
+        frontier = self.queue_factory()
+        frontier.put(start, 0)
+        came_from: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        cost_so_far: Dict[Tuple[int, int], float] = {start: 0}
+        closed: Set[Tuple[int, int]] = set()
+
+        visited = stale = 0
+        found = None
+        while not frontier.empty():
+            current = frontier.get()
+            if current in closed:
+                stale += 1
+                continue
+            closed.add(current)
+            visited += 1
+            if visited > VISITED_LIMIT:
+                break
+            if current in targets and current != start:
+                found = current
+                break
+
+            for candidate in HexMath.neighbors(current):
+                if candidate in closed:
+                    continue
+                if candidate in targets:
+                    move_cost = self._goal_cost(candidate, profile, ant_id)
+                else:
+                    move_cost = profile.step_cost(game_state.get_hex_type(candidate))
+                    if move_cost != math.inf and game_state.is_occupied(candidate, ant_id):
+                        move_cost = math.inf
+                if move_cost == math.inf:
+                    continue
+                new_cost = cost_so_far[current] + move_cost
+                if new_cost < cost_so_far.get(candidate, math.inf):
+                    cost_so_far[candidate] = new_cost
+                    frontier.put(candidate, new_cost)
+                    came_from[candidate] = current
+
+        self._count(visited, stale)
+        if found is None:
+            return HexPath()
+        path = []
+        while found != start:
+            path.append(found)
+            found = came_from[found]
+        path.reverse()
+        return HexPath(path)
+
+    def _goal_cost(self, goal: Tuple[int, int], profile: CostProfile, ant_id=None) -> float:
+        """Стоимость входа в цель. Неразведанную цель (клетку фронтира)
+        считаем обычной пустой — иначе A* перебирал бы всю известную карту,
+        прежде чем дотянуться до неё."""
+        if self.game_state.is_occupied(goal, ant_id):
+            return math.inf
+        hex_type = self.game_state.get_hex_type(goal)
+        return 1 if hex_type == 0 else profile.step_cost(hex_type)
+
+    def clip(self, path: HexPath, profile: CostProfile) -> HexPath:
+        """Обрезает путь по очкам хода юнита (грязь стоит 2). Срез
+        ``HexPath`` копирует один массив, а не список кортежей."""
+        if profile.horizon is None:
+            return path
+        budget = profile.horizon
+        for i, cell in enumerate(path):
+            budget -= MOVE_COSTS.get(self.game_state.get_hex_type(cell), 1)
+            if budget < 0:
+                return path[:i]
+        return path
+
     # ─────────────────────────────────────────────────────────────
     # Проверка проходимости клетки
     # ─────────────────────────────────────────────────────────────
@@ -79,11 +487,5 @@ class HexPathfinder:
         if self.game_state.get_hex_type(cell) == ROCK:
             return False
 
-        # клетка занята другим юнитом
-        for unit in self.game_state.all_units():
-            unit_id = getattr(unit, "id", None)
-            pos = (getattr(unit, "q", None), getattr(unit, "r", None))
-            if pos == hex and unit_id != ant_id:
-            if (unit.q, unit.r) == cell and unit.id != ant_id:
-                return False
-        return True
+        # клетка занята другим юнитом (O(1) по индексу занятости)
+        return not self.game_state.is_occupied(cell, ant_id)
@@ -0,0 +1,84 @@
+"""core/rate_limit.py — token bucket с подстройкой под лимит сервера.
+
+Бакет выдаёт не больше ``rate`` запросов в секунду с запасом ``burst``.
+Лимит сервера заранее точно не известен, поэтому скорость подстраивается
+на лету: на 429 скорость падает на 30 %, запоминается «потолок», а запрос
+``Retry-After`` выдерживается паузой; после серии успешных запросов
+скорость осторожно растёт, но не выше 95 % от потолка.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+PROBE_AFTER = 10            # успешных запросов подряд до повышения скорости
+INCREASE = 1.2              # множитель повышения скорости
+DECREASE = 0.7              # множитель понижения на 429
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1.0,
+        min_rate: float = 0.5,
+        max_rate: Optional[float] = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.ceiling: Optional[float] = None    # скорость, на которой словили 429
+        self.tokens = burst
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+        self._streak = 0
+        self._lock = asyncio.Lock()
+        # метрики
+        self.waits = 0
+        self.wait_time = 0.0
+        self.throttled = 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    async def acquire(self) -> float:
+        """Ждёт токен; возвращает время ожидания, с."""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                else:
+                    delay = (1 - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+        if waited:
+            self.waits += 1
+            self.wait_time += waited
+        return waited
+
+    def on_success(self) -> None:
+        self._streak += 1
+        if self._streak < PROBE_AFTER:
+            return
+        self._streak = 0
+        limit = self.max_rate if self.ceiling is None else min(self.max_rate, 0.95 * self.ceiling)
+        self.rate = max(self.rate, min(limit, self.rate * INCREASE))
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """Сервер ответил 429: понижаем скорость и выдерживаем паузу."""
+        self.throttled += 1
+        self._streak = 0
+        self.ceiling = self.rate if self.ceiling is None else min(self.ceiling, self.rate)
+        self.rate = max(self.min_rate, self.rate * DECREASE)
+        self.tokens = 0.0
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
@@ -0,0 +1,144 @@
+"""core/recorder.py — запись игры для офлайн-прогона.
+
+Каждый ответ /api/arena и каждый отправленный пакет ходов дописываются
+в конец файла записью::
+
+    kind: 1 байт ("A" — арена, "M" — ходы) | turn: int32 | length: uint32 | zlib(JSON)
+
+Записи сжаты по отдельности, поэтому файл только дописывается и
+читается потоково, а оборванная (при падении) последняя запись просто
+отбрасывается. Рядом лежит индекс ``<file>.idx`` — записи
+``kind, turn, offset`` фиксированной длины — для перехода к ходу без
+распаковки всего файла.
+
+Сериализация, сжатие и запись идут в отдельном потоке: цикл событий
+только кладёт объект в очередь.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import struct
+import threading
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.hex_path import MoveBatch
+from utils import json_codec
+
+RECORD = struct.Struct("<ciI")      # kind, turn, длина сжатого тела
+INDEX = struct.Struct("<ciQ")       # kind, turn, смещение записи
+ARENA, MOVES = b"A", b"M"
+COMPRESS_LEVEL = 3
+
+
+class GameRecorder:
+    """Фоновая запись арен и ходов в сжатый журнал."""
+
+    def __init__(self, path: str, level: int = COMPRESS_LEVEL):
+        self.path = path
+        self.level = level
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, name="recorder", daemon=True)
+        self._thread.start()
+        self.records = 0
+        self.written = 0
+
+    def arena(self, turn: int, arena: Dict) -> None:
+        self._queue.put((ARENA, turn, arena))
+
+    def moves(self, turn: int, moves) -> None:
+        self._queue.put((MOVES, turn, moves))
+
+    def close(self) -> None:
+        """Дописывает очередь и закрывает файлы (блокирует до конца записи)."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _write_loop(self) -> None:
+        with open(self.path, "ab") as data, open(self.path + ".idx", "ab") as index:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                kind, turn, payload = item
+                try:
+                    if isinstance(payload, MoveBatch):
+                        body = payload.encode()
+                    elif kind == MOVES:
+                        body = json_codec.dumps({"moves": payload})
+                    else:
+                        body = json_codec.dumps(payload)
+                    packed = zlib.compress(body, self.level)
+                except Exception:
+                    logging.exception("Recorder: cannot encode turn %d", turn)
+                    continue
+                offset = data.tell()
+                data.write(RECORD.pack(kind, turn, len(packed)))
+                data.write(packed)
+                index.write(INDEX.pack(kind, turn, offset))
+                # запись должна пережить падение бота: сбрасываем по записи
+                data.flush()
+                index.flush()
+                self.records += 1
+                self.written += RECORD.size + len(packed)
+
+
+class GameLog:
+    """Чтение журнала GameRecorder."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __iter__(self) -> Iterator[Tuple[bytes, int, Dict]]:
+        """Записи по порядку: (kind, turn, объект JSON)."""
+        for kind, turn, body in self.raw():
+            yield kind, turn, json_codec.loads(body)
+
+    def raw(self) -> Iterator[Tuple[bytes, int, bytes]]:
+        with open(self.path, "rb") as data:
+            while True:
+                header = data.read(RECORD.size)
+                if len(header) < RECORD.size:
+                    return
+                kind, turn, length = RECORD.unpack(header)
+                packed = data.read(length)
+                if len(packed) < length:
+                    logging.warning("%s: truncated record at turn %d", self.path, turn)
+                    return
+                yield kind, turn, zlib.decompress(packed)
+
+    def arenas(self) -> Iterator[Tuple[int, Dict]]:
+        for kind, turn, body in self.raw():
+            if kind == ARENA:
+                yield turn, json_codec.loads(body)
+
+    def index(self) -> List[Tuple[bytes, int, int]]:
+        """(kind, turn, offset) всех записей: из .idx или сканированием."""
+        try:
+            with open(self.path + ".idx", "rb") as f:
+                raw = f.read()
+            usable = len(raw) - len(raw) % INDEX.size
+            return [INDEX.unpack_from(raw, pos) for pos in range(0, usable, INDEX.size)]
+        except FileNotFoundError:
+            entries, offset = [], 0
+            with open(self.path, "rb") as data:
+                while True:
+                    header = data.read(RECORD.size)
+                    if len(header) < RECORD.size:
+                        return entries
+                    kind, turn, length = RECORD.unpack(header)
+                    entries.append((kind, turn, offset))
+                    offset += RECORD.size + length
+                    data.seek(offset)
+
+    def read_at(self, offset: int) -> Tuple[bytes, int, Dict]:
+        with open(self.path, "rb") as data:
+            data.seek(offset)
+            kind, turn, length = RECORD.unpack(data.read(RECORD.size))
+            return kind, turn, json_codec.loads(zlib.decompress(data.read(length)))
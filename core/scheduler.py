@@ -0,0 +1,190 @@
+"""core/scheduler.py — планирование хода с дедлайном.
+
+Бюджет на расчёт берётся из ``nextTurnIn`` за вычетом сетевой задержки
+(половина RTT уже прошла, пока шёл ответ арены, и ещё RTT займёт отправка
+ходов) и запаса. Стратегия планирует муравьёв по приоритету и между ними
+проверяет дедлайн; всё, что найдено к дедлайну, уходит на сервер, а
+остальные муравьи помечаются как отложенные.
+
+Расчёт идёт в отдельном потоке, чтобы не блокировать цикл событий. Поток
+нельзя прервать, поэтому по дедлайну план «закрывается»: снимок ходов
+отправляется, а следующий ход начинает планироваться только после
+завершения потока (он работает с тем же GameState).
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from config import PLAN_MIN_BUDGET, PLAN_SAFETY_MARGIN, PLAN_USAGE_DECAY
+from core.hex_path import HexPath, MoveBatch
+
+
+class Deadline:
+    def __init__(self, budget: float = math.inf, started: Optional[float] = None):
+        self.budget = budget
+        self.started = time.perf_counter() if started is None else started
+        self.at = self.started + budget
+
+    def remaining(self) -> float:
+        return self.at - time.perf_counter()
+
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.at
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+class TurnPlan:
+    """План хода, который заполняет стратегия: найденные ходы (сразу в
+    виде тела /api/move, см. MoveBatch) и учёт спланированных / отложенных
+    муравьёв. Потокобезопасен."""
+
+    def __init__(self, deadline: Optional[Deadline] = None):
+        self.deadline = deadline or Deadline()
+        self.moves = MoveBatch()
+        self.planned: Set[str] = set()
+        self.deferred: Set[str] = set()
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def expired(self) -> bool:
+        return self.closed or self.deadline.expired()
+
+    def add(self, ant_id: str, path: HexPath) -> bool:
+        """Добавляет ход; False — план уже закрыт по дедлайну."""
+        with self._lock:
+            if self.closed:
+                return False
+            self.moves.add(ant_id, path)
+            self.planned.add(ant_id)
+            self.deferred.discard(ant_id)
+            return True
+
+    def defer(self, ant_id: str) -> None:
+        with self._lock:
+            if ant_id not in self.planned:
+                self.deferred.add(ant_id)
+
+    def close(self) -> MoveBatch:
+        """Фиксирует план и возвращает ходы: после закрытия они не меняются."""
+        with self._lock:
+            self.closed = True
+            return self.moves
+
+
+class FairGate:
+    """Допуск к расчёту ходов, общий для нескольких ботов в одном процессе.
+
+    Одновременно считаются не больше ``slots`` планов. Слот занят, пока
+    поток расчёта не завершится (а не до дедлайна), поэтому бот, чей расчёт
+    не укладывается в ход, держит только свой слот. Из очереди первым
+    пускается бот с наименьшим недавним временем расчёта (сумма с
+    затуханием ``decay`` за каждый расчёт): медленная арена не отнимает
+    слоты у остальных.
+    """
+
+    def __init__(self, slots: int, decay: float = PLAN_USAGE_DECAY):
+        self.slots = slots
+        self.decay = decay
+        self.busy = 0
+        self.usage: Dict[object, float] = {}
+        self._waiters: list = []
+        self._seq = itertools.count()
+
+    async def acquire(self, owner) -> None:
+        if self.busy < self.slots and not self._waiters:
+            self.busy += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (self.usage.get(owner, 0.0), next(self._seq), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # слот уже выдан, но не нужен — отдаём следующему
+                self.busy -= 1
+                self._wake()
+            raise
+
+    def release(self, owner, used: float) -> None:
+        self.usage[owner] = self.usage.get(owner, 0.0) * self.decay + used
+        self.busy -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self.busy < self.slots and self._waiters:
+            waiter = heapq.heappop(self._waiters)[2]
+            if waiter.done():
+                continue
+            self.busy += 1
+            waiter.set_result(None)
+
+
+class PlanningScheduler:
+    def __init__(
+        self,
+        strategy,
+        safety: float = PLAN_SAFETY_MARGIN,
+        min_budget: float = PLAN_MIN_BUDGET,
+        gate: Optional[FairGate] = None,
+    ):
+        self.strategy = strategy
+        self.safety = safety
+        self.min_budget = min_budget
+        # общий с другими ботами допуск к расчёту (см. MultiBotRunner)
+        self.gate = gate
+        self._running: Optional[asyncio.Future] = None
+
+    def budget(self, next_turn_in: float, rtt: float) -> float:
+        """Секунды на расчёт до отправки ходов."""
+        return max(self.min_budget, next_turn_in - 1.5 * rtt - self.safety)
+
+    async def settle(self) -> None:
+        """Дожидается потока прошлого расчёта: он мог не уложиться в ход
+        и ещё работает с GameState — обновлять мир до этого нельзя."""
+        if self._running is not None and not self._running.done():
+            await asyncio.wait([self._running])
+
+    async def plan(
+        self, arena: Dict, world, rtt: float = 0.0, received: Optional[float] = None
+    ) -> TurnPlan:
+        """Планирует ход в потоке и возвращает план, закрытый по дедлайну
+        или по завершении стратегии. ``received`` — момент получения арены
+        (time.perf_counter()), от него отсчитывается бюджет."""
+        await self.settle()
+        budget = self.budget(arena.get("nextTurnIn", 0.0), rtt)
+        plan = TurnPlan(Deadline(budget, received))
+        if self.gate is not None:
+            # ожидание слота расходует бюджет этого же хода
+            await self.gate.acquire(self)
+        started = time.perf_counter()
+        self._running = asyncio.ensure_future(
+            asyncio.to_thread(self.strategy.plan, arena, world, plan)
+        )
+        self._running.add_done_callback(self._report)
+        if self.gate is not None:
+            self._running.add_done_callback(
+                lambda _f: self.gate.release(self, time.perf_counter() - started)
+            )
+        timeout = max(0.0, plan.deadline.remaining())
+        done, _pending = await asyncio.wait([self._running], timeout=timeout)
+        plan.close()
+        if not done:
+            logging.warning("Planning hit the deadline (%.0f ms)", budget * 1000)
+            # поток ещё идёт: все, кто не успел получить ход, — отложены
+            for ant in arena.get("ants", []):
+                plan.defer(ant["id"])
+        return plan
+
+    @staticmethod
+    def _report(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logging.error("Planning failed", exc_info=future.exception())
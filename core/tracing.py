@@ -0,0 +1,177 @@
+"""core/tracing.py — вложенные замеры фаз хода.
+
+    with span("state.update"):
+        ...
+
+Пока трассировка выключена (``TRACE`` не задан), ``span()`` возвращает
+общий пустой контекст: одна проверка флага на вызов, без аллокаций.
+
+Включённая пишет завершённые интервалы в ограниченный буфер (экспорт в
+Chrome trace JSON — chrome://tracing, Perfetto) и в скользящие окна по
+имени фазы (перцентили за последние ``TRACE_WINDOW`` замеров). Вложенность
+в Chrome trace следует из времени: интервалы одной дорожки вкладываются.
+Дорожка — поток, а внутри цикла событий — имя задачи asyncio, чтобы
+параллельные корутины (опрос арены и отправка ходов, несколько ботов) не
+перекрывались на одной дорожке. Замеры в процессах пула (core/parallel.py)
+не собираются: их время видно как фаза, из которой пул вызван.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import itertools
+import os
+import threading
+import time
+from typing import Deque, Dict, List, Optional, Tuple
+
+from config import TRACE, TRACE_MAX_EVENTS, TRACE_WINDOW
+from utils import json_codec
+
+# name, начало (нс), длительность (нс), дорожка, аргументы
+Event = Tuple[str, int, int, int, Optional[Dict]]
+
+
+class _NoSpan:
+    """Пустой контекст выключенной трассировки."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Optional[Dict]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start, time.perf_counter_ns() - self.start, self.args)
+        return False
+
+
+class Tracer:
+    def __init__(
+        self,
+        enabled: bool = TRACE,
+        window: int = TRACE_WINDOW,
+        max_events: int = TRACE_MAX_EVENTS,
+    ):
+        self.enabled = enabled
+        self.window = window
+        self.events: Deque[Event] = collections.deque(maxlen=max_events)
+        self._durations: Dict[str, Deque[int]] = {}
+        # дорожки Chrome trace: (поток, задача) → номер и подпись
+        self._tracks: Dict[Tuple[int, str], int] = {}
+        self._track_names: Dict[int, str] = {}
+        self._track_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **args) -> object:
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, name, args or None)
+
+    def record(self, name: str, start: int, duration: int, args: Optional[Dict] = None) -> None:
+        track = self._track()
+        self.events.append((name, start, duration, track, args))
+        window = self._durations.get(name)
+        if window is None:
+            window = self._durations.setdefault(name, collections.deque(maxlen=self.window))
+        window.append(duration)
+
+    def _track(self) -> int:
+        thread = threading.current_thread()
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:  # не в цикле событий
+            task = None
+        # по имени задачи, а не по объекту: задачи с одним именем (отправка
+        # ходов каждый ход) идут последовательно и делят дорожку
+        key = (thread.ident, task.get_name() if task is not None else "")
+        track = self._tracks.get(key)
+        if track is None:
+            with self._lock:
+                track = self._tracks.get(key)
+                if track is None:
+                    track = self._tracks[key] = next(self._track_ids)
+                    label = thread.name if task is None else f"{thread.name} / {task.get_name()}"
+                    self._track_names[track] = label
+        return track
+
+    # ─── сводки ────────────────────────────────────────────────────
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Перцентили по скользящему окну каждой фазы, мс."""
+        result = {}
+        for name, window in list(self._durations.items()):
+            ordered = sorted(window)
+            if not ordered:
+                continue
+            pick = lambda share: ordered[min(len(ordered) - 1, int(share * len(ordered)))] / 1e6
+            result[name] = {
+                "count": len(ordered),
+                "p50": pick(0.5),
+                "p95": pick(0.95),
+                "p99": pick(0.99),
+                "max": ordered[-1] / 1e6,
+            }
+        return result
+
+    def format_summary(self) -> str:
+        lines = [f"{'span':<24}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  ms"]
+        for name, s in sorted(self.summary().items()):
+            lines.append(
+                f"{name:<24}{s['count']:>6}{s['p50']:>9.2f}{s['p95']:>9.2f}{s['p99']:>9.2f}{s['max']:>9.2f}"
+            )
+        return "\n".join(lines)
+
+    # ─── экспорт ───────────────────────────────────────────────────
+    def chrome_trace(self) -> Dict:
+        """События в формате Chrome trace (полные события "X", мкс)."""
+        pid = os.getpid()
+        trace: List[Dict] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": track, "args": {"name": label}}
+            for track, label in list(self._track_names.items())
+        ]
+        for name, start, duration, track, args in list(self.events):
+            event = {
+                "name": name, "ph": "X", "pid": pid, "tid": track,
+                "ts": start / 1000, "dur": duration / 1000,
+            }
+            if args:
+                event["args"] = args
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(json_codec.dumps(self.chrome_trace()))
+
+    def clear(self) -> None:
+        self.events.clear()
+        self._durations.clear()
+
+
+# общий трассировщик процесса
+tracer = Tracer()
+
+
+def span(name: str, **args) -> object:
+    """Замер фазы ``name`` общим трассировщиком (контекстный менеджер)."""
+    if not tracer.enabled:
+        return NO_SPAN
+    return Span(tracer, name, args or None)
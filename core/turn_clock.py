@@ -0,0 +1,79 @@
+"""core/turn_clock.py — оценка границ ходов сервера в локальном времени.
+
+Каждый ответ арены даёт ``nextTurnIn``. Ответ сформирован примерно в
+середине запроса, поэтому следующий ход начнётся в локальный момент
+``(отправка + получение) / 2 + nextTurnIn``. Из таких наблюдений
+оцениваются длительность хода и расхождение часов сервера с локальным
+прогнозом (offset), а по ним — когда опрашивать арену: до границы хода
+спим, у самой границы опрашиваем часто.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from config import POLL_LEAD, POLL_MIN_INTERVAL
+
+HISTORY = 8                 # сколько последних границ хода помнить
+
+
+class TurnClock:
+    def __init__(
+        self,
+        lead: float = POLL_LEAD,
+        min_interval: float = POLL_MIN_INTERVAL,
+        alpha: float = 0.2,
+    ):
+        self.lead = lead
+        self.min_interval = min_interval
+        self.alpha = alpha
+        self.period: Optional[float] = None     # длительность хода, с
+        self.offset = 0.0                       # наблюдение минус прогноз, с
+        # ход → локальный момент (time.perf_counter) начала следующего хода
+        self._boundaries: Dict[int, float] = {}
+        self._turn: Optional[int] = None
+
+    def observe(self, turn: int, next_turn_in: float, sent: float, received: float) -> None:
+        """Учитывает ответ арены: ход ``turn`` закончится через ``next_turn_in``."""
+        observed = (sent + received) / 2 + next_turn_in
+        predicted = self.boundary_of(turn)
+        if predicted is None:
+            boundary = observed
+        else:
+            error = observed - predicted
+            self.offset += self.alpha * (error - self.offset)
+            # прогноз и наблюдение ошибаются примерно одинаково — усредняем
+            boundary = predicted + 0.5 * error
+        if self._turn is not None and turn > self._turn:
+            period = (boundary - self._boundaries[self._turn]) / (turn - self._turn)
+            if period > 0:
+                self.period = period if self.period is None else (
+                    self.period + self.alpha * (period - self.period)
+                )
+        if self._turn is None or turn >= self._turn:
+            self._turn = turn
+        self._boundaries[turn] = boundary
+        for old in [t for t in self._boundaries if t <= self._turn - HISTORY]:
+            del self._boundaries[old]
+
+    def boundary_of(self, turn: int) -> Optional[float]:
+        """Локальный момент окончания хода ``turn`` (None — не знаем)."""
+        known = self._boundaries.get(turn)
+        if known is not None:
+            return known
+        if self._turn is None or self.period is None:
+            return None
+        return self._boundaries[self._turn] + (turn - self._turn) * self.period
+
+    def turn_started(self, turn: int) -> Optional[float]:
+        """Локальный момент начала хода ``turn``."""
+        return self.boundary_of(turn - 1)
+
+    def poll_delay(self, now: float) -> float:
+        """Пауза до следующего опроса арены: до границы хода (без запаса
+        ``lead``) — спим, у самой границы — опрашиваем часто."""
+        if self._turn is None:
+            return self.min_interval
+        until = self._boundaries[self._turn] - now
+        if until > self.lead + self.min_interval:
+            return until - self.lead
+        return self.min_interval
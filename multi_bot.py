@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""multi_bot.py — несколько ботов DatsPulse в одном процессе
+===========================================================
+
+Для скримов и параллельных тестовых раундов: N аккаунтов на одном цикле
+событий вместо N процессов.
+
+• Одна aiohttp-сессия (общий пул соединений) на всех ботов.
+• Свой APIClient на аккаунт: токен в заголовках, свой token bucket.
+• Свой GameState и свой экземпляр стратегии (``SmartStrategy.idle`` и
+  прочее состояние не смешивается).
+• Расчёт ходов идёт через общий FairGate: не больше MULTI_PLAN_SLOTS
+  расчётов одновременно, первым — бот, который меньше считал в последнее
+  время, поэтому медленная арена не задерживает остальные.
+
+Токены — аргументами, через переменную окружения API_TOKENS
+(через запятую) или в ``config.API_TOKENS``:
+
+    python multi_bot.py TOKEN1 TOKEN2 ...
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from bot import DatsPulseBot
+from bot_strat import make_strategy
+from config import API_TOKENS, MULTI_PLAN_SLOTS, MULTI_POOL_LIMIT, TRACE_FILE
+from core.api_client import APIClient, make_session
+from core.scheduler import FairGate
+from core.tracing import tracer
+
+
+class MultiBotRunner:
+    def __init__(
+        self,
+        tokens: List[str],
+        strategy: str = "smart",
+        slots: int = MULTI_PLAN_SLOTS,
+        pool_limit: int = MULTI_POOL_LIMIT,
+    ):
+        if not tokens:
+            raise ValueError("No API tokens: pass them as arguments or set API_TOKENS")
+        self.tokens = tokens
+        self.strategy = strategy
+        self.slots = slots
+        self.pool_limit = pool_limit
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        # потоков расчёта столько же, сколько слотов FairGate
+        loop.set_default_executor(ThreadPoolExecutor(self.slots, thread_name_prefix="plan"))
+        gate = FairGate(self.slots)
+        session = make_session(self.pool_limit)
+        bots = [
+            DatsPulseBot(
+                api=APIClient(token, session=session),
+                strategy=make_strategy(self.strategy),
+                gate=gate,
+                name=f"bot{i}",
+            )
+            for i, token in enumerate(self.tokens)
+        ]
+        logging.info("Running %d bots, %d planning slots", len(bots), self.slots)
+        try:
+            tasks = [asyncio.create_task(bot.run(), name=bot.name) for bot in bots]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await session.close()
+        for bot, result in zip(bots, results):
+            if isinstance(result, Exception):
+                bot.log.error("Bot failed: %r", result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Several DatsPulse bots in one process")
+    parser.add_argument("tokens", nargs="*", help="API tokens (default: API_TOKENS)")
+    parser.add_argument("--strategy", default=os.getenv("STRAT", "smart"))
+    parser.add_argument("--slots", type=int, default=MULTI_PLAN_SLOTS)
+    parser.add_argument("--pool-limit", type=int, default=MULTI_POOL_LIMIT)
+    args = parser.parse_args()
+
+    runner = MultiBotRunner(
+        args.tokens or API_TOKENS, args.strategy, args.slots, args.pool_limit
+    )
+    try:
+        asyncio.run(runner.run())
+    except KeyboardInterrupt:
+        logging.info("Bots stopped by user")
+    finally:
+        if tracer.enabled and TRACE_FILE:
+            tracer.export_chrome(TRACE_FILE)
+            logging.info("Trace written to %s", TRACE_FILE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Плоские индексы DenseGrid на больших сетках."""
+from array import array
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.dense_grid import DenseGrid
+
+
+def test_indices_from_int16_columns_do_not_wrap():
+    grid = DenseGrid(margin=2)
+    grid.ensure(-150, 150, -150, 150)
+    assert grid.width > 181 and grid.height > 181
+    qs = array("h", [-150, 0, 150, 150])
+    rs = array("h", [-150, 0, 100, 150])
+    expected = [grid.index(cell) for cell in zip(qs, rs)]
+    assert max(expected) > 32767
+    assert grid.indices(qs, rs).tolist() == expected
+
+
+def test_set_tiles_from_int16_columns():
+    grid = DenseGrid(margin=2)
+    qs, rs = array("h", [-150, 150]), array("h", [-150, 150])
+    grid.set_tiles(qs, rs, [2, 3])
+    assert grid.types[grid.index((150, 150))] == 3
+    assert grid.types[grid.index((-150, -150))] == 2
@@ -0,0 +1,32 @@
+"""Абстрактный поиск HPA* по входам кластеров."""
+from config import HPA_CLUSTER_SIZE
+from core.game_state import GameState
+from core.pathfinding import DEFAULT_PROFILE
+
+SIZE = HPA_CLUSTER_SIZE
+
+
+def corridor(length: int) -> dict:
+    """Арена-коридор вдоль r = 0: по одному входу на каждой границе кластеров."""
+    return {
+        "ants": [], "enemies": [], "food": [],
+        "home": [{"q": 0, "r": 0}],
+        "map": [{"q": q, "r": 0, "type": 2, "cost": 1} for q in range(length)],
+        "nextTurnIn": 1.0, "score": 0, "spot": {"q": 0, "r": 0}, "turnNo": 1,
+    }
+
+
+def test_route_from_cluster_entrance():
+    world = GameState(corridor(3 * SIZE))
+    hierarchy = world.pathfinder.hierarchy
+    graph = hierarchy.graph()
+    # последняя клетка первого кластера — единственный его вход
+    start, goal = (SIZE - 1, 0), (2 * SIZE + 3, 0)
+    assert graph._nodes[hierarchy.cluster_of(start)] == {start}
+
+    route = graph.route(start, goal)
+    assert route[0] == start and route[1] == (SIZE, 0) and route[-1] == goal
+
+    path = hierarchy.find_path(start, goal, profile=DEFAULT_PROFILE)
+    assert path[-1] == goal
+    assert len(path) == goal[0] - start[0]
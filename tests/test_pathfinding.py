@@ -0,0 +1,30 @@
+"""Инкрементальное перепланирование (D* Lite)."""
+from benchmarks.arena_gen import ROCK, generate
+from core.game_state import GameState
+from core.pathfinding import HexPathfinder
+from utils.hex_math import HexMath
+
+
+def test_replan_sees_reservations_of_the_same_turn():
+    arena = generate(2000, seed=3, ants=5)
+    world = GameState(arena)
+    pathfinder = HexPathfinder(world, incremental=True)
+    pathfinder.hierarchy = None
+    ant = arena["ants"][0]
+    start = (ant["q"], ant["r"])
+    goal = max(
+        (c for c, t in world.tiles.items() if t["type"] != ROCK),
+        key=lambda c: HexMath.distance(c, start),
+    )
+    pathfinder.replan(ant["id"], start, goal)           # первый раз — A*
+    path = list(pathfinder.replan(ant["id"], start, goal))
+    assert path and path[-1] == goal
+
+    # другой муравей в этом же ходу занял клетку на пути
+    blocked = path[len(path) // 2]
+    world.reserve_cell(blocked, "other")
+    detour = list(pathfinder.replan(ant["id"], start, goal))
+    assert detour and detour[-1] == goal and blocked not in detour
+
+    world.release_cell(blocked)
+    assert list(pathfinder.replan(ant["id"], start, goal)) == path
@@ -1,31 +1,185 @@
+"""utils/hex_math.py — единый модуль геометрии гекс-сетки (осевые координаты).
+
+Одиночные операции (distance, neighbors, line, ring, spiral) работают на
+чистом Python. Пакетные ядра (distance_matrix, k_nearest, ring_array,
+spiral_array, lines, sectors) используют NumPy, если он установлен;
+``closest`` и ``sector_of`` выбирают реализацию сами и работают без него.
+``core.hex_grid.HexGrid`` — совместимый псевдоним этого класса.
+"""
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy опционален
+    np = None
+
+# ниже этого размера пакетный расчёт не окупает накладных расходов NumPy
+BATCH_MIN = 32
+
+
 class HexMath:
-    # Направления в гексагональной сетке (шесть соседних гексов)
-    DIRECTIONS = [(1, 0), (0, 1), (-1, 1), (-1, 0), (0, -1), (1, -1)]
-    
+    # Направления в гексагональной сетке (шесть соседних гексов), против
+    # часовой стрелки; на этот порядок опирается обход кольца в ring()
+    DIRECTIONS = [(1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)]
+
     @staticmethod
     def distance(a, b):
         """Расстояние между двумя гексами на шестиугольной сетке."""
         return (abs(a[0] - b[0]) + abs(a[0] + a[1] - b[0] - b[1]) + abs(a[1] - b[1])) // 2
-    
+
     @staticmethod
     def neighbors(hex):
         """Возвращает список координат всех соседних гексов для данного гекса."""
         q, r = hex
         return [(q + dq, r + dr) for dq, dr in HexMath.DIRECTIONS]
-    
+
+    @staticmethod
+    def cube_round(q, r):
+        """Округление дробных осевых координат до ближайшего гекса
+        (через кубические координаты, а не покоординатно)."""
+        s = -q - r
+        rq, rr, rs = round(q), round(r), round(s)
+        dq, dr, ds = abs(rq - q), abs(rr - r), abs(rs - s)
+        if dq > dr and dq > ds:
+            rq = -rr - rs
+        elif dr > ds:
+            rr = -rq - rs
+        return int(rq), int(rr)
+
     @staticmethod
     def line(a, b):
         """
-        Возвращает список гексов, составляющих линию от a до b,
-        используя линейную интерполяцию и округление (алгоритм Брезенхэма для гексов).
+        Возвращает список гексов, составляющих линию от a до b:
+        линейная интерполяция в кубических координатах с кубическим округлением.
         """
-        path = []
         n = HexMath.distance(a, b)
         if n == 0:
-            return [a]
-        for i in range(n + 1):
-            t = i / n
-            q = round(a[0] * (1 - t) + b[0] * t)
-            r = round(a[1] * (1 - t) + b[1] * t)
-            path.append((q, r))
-        return path
+            return [tuple(a)]
+        # сдвиг на эпсилон, чтобы точки на ребре округлялись единообразно
+        aq, ar = a[0] + 1e-6, a[1] + 1e-6
+        bq, br = b[0] + 1e-6, b[1] + 1e-6
+        return [
+            HexMath.cube_round(aq + (bq - aq) * (i / n), ar + (br - ar) * (i / n))
+            for i in range(n + 1)
+        ]
+
+    @staticmethod
+    def ring(center, radius):
+        """Кольцо гексов на расстоянии radius от центра."""
+        if radius == 0:
+            return [tuple(center)]
+        dirs = HexMath.DIRECTIONS
+        q, r = center[0] + dirs[4][0] * radius, center[1] + dirs[4][1] * radius
+        results = []
+        for dq, dr in dirs:
+            for _ in range(radius):
+                results.append((q, r))
+                q, r = q + dq, r + dr
+        return results
+
+    @staticmethod
+    def spiral(center, max_radius):
+        """Спираль: центр и кольца от 1 до max_radius."""
+        results = [tuple(center)]
+        for radius in range(1, max_radius + 1):
+            results.extend(HexMath.ring(center, radius))
+        return results
+
+    @staticmethod
+    def sector(cell, center, sectors=6):
+        """Номер углового сектора клетки относительно центра."""
+        angle = math.atan2(cell[1] - center[1], cell[0] - center[0]) % (2 * math.pi)
+        return int(angle // (2 * math.pi / sectors)) % sectors
+
+    # ─────────────────────────────────────────────────────────────
+    # Пакетные ядра (NumPy)
+    # ─────────────────────────────────────────────────────────────
+    @staticmethod
+    def distance_matrix(a, b):
+        """Матрица расстояний |a| × |b| между двумя наборами клеток."""
+        a = np.asarray(a, dtype=np.int64).reshape(-1, 2)
+        b = np.asarray(b, dtype=np.int64).reshape(-1, 2)
+        dq = a[:, None, 0] - b[None, :, 0]
+        dr = a[:, None, 1] - b[None, :, 1]
+        return (np.abs(dq) + np.abs(dr) + np.abs(dq + dr)) // 2
+
+    @staticmethod
+    def k_nearest(points, queries, k=1):
+        """Для каждого запроса — индексы k ближайших точек (по возрастанию
+        расстояния) и сами расстояния: два массива |queries| × k."""
+        dist = HexMath.distance_matrix(queries, points)
+        k = min(k, dist.shape[1])
+        idx = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        part = np.take_along_axis(dist, idx, axis=1)
+        order = np.argsort(part, axis=1, kind="stable")
+        return np.take_along_axis(idx, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+    @staticmethod
+    def ring_array(center, radius):
+        """ring() в виде массива (6·radius, 2)."""
+        if radius == 0:
+            return np.asarray([center], dtype=np.int64)
+        dirs = np.asarray(HexMath.DIRECTIONS, dtype=np.int64)
+        start = np.asarray(center, dtype=np.int64) + dirs[4] * radius
+        # углы кольца: start + накопленные стороны предыдущих направлений
+        corners = start + np.vstack(([0, 0], np.cumsum(dirs[:-1] * radius, axis=0)))
+        steps = np.arange(radius)[None, :, None] * dirs[:, None, :]
+        return (corners[:, None, :] + steps).reshape(-1, 2)
+
+    @staticmethod
+    def spiral_array(center, max_radius):
+        """spiral() в виде массива (1 + 3·R·(R+1), 2)."""
+        return np.concatenate([HexMath.ring_array(center, r) for r in range(max_radius + 1)])
+
+    @staticmethod
+    def lines(a, b):
+        """Линии из каждой точки a в соответствующую точку b. Возвращает
+        список массивов (n_i + 1, 2) — длины линий разные."""
+        a = np.asarray(a, dtype=np.float64).reshape(-1, 2) + 1e-6
+        b = np.asarray(b, dtype=np.float64).reshape(-1, 2) + 1e-6
+        # попарные расстояния поэлементно, без матрицы |a| × |b|
+        d = (np.rint(b) - np.rint(a)).astype(np.int64)
+        n = (np.abs(d[:, 0]) + np.abs(d[:, 1]) + np.abs(d[:, 0] + d[:, 1])) // 2
+        result = []
+        for i, steps in enumerate(n):
+            t = (np.arange(steps + 1) / max(steps, 1))[:, None]
+            result.append(HexMath._cube_round_array(a[i] + (b[i] - a[i]) * t))
+        return result
+
+    @staticmethod
+    def _cube_round_array(qr):
+        q, r = qr[:, 0], qr[:, 1]
+        s = -q - r
+        rq, rr, rs = np.rint(q), np.rint(r), np.rint(s)
+        dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+        fix_q = (dq > dr) & (dq > ds)
+        fix_r = ~fix_q & (dr > ds)
+        rq = np.where(fix_q, -rr - rs, rq)
+        rr = np.where(fix_r, -rq - rs, rr)
+        return np.stack((rq, rr), axis=1).astype(np.int64)
+
+    @staticmethod
+    def sectors(points, center, sectors=6):
+        """sector() для массива клеток."""
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        angle = np.arctan2(pts[:, 1] - center[1], pts[:, 0] - center[0]) % (2 * np.pi)
+        return (angle // (2 * np.pi / sectors)).astype(np.int64) % sectors
+
+    # ─────────────────────────────────────────────────────────────
+    # Обёртки, выбирающие реализацию сами
+    # ─────────────────────────────────────────────────────────────
+    @staticmethod
+    def closest(start, cells):
+        """Ближайшая к start клетка из списка (None для пустого списка)."""
+        if not cells:
+            return None
+        if np is None or len(cells) < BATCH_MIN:
+            return min(cells, key=lambda c: HexMath.distance(start, c))
+        return cells[int(np.argmin(HexMath.distance_matrix([start], cells)[0]))]
+
+    @staticmethod
+    def sector_of(cells, center, sectors=6):
+        """Номера секторов для списка клеток (список int)."""
+        if np is None or len(cells) < BATCH_MIN:
+            return [HexMath.sector(c, center, sectors) for c in cells]
+        return HexMath.sectors(cells, center, sectors).tolist()
@@ -0,0 +1,27 @@
+"""utils/json_codec.py — быстрый JSON: orjson, если установлен, иначе json.
+
+``dumps`` всегда возвращает bytes, ``loads`` принимает bytes или str.
+"""
+try:
+    import orjson
+except ImportError:  # orjson опционален
+    orjson = None
+
+import json
+
+if orjson is not None:
+    NAME = "orjson"
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    NAME = "json"
+
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(data):
+        return json.loads(data)
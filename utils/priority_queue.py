@@ -1,4 +1,18 @@
+"""Очереди с приоритетом для поиска пути.
+
+Все очереди имеют одинаковый интерфейс ``put / get / empty`` и
+взаимозаменяемы в HexPathfinder (см. ``QUEUES`` и ``config.PATH_QUEUE``):
+
+* ``PriorityQueue`` — простая обёртка над heapq, без decrease-key;
+  устаревшие дубликаты отсеивает сам поиск (closed-множество).
+* ``BucketQueue``   — очередь Дейкстры–Дайала для целых приоритетов:
+  O(1) на операцию, т.к. стоимости ходов — маленькие целые (1 и 2).
+* ``IndexedHeap``   — бинарная куча с индексом позиций и честным
+  decrease-key: каждый элемент лежит в очереди не более одного раза.
+"""
 import heapq
+import math
+
 
 class PriorityQueue:
     def __init__(self):
@@ -9,3 +23,144 @@ class PriorityQueue:
         heapq.heappush(self.elements, (priority, item))
     def get(self):
         return heapq.heappop(self.elements)[1]
+
+
+class BucketQueue:
+    """Очередь Дайала: массив корзин по целому приоритету.
+
+    Повторный ``put`` с меньшим приоритетом не удаляет старую запись, а
+    помечает её устаревшей — ``get`` такие записи пропускает (счётчик
+    ``stale``). Нецелые и бесконечные приоритеты уходят в резервную кучу и
+    выдаются после всех целых.
+    """
+
+    def __init__(self):
+        self.buckets = []
+        self.cursor = 0
+        self.size = 0
+        self.best = {}          # item -> актуальный приоритет
+        self.overflow = []      # куча для приоритетов, не влезающих в корзины
+        self.stale = 0
+
+    def empty(self):
+        self._skip_stale()
+        return self.size == 0
+
+    def put(self, item, priority):
+        if item in self.best:
+            if priority >= self.best[item]:
+                return
+            self.stale += 1
+        else:
+            self.size += 1
+        self.best[item] = priority
+
+        if priority == math.inf or priority != int(priority):
+            heapq.heappush(self.overflow, (priority, item))
+            return
+        priority = int(priority)
+        if priority >= len(self.buckets):
+            self.buckets.extend([] for _ in range(priority + 1 - len(self.buckets)))
+        self.buckets[priority].append(item)
+        if priority < self.cursor:
+            self.cursor = priority
+
+    def get(self):
+        self._skip_stale()
+        if self.size == 0:
+            raise IndexError("get from empty BucketQueue")
+        if self.cursor < len(self.buckets):
+            item = self.buckets[self.cursor].pop()
+        else:
+            item = heapq.heappop(self.overflow)[1]
+        del self.best[item]
+        self.size -= 1
+        return item
+
+    def _skip_stale(self):
+        """Сдвигает курсор к первой непустой корзине, выкидывая устаревшие записи."""
+        buckets, best = self.buckets, self.best
+        while self.cursor < len(buckets):
+            bucket = buckets[self.cursor]
+            while bucket and best.get(bucket[-1]) != self.cursor:
+                bucket.pop()
+            if bucket:
+                return
+            self.cursor += 1
+        overflow = self.overflow
+        while overflow and best.get(overflow[0][1]) != overflow[0][0]:
+            heapq.heappop(overflow)
+
+
+class IndexedHeap:
+    """Бинарная куча с картой позиций и операцией decrease-key."""
+
+    def __init__(self):
+        self.heap = []          # [priority, item]
+        self.index = {}         # item -> позиция в heap
+
+    def empty(self):
+        return not self.heap
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def put(self, item, priority):
+        pos = self.index.get(item)
+        if pos is None:
+            self.heap.append([priority, item])
+            self.index[item] = len(self.heap) - 1
+            self._sift_up(len(self.heap) - 1)
+        elif priority < self.heap[pos][0]:
+            self.heap[pos][0] = priority
+            self._sift_up(pos)
+
+    def get(self):
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        del self.index[top[1]]
+        if heap:
+            heap[0] = last
+            self.index[last[1]] = 0
+            self._sift_down(0)
+        return top[1]
+
+    def _sift_up(self, pos):
+        heap, index = self.heap, self.index
+        entry = heap[pos]
+        while pos > 0:
+            parent = (pos - 1) >> 1
+            if heap[parent][0] <= entry[0]:
+                break
+            heap[pos] = heap[parent]
+            index[heap[pos][1]] = pos
+            pos = parent
+        heap[pos] = entry
+        index[entry[1]] = pos
+
+    def _sift_down(self, pos):
+        heap, index = self.heap, self.index
+        size = len(heap)
+        entry = heap[pos]
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if entry[0] <= heap[child][0]:
+                break
+            heap[pos] = heap[child]
+            index[heap[pos][1]] = pos
+            pos = child
+        heap[pos] = entry
+        index[entry[1]] = pos
+
+
+# реестр бэкендов для HexPathfinder
+QUEUES = {
+    "heap": PriorityQueue,
+    "bucket": BucketQueue,
+    "indexed": IndexedHeap,
+}